@@ -1,5 +1,3 @@
-import pandas as pd
-
 def onu(list):
     """
     Renvoie les codes pays qui font partie de la liste ONU mais qui sont absents de la liste fournie.
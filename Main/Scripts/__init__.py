@@ -0,0 +1,91 @@
+"""
+Fonctions du projet « Développement économique et Santé ».
+
+Les sous-modules ne sont importés qu'au premier accès à l'une de leurs fonctions, et les
+bibliothèques de graphiques et de modélisation (plotly, matplotlib, statsmodels, sklearn) ne
+sont chargées qu'à l'appel des fonctions qui en ont besoin. Une mise à jour des données sans
+graphique ne paie donc pas leur temps d'import.
+
+Utilisation en ligne de commande depuis le dossier Main :
+
+    python -m Scripts refresh   # mise à jour des sauvegardes locales depuis les API
+    python -m Scripts fuse      # construction des tables fusionnées (Main/Sorties)
+    python -m Scripts report    # statistiques descriptives et régression multiple
+    python -m Scripts html      # rapport HTML statique (Main/Rapport/index.html)
+"""
+
+import importlib
+
+# Fonction publique -> sous-module qui la définit
+_FONCTIONS = {
+    "get_headers": "get_data_OMS_code_pays",
+    "get_facts": "get_data_OMS_code_pays",
+    "build_wide_table": "get_data_OMS_code_pays",
+    "get_iso3": "get_data_OMS_code_pays",
+    "preparer_groupe": "get_data_OMS_code_pays",
+    "get_data_health_with_iso": "get_data_OMS_code_pays",
+    "IndexLocalisations": "localisations",
+    "index_depuis_faits": "localisations",
+    "index_depuis_regions": "localisations",
+    "agreger": "localisations",
+    "check_api_availability": "get_data_PIB_hab",
+    "telecharger_gdp_per_capita": "get_data_PIB_hab",
+    "gdp_format_long": "get_data_PIB_hab",
+    "gdp_format_large": "get_data_PIB_hab",
+    "get_gdp_per_capita_wide": "get_data_PIB_hab",
+    "get_gdp_per_capita": "get_data_PIB_hab",
+    "restructure_data": "traitement_données_IHME",
+    "harmoniser_noms": "traitement_données_IHME",
+    "normaliser_types": "normalisation",
+    "lire_csv": "normalisation",
+    "fusion_tables": "fusion_donnees",
+    "pipeline_asynchrone": "orchestration",
+    "executer_pipeline": "orchestration",
+    "onu": "Pays_ONU",
+    "pas_onu": "Pays_ONU",
+    "description_indicateurs": "analyse_données_OMS",
+    "world_map": "analyse_données_OMS",
+    "desc_missing_health": "analyse_données_OMS",
+    "plot_missing_gdp": "analyse_données_pib_habitant",
+    "world_map_gdp": "analyse_données_pib_habitant",
+    "quantiles_gdp": "analyse_données_pib_habitant",
+    "carte_statique": "cartes",
+    "grille_cartes": "cartes",
+    "matrice_poids": "spatial",
+    "moran_global": "spatial",
+    "moran_local": "spatial",
+    "decalage_spatial": "spatial",
+    "table_quantiles": "quantiles",
+    "ajouter_quantiles": "quantiles",
+    "afficher_graphiques": "analyse_graphique_data",
+    "analyse_sante_vers_pib": "reg_multiple_sante",
+    "graphique_valeurs_predites_vs_reelles": "reg_multiple_sante",
+    "graphique_coefficients": "reg_multiple_sante",
+    "ajuster": "cache_regressions",
+    "specification": "cache_regressions",
+    "enregistrer_specification": "cache_regressions",
+    "regression_robuste": "regression_robuste",
+    "recherche_meilleurs_sous_ensembles": "recherche_modeles",
+    "meilleur_modele": "recherche_modeles",
+    "matrice_associations": "associations",
+    "benjamini_hochberg": "associations",
+    "imputer": "imputation",
+    "construire_rapport": "rapport",
+    "clustering_trajectoires": "clustering",
+    "ajouter_clusters": "clustering",
+    "ServeurRejeu": "rejeu",
+    "fixtures_depuis_sauvegardes": "rejeu",
+}
+
+__all__ = list(_FONCTIONS)
+
+
+def __getattr__(nom):
+    if nom in _FONCTIONS:
+        module = importlib.import_module(f".{_FONCTIONS[nom]}", __name__)
+        return getattr(module, nom)
+    raise AttributeError(f"module {__name__!r} has no attribute {nom!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_FONCTIONS))
@@ -0,0 +1,115 @@
+import argparse
+import sys
+
+
+def refresh():
+    """
+    Met à jour les sauvegardes locales (OMS, PIB) depuis les API.
+
+    Seules les sources effectivement disponibles sont réécrites ; en cas d'indisponibilité,
+    la sauvegarde existante est conservée.
+    """
+
+    import requests
+
+    from .chemins import FICHIERS_OMS, FICHIER_PIB
+    from .get_data_OMS_code_pays import get_data_health_with_iso, NOMS_INDICATEURS
+    from .get_data_PIB_hab import get_gdp_per_capita_wide
+
+    try:
+        for grp, df in get_data_health_with_iso().items():
+            df.rename(columns=NOMS_INDICATEURS).to_csv(FICHIERS_OMS[grp], index=False)
+            print(f"{grp} : {len(df)} pays -> {FICHIERS_OMS[grp]}")
+    except requests.exceptions.RequestException:
+        print("L'API de l'OMS n'est pas disponible, la sauvegarde locale a été conservée")
+
+    try:
+        df_pib = get_gdp_per_capita_wide()
+        df_pib.to_csv(FICHIER_PIB, index=False)
+        print(f"PIB : {len(df_pib)} pays -> {FICHIER_PIB}")
+    except requests.exceptions.RequestException:
+        print("L'API de la Banque mondiale n'est pas disponible, la sauvegarde locale a été conservée")
+
+
+def fuse():
+    """
+    Construit les tables fusionnées avec le pipeline asynchrone et les enregistre dans
+    Main/Sorties, sans toucher aux tables fusionnées suivies par git.
+    """
+
+    from .chemins import DOSSIER_SORTIES, FICHIER_FUSION, FICHIER_FUSION_GROUPE
+    from .orchestration import executer_pipeline
+
+    resultats = executer_pipeline()
+    DOSSIER_SORTIES.mkdir(parents=True, exist_ok=True)
+    sortie_fusion = DOSSIER_SORTIES / FICHIER_FUSION.name
+    sortie_groupe = DOSSIER_SORTIES / FICHIER_FUSION_GROUPE.name
+    resultats["fusion"].to_csv(sortie_fusion, index=False)
+    resultats["fusion_niveau_richesse"].to_csv(sortie_groupe, index=False)
+
+    print(resultats["chronologie"].round(3).to_string(index=False))
+    print(f"Table fusionnée : {len(resultats['fusion_niveau_richesse'])} pays -> {sortie_groupe}")
+
+
+def report():
+    """
+    Affiche les valeurs manquantes des indicateurs et la régression multiple santé -> PIB.
+    """
+
+    from .analyse_données_OMS import desc_missing_health
+    from .chemins import FICHIER_FUSION
+    from .normalisation import lire_csv
+    from .reg_multiple_sante import analyse_sante_vers_pib
+
+    df = lire_csv(FICHIER_FUSION)
+    indicateurs = [c for c in df.columns if c not in ("LOCATION", "Pays_code_iso3") and not c.isdigit()]
+    for var in indicateurs:
+        desc_missing_health(df, var, "LOCATION")
+    analyse_sante_vers_pib(df)
+
+
+def html():
+    """
+    Construit le rapport HTML statique (Main/Rapport/index.html), voir rapport.py.
+    """
+
+    from .rapport import construire_rapport
+
+    resultats = construire_rapport()
+    print(resultats["sections"].round(3).to_string(index=False))
+    print(f"Rapport : {resultats['octets_html']} octets, ressources : {resultats['octets_ressources']} octets "
+          f"-> {resultats['fichier']}")
+
+
+COMMANDES = {"refresh": refresh, "fuse": fuse, "report": report, "html": html}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m Scripts",
+                                     description="Développement économique et Santé")
+    parser.add_argument("commande", choices=COMMANDES,
+                        help="refresh : mise à jour des sauvegardes, fuse : tables fusionnées, "
+                             "report : statistiques et régression, html : rapport HTML statique")
+    parser.add_argument("--mesures", metavar="FICHIER",
+                        help="active l'instrumentation et exporte les mesures "
+                             "(format Prometheus si le fichier se termine par .prom, JSON lines sinon)")
+    parser.add_argument("--memoire", action="store_true",
+                        help="avec --mesures, suit aussi le pic mémoire (tracemalloc)")
+    args = parser.parse_args(argv)
+
+    if args.mesures:
+        from . import instrumentation
+        instrumentation.activer(memoire=args.memoire)
+
+    COMMANDES[args.commande]()
+
+    if args.mesures:
+        if args.mesures.endswith(".prom"):
+            instrumentation.exporter_prometheus(args.mesures)
+        else:
+            instrumentation.exporter_jsonl(args.mesures)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
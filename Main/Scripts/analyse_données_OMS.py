@@ -1,8 +1,9 @@
-import plotly.express as px
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 
+from .instrumentation import mesurer
+
+@mesurer()
 def description_indicateurs(df, variables, disposition="1"):
     """
     Paramètres
@@ -21,6 +22,8 @@ def description_indicateurs(df, variables, disposition="1"):
         et les boxplots des variables fournies, avec la disposition choisie.
     """
 
+    import matplotlib.pyplot as plt
+
     # Filtrage des variables existantes dans le DataFrame
     variables = [v for v in variables if v in df.columns]
 
@@ -64,7 +67,8 @@ def description_indicateurs(df, variables, disposition="1"):
         plt.show()
 
 
-def world_map(dataframe, y_col, country_code_col="Pays_code_iso3", country_name_col="LOCATION", data_name=None, width=900, height=500):
+@mesurer()
+def world_map(dataframe, y_col, country_code_col="Pays_code_iso3", country_name_col="LOCATION", data_name=None, width=900, height=500, afficher=True):
     """
     Paramètres
     ----------
@@ -82,12 +86,17 @@ def world_map(dataframe, y_col, country_code_col="Pays_code_iso3", country_name_
         Largeur de la figure (par défaut 900).
     height : int, optional
         Hauteur de la figure (par défaut 500).
+    afficher : bool, optional
+        Affiche la carte (par défaut True) ; sinon la figure est renvoyée (ex. pour rapport.py).
 
     Sortie
     ------
-    Affiche une carte du monde avec la distribution des valeurs de y_col par pays.
+    Affiche une carte du monde avec la distribution des valeurs de y_col par pays, ou renvoie la
+    figure plotly si afficher vaut False.
     """
 
+    import plotly.express as px
+
     # Détermination de l'étendue des couleurs selon les valeurs minimales et maximales
     min_value = dataframe[y_col].min()
     max_value = dataframe[y_col].max()
@@ -119,6 +128,8 @@ def world_map(dataframe, y_col, country_code_col="Pays_code_iso3", country_name_
     # Retirer le titre de la colorbar
     fig.update_coloraxes(colorbar_title_text="")
 
+    if not afficher:
+        return fig
     fig.show()
 
 def desc_missing_health(df, var, country_col):
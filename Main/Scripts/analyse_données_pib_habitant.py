@@ -1,9 +1,6 @@
-import plotly.express as px
-import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-import pandas as pd
-from sklearn.cluster import KMeans
+from .instrumentation import mesurer
 
+@mesurer()
 def plot_missing_gdp(data, col="GDP_per_capita"):
     """
     Trace les valeurs manquantes annuelles du PIB par habitant
@@ -20,6 +17,8 @@ def plot_missing_gdp(data, col="GDP_per_capita"):
     Affiche un graphique combinant histogramme annuel des valeurs manquantes et courbe des pourcentages des valeurs manquantes.
     """
 
+    import matplotlib.pyplot as plt
+
     # Calcul du nombre de valeurs manquantes par année
     missing_values_per_year = data.groupby('Year')[col].apply(lambda x: x.isnull().sum())
 
@@ -51,7 +50,8 @@ def plot_missing_gdp(data, col="GDP_per_capita"):
     plt.show()
 
 
-def world_map_gdp(dataframe, y_col='GDP_per_capita', data_name='PIB par habitant', width=900, height=500):
+@mesurer()
+def world_map_gdp(dataframe, y_col='GDP_per_capita', data_name='PIB par habitant', width=900, height=500, afficher=True):
     """
     Crée une carte du monde animée montrant la distribution du PIB par habitant par pays et par année.
 
@@ -67,12 +67,17 @@ def world_map_gdp(dataframe, y_col='GDP_per_capita', data_name='PIB par habitant
         Largeur de la figure (par défaut 900).
     height : int, optional
         Hauteur de la figure (par défaut 500).
+    afficher : bool, optional
+        Affiche la carte (par défaut True) ; sinon la figure est renvoyée (ex. pour rapport.py).
 
     Sortie
     ------
-    Affiche une carte animée par année du PIB par habitant.
+    Affiche une carte animée par année du PIB par habitant, ou renvoie la figure plotly si
+    afficher vaut False.
     """
 
+    import plotly.express as px
+
     # Détermination des valeurs min et max pour la palette de couleurs
     min_value = dataframe[y_col].min()
     max_value = 125000  # Max ponctuel pour éviter que les valeurs extrêmes écrasent la visualisation
@@ -129,57 +134,72 @@ def world_map_gdp(dataframe, y_col='GDP_per_capita', data_name='PIB par habitant
         height=height
     )
 
+    if not afficher:
+        return fig
     fig.show()
 
 
-def quantiles_gdp(data_frame, k=int, y_col='GDP_per_capita'):
+@mesurer()
+def quantiles_gdp(data_frame, k=int, y_col='GDP_per_capita', mode="annee", poids=None, quantiles=None):
     """
     Trace les quantiles de PIB par habitant par année.
 
     Paramètres
     ----------
     data_frame : pandas.DataFrame
-        DataFrame contenant les colonnes 'Year' et y_col.
+        DataFrame contenant les colonnes 'Country Code', 'Year' et y_col.
     k : int
         Nombre de quantiles à calculer.
     y_col : str, optional
         Colonne contenant le PIB par habitant (par défaut 'GDP_per_capita').
+    mode : str, optional
+        "annee" : quantiles recalculés pour chaque année ; "global" : toutes les années
+        regroupées (ancien comportement). Par défaut "annee".
+    poids : str, optional
+        Colonne de pondération des pays (ex. population) ; par défaut aucune.
+    quantiles : pandas.DataFrame, optional
+        Table déjà calculée par table_quantiles (contenant k), pour éviter un nouveau calcul.
 
     Sortie
     ------
     None
-        Affiche un graphique des moyennes de PIB par décile et par année, ainsi que la moyenne globale.
+        Affiche un graphique des moyennes de PIB par quantile et par année, ainsi que la moyenne globale.
     """
 
-    # Calcul des quantiles du PIB par habitant
-    quantiles = pd.qcut(data_frame[y_col], q=k, labels=False)
+    import matplotlib.pyplot as plt
 
-    # Création d'un DataFrame pour le tracé avec Year, décile et PIB
-    plot_data = pd.DataFrame({'Year': data_frame['Year'], 'quantile': quantiles, 'GDP_per_capita': data_frame[y_col]})
+    from .quantiles import table_quantiles
 
-    # Calcul de la moyenne par année et par décile
-    grouped_data = plot_data.groupby(['Year', 'quantile'])['GDP_per_capita'].mean().unstack()
+    # Affectation aux quantiles (un seul tri par année)
+    if quantiles is None:
+        quantiles = table_quantiles(data_frame, ks=[k], y_col=y_col, mode=mode, poids=poids)
+    plot_data = quantiles[quantiles['k'] == k]
+
+    # Calcul de la moyenne par année et par quantile
+    grouped_data = plot_data.groupby(['Year', 'quantile'])[y_col].mean().unstack()
 
     # Calcul de la moyenne globale par année
-    overall_mean = plot_data.groupby('Year')['GDP_per_capita'].mean()
+    overall_mean = plot_data.groupby('Year')[y_col].mean()
 
     # Création du graphique
     plt.figure(figsize=(11, 6))
-    for quantile in range(k):
-        plt.plot(grouped_data.index, grouped_data[quantile], label=f'Décile {quantile + 1}')
-        plt.text(grouped_data.index[-1] + str(2), grouped_data[quantile].iloc[-1],
-                 f'Q{quantile + 1} mean: {grouped_data[quantile].mean():.2f}',
-                 va='center', ha='left', color=plt.gca().get_lines()[-1].get_color())
+    for quantile in grouped_data.columns:
+        serie = grouped_data[quantile].dropna()
+        ligne, = plt.plot(serie.index, serie, label=f'Quantile {quantile}')
+        # Étiquette placée à droite du dernier point réellement tracé de la courbe
+        # (les années sont des entiers int16 depuis la normalisation des types, d'où le décalage numérique)
+        plt.text(serie.index[-1] + 0.2, serie.iloc[-1],
+                 f'Q{quantile} mean: {serie.mean():.2f}',
+                 va='center', ha='left', color=ligne.get_color())
 
     # Tracé de la moyenne globale en ligne pointillée noire
     plt.plot(overall_mean.index, overall_mean, label='Moyenne globale', linestyle='--', color='black')
-    plt.text(overall_mean.index[-1] + str(2), overall_mean.iloc[-1] + 13,
+    plt.text(overall_mean.index[-1] + 0.2, overall_mean.iloc[-1],
              f'Moyenne globale: {overall_mean.mean():.2f}',
-             va='center', ha='left', color='black')
+             va='bottom', ha='left', color='black')
 
+    # Marge à droite pour que les étiquettes ne sortent pas du graphique
+    plt.xlim(right=overall_mean.index[-1] + 2)
     plt.ylabel('PIB moyen par habitant')
     plt.title('PIB moyen par habitant par année')
     plt.show()
-
-    # Suppression du DataFrame temporaire
-    del plot_data
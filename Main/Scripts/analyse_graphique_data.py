@@ -1,10 +1,10 @@
 import numpy as np
 import pandas as pd
-import statsmodels.api as sm
-import matplotlib.pyplot as plt
-import matplotlib.patheffects as path_effects
 
-def afficher_graphiques(liste_indicateurs, df,disposition="1"):
+from .instrumentation import mesurer
+
+@mesurer()
+def afficher_graphiques(liste_indicateurs, df,disposition="1", groupe="IncomeGroup", estimation="ols", taus=None):
     """
     Affiche plusieurs graphiques selon la disposition choisie,
     Effectue soit une régression linéaire par rapport au PIB par habitant soit un histogramme par groupe de revenu.
@@ -25,12 +25,28 @@ def afficher_graphiques(liste_indicateurs, df,disposition="1"):
         Choix de la disposition des graphiques : 
         - "1" pour un seul graphique,
         - "2" pour deux graphiques côte à côte.
+    groupe : str, optional
+        Colonne de regroupement des histogrammes "barres" (par défaut "IncomeGroup" ;
+        "Cluster" après clustering.ajouter_clusters).
+    estimation : str, optional
+        Droite des graphiques "regression" :
+        - "ols" pour la régression linéaire (par défaut),
+        - "huber" ou "tukey" pour un M-estimateur robuste aux valeurs aberrantes,
+        - "quantile" pour une droite de régression quantile par τ.
+        Les estimations robustes de tous les indicateurs sont calculées ensemble (voir regression_robuste).
+    taus : iterable, optional
+        Quantiles pour estimation="quantile" (par défaut 0.1, 0.25, 0.5, 0.75 et 0.9).
 
     Sortie
     ------
     Affiche les graphiques demandés et, si applicable, résume les résultats des régressions dans la console.
     """
 
+    import matplotlib.pyplot as plt
+
+    from .cache_regressions import LOG_PIB, ajuster, specification
+    from .regression_robuste import TAUS, regression_robuste
+
     # Nombre de graphiques à afficher
     nb_graphiques = len(liste_indicateurs)
 
@@ -56,23 +72,21 @@ def afficher_graphiques(liste_indicateurs, df,disposition="1"):
     # Liste pour stocker les résultats de régressions
     resultats_list = []
 
+    # Estimations robustes de tous les indicateurs "regression" d'une même année de PIB en un seul calcul
+    robustes = {}
+    if estimation != "ols":
+        taus = TAUS if taus is None else taus
+        regressions = [(nom_col, pib) for nom_col, _, _, pib, type_graph in liste_indicateurs if type_graph == "regression"]
+        for annee in dict.fromkeys(pib for _, pib in regressions):
+            noms = list(dict.fromkeys(nom_col for nom_col, pib in regressions if pib == annee))
+            robustes[annee] = regression_robuste(df, noms, annee, methode=estimation, taus=taus)
+
     # Boucle sur chaque indicateur à visualiser
     for idx, (nom_col, var, titre, pib, type_graph) in enumerate(liste_indicateurs):
         try:
-            # Nettoyage des données : suppression des lignes avec NaN et valeurs <= 0 pour pib et la variable
-            df = df.dropna(subset=[pib, nom_col])
-            df = df[df[pib] > 0]
-
-            # Transformation logarithmique du PIB pour linéariser la relation
-            df['log_PIB'] = np.log(df[pib])
-
-            # Suppression des éventuelles lignes encore NaN après transformation
-            df = df.dropna(subset=['log_PIB', nom_col])
-
-            # Préparation des variables pour la régression
-            Y = df[nom_col]
-            X = sm.add_constant(df['log_PIB'])
-            resultats = sm.OLS(Y, X).fit(cov_type='HC1')  # Régression linéaire avec correction d'hétéroscédasticité
+            # Régression linéaire de la variable sur le log du PIB, avec correction d'hétéroscédasticité :
+            # lignes sans NaN et PIB > 0 uniquement, résultat relu dans le cache si déjà calculé
+            resultats, df = ajuster(df, specification(pib, [LOG_PIB], dependante=nom_col, cov_type='HC1'))
             resultats_list.append((var, resultats))
 
             # Récupération de l'axe correspondant au graphique courant
@@ -81,19 +95,31 @@ def afficher_graphiques(liste_indicateurs, df,disposition="1"):
             # Nuage de points avec régression
             if type_graph == "regression":
                 ax.scatter(df['log_PIB'], df[nom_col], alpha=0.5, color='#2ecc71')
-                ax.plot(df['log_PIB'], resultats.predict(), color='red', linewidth=2)
+                if estimation == "ols":
+                    ax.plot(df['log_PIB'], resultats.predict(), color='red', linewidth=2)
+                else:
+                    # Une droite par estimation robuste (une par τ en régression quantile)
+                    x = np.array([df['log_PIB'].min(), df['log_PIB'].max()])
+                    coefficients = robustes[pib][robustes[pib]['indicateur'] == nom_col]
+                    couleurs = plt.cm.coolwarm(np.linspace(0, 1, len(coefficients)))
+                    for couleur, (_, ligne) in zip(couleurs, coefficients.iterrows()):
+                        etiquette = estimation.capitalize() if estimation != "quantile" else f"τ = {ligne['tau']:g}"
+                        ax.plot(x, ligne['const'] + ligne['log_PIB'] * x, linewidth=2,
+                                color='red' if estimation != "quantile" else couleur, label=etiquette)
+                    ax.legend(fontsize=8)
                 ax.set_xlabel(f"Richesse (Log PIB par habitant de {pib})", fontsize=9)
                 ax.set_ylabel(var, fontsize=9)
                 ax.grid(True, linestyle='--', alpha=0.6)
 
             # Histogramme moyen par groupe de revenu
             elif type_graph == "barres":
-                # Nettoyage et conversion en numérique
+                # Nettoyage et conversion en numérique (inutile si les types ont déjà été normalisés)
                 df.columns = df.columns.str.strip()
-                df[nom_col] = pd.to_numeric(df[nom_col], errors='coerce')
+                if not pd.api.types.is_numeric_dtype(df[nom_col]):
+                    df[nom_col] = pd.to_numeric(df[nom_col], errors='coerce')
 
-                # Calcul de la moyenne par groupe de revenu
-                resultat_moyen = df.groupby('IncomeGroup')[nom_col].mean().sort_values()
+                # Calcul de la moyenne par groupe (de revenu par défaut)
+                resultat_moyen = df.groupby(groupe, observed=True)[nom_col].mean().sort_values()
 
                 # Création du graphique en barres
                 bars = ax.bar(resultat_moyen.index, resultat_moyen.values, color='#87CEEB',
@@ -120,3 +146,9 @@ def afficher_graphiques(liste_indicateurs, df,disposition="1"):
         print(f"\n{var}")
         print("-" * 70)
         print(res.summary())
+
+    # Affichage des coefficients des estimations robustes
+    for annee, coefficients in robustes.items():
+        print(f"\nEstimation {estimation} (PIB {annee})")
+        print("-" * 70)
+        print(coefficients.to_string(index=False))
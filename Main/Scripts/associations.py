@@ -0,0 +1,185 @@
+"""
+Matrice d'associations entre les indicateurs de santé et le log du PIB par habitant de chaque
+année : corrélations de Pearson, de Spearman et partielles, avec p-valeurs ajustées par la
+procédure de Benjamini-Hochberg.
+
+Les valeurs manquantes sont traitées paire par paire (chaque couple indicateur × année
+utilise tous les pays renseignés pour les deux variables) par algèbre matricielle masquée :
+les sommes, sommes de carrés et produits croisés de toutes les paires sont obtenus par
+quelques produits matriciels entre les données (NaN remplacés par 0) et leurs masques de
+présence, sans boucle ni dropna par paire.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import mesurer
+from .recherche_modeles import indicateurs_disponibles
+
+METHODES = ("pearson", "spearman", "partielle")
+
+
+def _correlations_masquees(X, Y):
+    """
+    Corrélations de Pearson paire par paire entre les colonnes de X (n × p) et de Y (n × q),
+    en ignorant pour chaque paire les lignes où l'une des deux valeurs manque.
+
+    Sortie
+    ------
+    tuple
+        (r, n) : matrices p × q des corrélations et des effectifs.
+    """
+
+    Mx, My = (~np.isnan(X)).astype("float64"), (~np.isnan(Y)).astype("float64")
+    # Centrage préalable sur les moyennes marginales : meilleure précision numérique
+    X0 = np.nan_to_num(X - np.nanmean(X, axis=0))
+    Y0 = np.nan_to_num(Y - np.nanmean(Y, axis=0))
+
+    n = Mx.T @ My
+    sx, sy = X0.T @ My, Mx.T @ Y0
+    sxx, syy = (X0 ** 2).T @ My, Mx.T @ (Y0 ** 2)
+    sxy = X0.T @ Y0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = n * sxy - sx * sy
+        var = (n * sxx - sx ** 2) * (n * syy - sy ** 2)
+        r = np.where((n > 2) & (var > 0), cov / np.sqrt(np.maximum(var, 0)), np.nan)
+    return np.clip(r, -1.0, 1.0), n
+
+
+def _rangs(X):
+    # Rangs moyens de chaque colonne sur ses valeurs observées (NaN conservés)
+    return pd.DataFrame(X).rank(method="average").to_numpy()
+
+
+def _p_valeurs(r, ddl):
+    from scipy import stats
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = r * np.sqrt(ddl / (1 - r ** 2))
+        p = 2 * stats.t.sf(np.abs(t), ddl)
+    return np.where(ddl > 0, p, np.nan)
+
+
+def benjamini_hochberg(p_valeurs):
+    """
+    Ajuste des p-valeurs par la procédure de Benjamini-Hochberg (taux de fausses découvertes).
+
+    Paramètres
+    ----------
+    p_valeurs : array-like
+        P-valeurs (les NaN sont ignorées et conservées).
+
+    Sortie
+    ------
+    numpy.ndarray
+        P-valeurs ajustées, de même forme.
+    """
+
+    p = np.asarray(p_valeurs, dtype="float64")
+    plat = p.ravel()
+    valides = np.flatnonzero(~np.isnan(plat))
+    m = len(valides)
+    ajustees = np.full_like(plat, np.nan)
+    if m:
+        ordre = valides[np.argsort(plat[valides])]
+        q = plat[ordre] * m / np.arange(1, m + 1)
+        ajustees[ordre] = np.minimum(np.minimum.accumulate(q[::-1])[::-1], 1.0)
+    return ajustees.reshape(p.shape)
+
+
+def _correlations_partielles(X, Y):
+    """
+    Corrélation partielle de chaque indicateur avec chaque année, à indicateurs restants fixés,
+    obtenue par inversion de la matrice de corrélation paire par paire [indicateurs, année]
+    (pseudo-inverse : la matrice n'est pas forcément définie positive).
+    """
+
+    p, q = X.shape[1], Y.shape[1]
+    r_xx, _ = _correlations_masquees(X, X)
+    r_xy, n_xy = _correlations_masquees(X, Y)
+    np.fill_diagonal(r_xx, 1.0)
+
+    # Une matrice (p+1) × (p+1) par année, inversées en un seul appel
+    C = np.empty((q, p + 1, p + 1))
+    C[:, :p, :p] = np.nan_to_num(r_xx)
+    C[:, :p, p] = np.nan_to_num(r_xy.T)
+    C[:, p, :p] = np.nan_to_num(r_xy.T)
+    C[:, p, p] = 1.0
+    P = np.linalg.pinv(C, hermitian=True)
+
+    diagonale = np.diagonal(P, axis1=1, axis2=2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = -P[:, :p, p] / np.sqrt(diagonale[:, :p] * diagonale[:, p:p + 1])
+    r = np.where(np.isnan(r_xy.T), np.nan, np.clip(r, -1.0, 1.0)).T
+    return r, n_xy, n_xy - 2 - (p - 1)
+
+
+@mesurer()
+def matrice_associations(df, indicateurs=None, annees=None, methodes=METHODES, log_pib=True):
+    """
+    Calcule les associations entre chaque indicateur de santé et le PIB par habitant de
+    chaque année.
+
+    Les corrélations sont calculées paire par paire sur les pays renseignés pour les deux
+    variables. Pour Spearman, chaque variable est rangée sur l'ensemble de ses valeurs
+    observées (et non sur le seul sous-échantillon de la paire), ce qui permet le calcul
+    matriciel. La corrélation partielle d'un indicateur fixe tous les autres indicateurs
+    retenus ; elle n'est définie que si les pays sont plus nombreux que les indicateurs.
+
+    Paramètres
+    ----------
+    df : pandas.DataFrame
+        Table fusionnée (indicateurs de santé et colonnes années de PIB).
+    indicateurs : list, optional
+        Indicateurs à tester (par défaut, tous les indicateurs de santé de la table).
+    annees : list, optional
+        Colonnes années de PIB (par défaut, toutes celles de la table).
+    methodes : iterable, optional
+        Parmi "pearson", "spearman" et "partielle" (par défaut les trois).
+    log_pib : bool, optional
+        Utilise le log du PIB par habitant (PIB non positif considéré manquant). Par défaut True.
+
+    Sortie
+    ------
+    pandas.DataFrame
+        Une ligne par (méthode, indicateur, année) : methode | indicateur | annee | r | n_obs |
+        p_valeur | p_ajustee. L'ajustement de Benjamini-Hochberg porte sur toutes les paires
+        d'une même méthode. pivot(index="indicateur", columns="annee", values="r") donne la matrice.
+    """
+
+    indicateurs = indicateurs_disponibles(df) if indicateurs is None else list(indicateurs)
+    annees = [c for c in df.columns if str(c).isdigit()] if annees is None else [str(a) for a in annees]
+    for methode in methodes:
+        if methode not in METHODES:
+            raise ValueError(f"Méthode invalide : {methode} (choisir parmi {', '.join(METHODES)})")
+
+    X = df[indicateurs].to_numpy(dtype="float64", na_value=np.nan)
+    Y = df[annees].to_numpy(dtype="float64", na_value=np.nan)
+    if log_pib:
+        Y = np.log(np.where(Y > 0, Y, np.nan))
+
+    resultats = []
+    for methode in methodes:
+        if methode == "pearson":
+            r, n = _correlations_masquees(X, Y)
+            ddl = n - 2
+        elif methode == "spearman":
+            r, n = _correlations_masquees(_rangs(X), _rangs(Y))
+            ddl = n - 2
+        else:
+            r, n, ddl = _correlations_partielles(X, Y)
+
+        p = _p_valeurs(r, ddl)
+        resultats.append(pd.DataFrame({
+            "methode": methode,
+            "indicateur": np.repeat(indicateurs, len(annees)),
+            "annee": np.tile(annees, len(indicateurs)),
+            "r": r.ravel(),
+            "n_obs": n.ravel().astype("int32"),
+            "p_valeur": p.ravel(),
+            "p_ajustee": benjamini_hochberg(p).ravel(),
+        }))
+
+    return pd.concat(resultats, ignore_index=True).astype({"methode": "category", "indicateur": "category",
+                                                           "annee": "category"})
@@ -0,0 +1,423 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from .chemins import DOSSIER_MAIN
+
+# Bibliothèques qu'une commande purement « données » ne doit pas charger
+MODULES_LOURDS = ["matplotlib", "plotly", "statsmodels", "sklearn"]
+
+# Imports correspondant aux commandes sans graphique, avec leur budget de démarrage à froid (s)
+IMPORTS_DONNEES = {
+    "Scripts": 0.2,
+    "Scripts.__main__": 0.2,
+    "Scripts.get_data_PIB_hab": 1.5,
+    "Scripts.get_data_OMS_code_pays": 1.5,
+    "Scripts.orchestration": 1.5,
+}
+
+
+def _executer_python(code):
+    # Nouvel interpréteur lancé depuis le dossier Main, pour mesurer un démarrage à froid
+    debut = time.perf_counter()
+    sortie = subprocess.run([sys.executable, "-c", code], cwd=DOSSIER_MAIN,
+                            capture_output=True, text=True, check=True)
+    return time.perf_counter() - debut, sortie.stdout
+
+
+def mesurer_import(module, repetitions=5):
+    """
+    Mesure le temps de démarrage à froid d'un interpréteur qui importe un module.
+
+    Paramètres
+    ----------
+    module : str
+        Nom du module à importer (ex. "Scripts.get_data_PIB_hab").
+    repetitions : int, optional
+        Nombre de lancements (par défaut 5).
+
+    Sortie
+    ------
+    dict
+        Module, temps médian et minimal d'import (interpréteur nu déduit), et bibliothèques
+        lourdes chargées par l'import.
+    """
+
+    code = (f"import sys; import {module}; "
+            f"print(','.join(m for m in {MODULES_LOURDS!r} if m in sys.modules))")
+
+    # Temps de référence : interpréteur sans aucun import
+    reference = min(_executer_python("pass")[0] for _ in range(repetitions))
+
+    durees = []
+    for _ in range(repetitions):
+        duree, stdout = _executer_python(code)
+        durees.append(duree - reference)
+
+    lourds = [m for m in stdout.strip().split(",") if m]
+    return {
+        "module": module,
+        "mediane_s": statistics.median(durees),
+        "min_s": min(durees),
+        "modules_lourds": lourds,
+    }
+
+
+def benchmark_imports(modules=None, repetitions=5):
+    """
+    Mesure l'import à froid des modules utilisés par les commandes « données ».
+
+    Paramètres
+    ----------
+    modules : dict, optional
+        Module -> budget en secondes (par défaut IMPORTS_DONNEES).
+    repetitions : int, optional
+        Nombre de lancements par module (par défaut 5).
+
+    Sortie
+    ------
+    list
+        Un dictionnaire de résultats par module, avec le budget et le statut "ok" (budget
+        respecté et aucune bibliothèque lourde chargée).
+    """
+
+    modules = IMPORTS_DONNEES if modules is None else modules
+    resultats = []
+    for module, budget in modules.items():
+        res = mesurer_import(module, repetitions)
+        res["budget_s"] = budget
+        res["ok"] = res["mediane_s"] <= budget and not res["modules_lourds"]
+        resultats.append(res)
+    return resultats
+
+
+def benchmark_instrumentation(repetitions=5, appels=200_000):
+    """
+    Mesure le surcoût par appel d'une fonction décorée par instrumentation.mesurer,
+    instrumentation désactivée puis activée.
+
+    Paramètres
+    ----------
+    repetitions : int, optional
+        Nombre de séries de mesures, la meilleure est retenue (par défaut 5).
+    appels : int, optional
+        Nombre d'appels par série (par défaut 200 000).
+
+    Sortie
+    ------
+    list
+        Un dictionnaire par mode avec le surcoût en nanosecondes par appel.
+    """
+
+    from . import instrumentation
+
+    def nue(x):
+        return x
+
+    decoree = instrumentation.mesurer("benchmark")(nue)
+
+    def serie(fonction):
+        debut = time.perf_counter()
+        for i in range(appels):
+            fonction(i)
+        return (time.perf_counter() - debut) / appels
+
+    # Mesures et mode de l'appelant (ex. python -m Scripts ... --mesures), rétablis à la fin
+    etait_actif, memoire = instrumentation.est_actif(), instrumentation._MEMOIRE
+    precedentes = instrumentation.mesures()
+    resultats = []
+    try:
+        for mode in ("desactivee", "activee"):
+            if mode == "activee":
+                instrumentation.activer()
+            else:
+                instrumentation.desactiver()
+            reference = min(serie(nue) for _ in range(repetitions))
+            cout = min(serie(decoree) for _ in range(repetitions))
+            resultats.append({"instrumentation": mode, "surcout_ns": (cout - reference) * 1e9})
+            instrumentation.reinitialiser()
+    finally:
+        instrumentation.reinitialiser()
+        instrumentation._MESURES.extend(precedentes)
+        if etait_actif:
+            instrumentation.activer(memoire=memoire)
+        else:
+            instrumentation.desactiver()
+    return resultats
+
+
+def _somme_partagee(colonnes):
+    from .memoire_partagee import jeu_du_worker
+    jeu = jeu_du_worker()
+    return float(sum(np.nansum(jeu.colonne(c)) for c in colonnes))
+
+
+def _somme_serialisee(df, colonnes):
+    return float(df[colonnes].sum().sum())
+
+
+def benchmark_memoire_partagee(repetitions=3, workers=(1, 2, 4, 8), facteur=200):
+    """
+    Compare, pour un nombre croissant de workers, le démarrage d'un pool travaillant sur la
+    table fusionnée partagée (memoire_partagee) et sur une table sérialisée vers chaque worker.
+
+    Paramètres
+    ----------
+    repetitions : int, optional
+        Nombre de mesures par configuration, la meilleure est retenue (par défaut 3).
+    workers : tuple, optional
+        Nombres de workers testés.
+    facteur : int, optional
+        Nombre de copies de la table fusionnée empilées pour simuler un gros volume (par défaut 200).
+
+    Sortie
+    ------
+    list
+        Un dictionnaire par nombre de workers avec les temps des deux approches.
+    """
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    import pandas as pd
+
+    from .chemins import FICHIER_FUSION_GROUPE
+    from .memoire_partagee import partager, pool_partage
+    from .normalisation import lire_csv
+
+    df = lire_csv(FICHIER_FUSION_GROUPE)
+    df = pd.concat([df] * facteur, ignore_index=True)
+    colonnes = [c for c in df.columns if pd.api.types.is_float_dtype(df[c])]
+
+    resultats = []
+    with partager(df) as jeu:
+        for n in workers:
+            def partage():
+                with pool_partage(jeu, max_workers=n) as pool:
+                    list(pool.map(_somme_partagee, [colonnes] * n))
+
+            def serialise():
+                with ProcessPoolExecutor(max_workers=n) as pool:
+                    list(pool.map(_somme_serialisee, [df] * n, [colonnes] * n))
+
+            resultats.append({
+                "workers": n,
+                "lignes": len(df),
+                "memoire_partagee_s": min(_chronometrer(partage) for _ in range(repetitions)),
+                "serialisation_s": min(_chronometrer(serialise) for _ in range(repetitions)),
+            })
+    return resultats
+
+
+def benchmark_cartes(repetitions=5, budget=0.1):
+    """
+    Mesure le temps de rendu PNG des cartes statiques (cartes.py) de la table fusionnée :
+    carte simple d'un indicateur et grille des dix années de PIB, ramenée à une carte.
+
+    Paramètres
+    ----------
+    repetitions : int, optional
+        Nombre de mesures, la meilleure est retenue (par défaut 5).
+    budget : float, optional
+        Temps maximal par carte en secondes (par défaut 0.1).
+
+    Sortie
+    ------
+    list
+        Un dictionnaire par type de rendu : temps par carte, taille du PNG et respect du budget.
+    """
+
+    from .cartes import carte_statique, charger_couche, grille_cartes
+    from .chemins import FICHIER_FUSION_GROUPE
+    from .normalisation import lire_csv
+
+    df = lire_csv(FICHIER_FUSION_GROUPE)
+    annees = [c for c in df.columns if str(c).isdigit()]
+    charger_couche()
+    carte_statique(df, "Espérance de vie totale")  # construction du gabarit
+
+    resultats = []
+    for nom, rendu, nb_cartes in [
+        ("carte", lambda: carte_statique(df, "Espérance de vie totale"), 1),
+        ("grille_annees", lambda: grille_cartes(df, annees, echelle_commune=True), len(annees)),
+    ]:
+        duree = min(_chronometrer(rendu) for _ in range(repetitions)) / nb_cartes
+        resultats.append({"rendu": nom, "cartes": nb_cartes, "par_carte_s": round(duree, 4),
+                          "png_octets": len(rendu()), "budget_s": budget, "ok": duree <= budget})
+    return resultats
+
+
+def benchmark_rapport(repetitions=5, budget=0.5):
+    """
+    Mesure la construction du rapport HTML (rapport.py) : construction complète avec un cache
+    vide, puis reconstruction où toutes les sections sont reprises du cache.
+
+    Paramètres
+    ----------
+    repetitions : int, optional
+        Nombre de reconstructions mesurées, la meilleure est retenue (par défaut 5).
+    budget : float, optional
+        Temps maximal d'une reconstruction sans changement, en secondes (par défaut 0.5).
+
+    Sortie
+    ------
+    list
+        Un dictionnaire par construction : durée, sections reprises, taille de la page et des
+        ressources, nombre de ressources et taille de Main.ipynb pour comparaison.
+    """
+
+    import os
+    import tempfile
+
+    from .rapport import construire_rapport
+
+    taille_notebook = (DOSSIER_MAIN / "Main.ipynb").stat().st_size
+    cache_precedent = os.environ.get("SCRIPTS_CACHE")
+    with tempfile.TemporaryDirectory() as dossier:
+        # Cache et rapport temporaires : la première construction part de zéro
+        os.environ["SCRIPTS_CACHE"] = os.path.join(dossier, "cache")
+        try:
+            mesures = [("complete", construire_rapport(dossier=os.path.join(dossier, "rapport")))]
+            reconstructions = [construire_rapport(dossier=os.path.join(dossier, "rapport"))
+                               for _ in range(repetitions)]
+            mesures.append(("reutilisation", min(reconstructions, key=lambda r: r["duree"])))
+        finally:
+            if cache_precedent is None:
+                os.environ.pop("SCRIPTS_CACHE", None)
+            else:
+                os.environ["SCRIPTS_CACHE"] = cache_precedent
+
+        resultats = []
+        for construction, res in mesures:
+            resultats.append({
+                "construction": construction,
+                "duree_s": round(res["duree"], 4),
+                "sections_reprises": int(res["sections"]["reutilisee"].sum()),
+                "sections": len(res["sections"]),
+                "html_octets": res["octets_html"],
+                "ressources_octets": res["octets_ressources"],
+                "ressources": len(os.listdir(res["fichier"].parent / "assets")),
+                "notebook_octets": taille_notebook,
+            })
+    resultats[-1].update({"budget_s": budget, "ok": resultats[-1]["duree_s"] <= budget})
+    return resultats
+
+
+def benchmark_api(repetitions=3, facteurs=(1, 10, 100), latence=0.02, taille_page=10000):
+    """
+    Teste en charge, hors ligne et de façon reproductible, les chargeurs des API de l'OMS et de
+    la Banque mondiale contre le serveur de rejeu (rejeu.py), avec des fixtures produites à
+    partir des sauvegardes CSV.
+
+    - Téléchargement (facts SDG3 de l'OMS, PIB par habitant) pour des réponses 1 à 100 fois
+      plus grosses qu'aujourd'hui, avec pagination.
+    - Pipeline complet via les API, puis avec toutes les requêtes en échec (réponse 503 ou
+      connexion coupée) : repli sur les sauvegardes locales.
+
+    Paramètres
+    ----------
+    repetitions : int, optional
+        Nombre de mesures par configuration, la meilleure est retenue (par défaut 3).
+    facteurs : tuple, optional
+        Multiplicateurs du volume des réponses (par défaut 1, 10 et 100).
+    latence : float, optional
+        Latence simulée par requête, en secondes (par défaut 0.02).
+    taille_page : int, optional
+        Taille maximale des pages OData de l'OMS (par défaut 10 000 enregistrements).
+
+    Sortie
+    ------
+    list
+        Un dictionnaire par scénario : durée, lignes obtenues, requêtes et octets servis, et
+        statut "ok" (volume attendu pour les téléchargements ; pour le pipeline, repli effectif
+        sur les sauvegardes ou non, et mêmes lignes et mêmes codes ISO3 que le pipeline en repli).
+    """
+
+    import contextlib
+    import io
+    import tempfile
+
+    from .get_data_OMS_code_pays import get_facts
+    from .get_data_PIB_hab import telecharger_gdp_per_capita
+    from .orchestration import executer_pipeline
+    from .rejeu import ServeurRejeu, fixtures_depuis_sauvegardes
+
+    resultats = []
+    with tempfile.TemporaryDirectory() as dossier:
+        fixtures_depuis_sauvegardes(dossier)
+
+        references = {}
+        for facteur in facteurs:
+            for nom, telechargement in [("oms_facts", lambda: get_facts("SDG3")),
+                                        ("pib", telecharger_gdp_per_capita)]:
+                with ServeurRejeu(dossier, facteur=facteur, latence=latence, taille_page=taille_page) as serveur:
+                    lignes = len(telechargement())  # prépare aussi les réponses du serveur
+                    debut = dict(serveur.statistiques)
+                    duree = min(_chronometrer(telechargement) for _ in range(repetitions))
+                    requetes = (serveur.statistiques["requetes"] - debut["requetes"]) // repetitions
+                    octets = (serveur.statistiques["octets"] - debut["octets"]) // repetitions
+                references.setdefault(nom, lignes // facteur)
+                resultats.append({"scenario": nom, "facteur": facteur, "duree_s": round(duree, 4),
+                                  "lignes": lignes, "requetes": requetes, "octets": octets,
+                                  "ok": lignes == references[nom] * facteur})
+
+        # Le pipeline en repli (sauvegardes locales) sert de référence : il passe en premier
+        reference = None
+        for nom, options in [("pipeline_repli_503", {"taux_echec": 1.0, "echec": "503"}),
+                             ("pipeline_repli_coupure", {"taux_echec": 1.0, "echec": "coupure"}),
+                             ("pipeline_api", {})]:
+            with ServeurRejeu(dossier, latence=latence, **options) as serveur, \
+                    contextlib.redirect_stdout(io.StringIO()):
+                debut = time.perf_counter()
+                sortie = executer_pipeline(processus=False)
+                duree = time.perf_counter() - debut
+            etapes = set(sortie["chronologie"]["etape"])
+            repli = {"lecture_SDG3", "lecture_SDG_GPW", "lecture_PIB"} <= etapes
+            fusion = sortie["fusion_niveau_richesse"]
+            cles = set(fusion["Pays_code_iso3"].dropna())
+            if reference is None:
+                reference = (len(fusion), cles)
+            resultats.append({"scenario": nom, "facteur": 1, "duree_s": round(duree, 4),
+                              "lignes": len(fusion), "lignes_reference": reference[0],
+                              "requetes": serveur.statistiques["requetes"], "octets": serveur.statistiques["octets"],
+                              "ok": repli == bool(options) and len(fusion) > 0
+                                    and (len(fusion), cles) == reference})
+    return resultats
+
+
+def _chronometrer(fonction):
+    debut = time.perf_counter()
+    fonction()
+    return time.perf_counter() - debut
+
+
+BENCHMARKS = {
+    "imports": benchmark_imports,
+    "instrumentation": benchmark_instrumentation,
+    "memoire_partagee": benchmark_memoire_partagee,
+    "cartes": benchmark_cartes,
+    "rapport": benchmark_rapport,
+    "api": benchmark_api,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m Scripts.benchmarks")
+    parser.add_argument("benchmark", nargs="?", default="imports", choices=BENCHMARKS)
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    resultats = BENCHMARKS[args.benchmark](repetitions=args.repetitions)
+    for res in resultats:
+        print(json.dumps(res, ensure_ascii=False))
+
+    # Code de retour non nul si un budget est dépassé
+    return 0 if all(res.get("ok", True) for res in resultats) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
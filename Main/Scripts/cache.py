@@ -0,0 +1,77 @@
+"""
+Outils communs aux caches sur disque : empreinte du contenu des données et dossier de cache.
+
+Le dossier par défaut est Main/.cache ; il peut être déplacé avec la variable
+d'environnement SCRIPTS_CACHE.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .chemins import DOSSIER_MAIN
+
+
+def dossier_cache(nom):
+    """
+    Renvoie (et crée si besoin) le sous-dossier de cache d'une fonctionnalité.
+
+    Paramètres
+    ----------
+    nom : str
+        Nom du sous-dossier (ex. "clustering").
+
+    Sortie
+    ------
+    pathlib.Path
+        Chemin du dossier.
+    """
+
+    racine = Path(os.environ.get("SCRIPTS_CACHE", DOSSIER_MAIN / ".cache"))
+    dossier = racine / nom
+    dossier.mkdir(parents=True, exist_ok=True)
+    return dossier
+
+
+def _mettre_a_jour(h, objet):
+    if isinstance(objet, pd.DataFrame):
+        h.update(json.dumps([str(c) for c in objet.columns]).encode())
+        h.update(json.dumps([str(t) for t in objet.dtypes]).encode())
+        h.update(pd.util.hash_pandas_object(objet, index=True).to_numpy().tobytes())
+    elif isinstance(objet, pd.Series):
+        h.update(str(objet.name).encode() + str(objet.dtype).encode())
+        h.update(pd.util.hash_pandas_object(objet, index=True).to_numpy().tobytes())
+    elif isinstance(objet, np.ndarray):
+        h.update(str(objet.dtype).encode() + str(objet.shape).encode())
+        h.update(np.ascontiguousarray(objet).tobytes())
+    else:
+        h.update(json.dumps(objet, sort_keys=True, default=repr, ensure_ascii=False).encode())
+
+
+def empreinte(*objets):
+    """
+    Calcule une empreinte SHA-256 du contenu de plusieurs objets.
+
+    Les DataFrames et séries sont hachés par leurs valeurs, index, noms de colonnes et types ;
+    les tableaux NumPy par leurs octets ; les autres objets par leur représentation JSON.
+
+    Paramètres
+    ----------
+    *objets
+        DataFrames, séries, tableaux NumPy ou objets sérialisables (paramètres d'un calcul).
+
+    Sortie
+    ------
+    str
+        Empreinte hexadécimale.
+    """
+
+    h = hashlib.sha256()
+    for objet in objets:
+        _mettre_a_jour(h, objet)
+        h.update(b"\x00")
+    return h.hexdigest()
@@ -0,0 +1,193 @@
+"""
+Cache des régressions et registre de spécifications.
+
+Une spécification décrit un modèle : variable dépendante, régresseurs, année de PIB et type
+de covariance. Le résultat d'un ajustement est identifié par l'empreinte des colonnes utilisées
+et de la spécification. Seuls les paramètres estimés (coefficients, matrice de covariance
+normalisée, variance résiduelle, pseudo-inverse des régresseurs) sont conservés, en mémoire (les
+plus récents) et sur disque, dans .cache/regressions, avec éviction des entrées les moins
+récemment utilisées. Ils suffisent à reconstruire, sans réajuster, un véritable objet de résultats
+statsmodels (resid, tvalues, conf_int(), get_prediction(), summary() daté du jour, ...).
+"""
+
+import os
+import pickle
+from collections import OrderedDict
+
+import numpy as np
+
+from .cache import dossier_cache, empreinte
+from .instrumentation import mesurer
+
+# Régresseur ou variable dépendante désignant le log du PIB par habitant de l'année de la spécification
+LOG_PIB = "log_PIB"
+
+# Nombre de résultats gardés en mémoire et sur disque
+TAILLE_MEMOIRE = 64
+TAILLE_DISQUE = 512
+
+# Version du contenu des fichiers du cache (entre dans l'empreinte)
+FORMAT_CACHE = 2
+
+# Spécifications nommées (voir enregistrer_specification)
+SPECIFICATIONS = {}
+
+_MEMOIRE = OrderedDict()
+
+
+def specification(annee_pib, regresseurs, dependante=LOG_PIB, cov_type="HC1"):
+    """
+    Construit la spécification d'un modèle.
+
+    Paramètres
+    ----------
+    annee_pib : str
+        Année du PIB par habitant.
+    regresseurs : list
+        Variables explicatives ; LOG_PIB désigne le log du PIB de annee_pib.
+    dependante : str, optional
+        Variable expliquée (par défaut LOG_PIB ; un indicateur pour expliquer la santé par le PIB).
+    cov_type : str, optional
+        Type de covariance statsmodels (par défaut "HC1").
+
+    Sortie
+    ------
+    dict
+        Spécification (hachable par cache.empreinte).
+    """
+
+    return {"dependante": dependante, "regresseurs": list(regresseurs), "annee_pib": str(annee_pib),
+            "cov_type": cov_type}
+
+
+def enregistrer_specification(nom, annee_pib, regresseurs, dependante=LOG_PIB, cov_type="HC1"):
+    """
+    Enregistre une spécification sous un nom, pour la réutiliser avec ajuster(df, nom).
+    """
+
+    SPECIFICATIONS[nom] = specification(annee_pib, regresseurs, dependante, cov_type)
+    return SPECIFICATIONS[nom]
+
+
+def _colonnes(spec):
+    variables = [spec["dependante"]] + spec["regresseurs"]
+    return [spec["annee_pib"]] + [v for v in variables if v != LOG_PIB]
+
+
+def donnees_regression(df, spec):
+    """
+    Filtre la table pour une spécification : lignes complètes, PIB strictement positif et
+    colonne LOG_PIB ajoutée.
+    """
+
+    df_reg = df.dropna(subset=_colonnes(spec))
+    df_reg = df_reg[df_reg[spec["annee_pib"]] > 0].copy()
+    df_reg[LOG_PIB] = np.log(df_reg[spec["annee_pib"]])
+    return df_reg
+
+
+def _modele_ols(df_reg, spec):
+    import statsmodels.api as sm
+
+    return sm.OLS(df_reg[spec["dependante"]], sm.add_constant(df_reg[spec["regresseurs"]]))
+
+
+def _parametres(resultats):
+    # Estimations suffisant à reconstruire l'objet de résultats sans réajuster le modèle
+    return {"params": np.asarray(resultats.params), "normalized_cov_params": np.asarray(resultats.normalized_cov_params),
+            "scale": float(resultats.scale), "pinv_wexog": resultats.model.pinv_wexog}
+
+
+def _reconstruire(df_reg, spec, parametres):
+    from statsmodels.regression.linear_model import OLSResults, RegressionResultsWrapper
+
+    modele = _modele_ols(df_reg, spec)
+    modele.pinv_wexog = parametres["pinv_wexog"]
+    # La covariance robuste (cov_type) est recalculée à partir des résidus, sans nouvel ajustement
+    return RegressionResultsWrapper(OLSResults(modele, parametres["params"],
+                                               normalized_cov_params=parametres["normalized_cov_params"],
+                                               scale=parametres["scale"], cov_type=spec["cov_type"]))
+
+
+def _ajuster_ols(df_reg, spec):
+    return _modele_ols(df_reg, spec).fit(cov_type=spec["cov_type"])
+
+
+def _lire(fichier):
+    with open(fichier, "rb") as f:
+        parametres = pickle.load(f)
+    os.utime(fichier)  # date de dernier usage pour l'éviction
+    return parametres
+
+
+def _ecrire(fichier, parametres):
+    with open(fichier, "wb") as f:
+        pickle.dump(parametres, f)
+
+    # Éviction des entrées les moins récemment utilisées
+    entrees = sorted(fichier.parent.glob("*.pkl"), key=lambda p: p.stat().st_mtime)
+    for ancien in entrees[:max(len(entrees) - TAILLE_DISQUE, 0)]:
+        ancien.unlink(missing_ok=True)
+
+
+def _memoriser(cle, parametres):
+    _MEMOIRE[cle] = parametres
+    _MEMOIRE.move_to_end(cle)
+    while len(_MEMOIRE) > TAILLE_MEMOIRE:
+        _MEMOIRE.popitem(last=False)
+
+
+@mesurer()
+def ajuster(df, spec, cache=True):
+    """
+    Ajuste (ou relit dans le cache) la régression OLS décrite par une spécification.
+
+    Paramètres
+    ----------
+    df : pandas.DataFrame
+        Table contenant les colonnes de la spécification (ex. table fusionnée).
+    spec : dict ou str
+        Spécification (voir specification) ou nom d'une spécification enregistrée.
+    cache : bool, optional
+        Réutilise un résultat déjà calculé pour les mêmes colonnes et la même spécification
+        (par défaut True).
+
+    Sortie
+    ------
+    tuple
+        (resultat, df_reg) : résultats statsmodels (RegressionResultsWrapper) et table filtrée
+        utilisée pour l'ajustement.
+    """
+
+    if isinstance(spec, str):
+        spec = SPECIFICATIONS[spec]
+
+    df_reg = donnees_regression(df, spec)
+    if not cache:
+        return _ajuster_ols(df_reg, spec), df_reg
+
+    cle = empreinte(df[_colonnes(spec)], spec, FORMAT_CACHE)
+    if cle in _MEMOIRE:
+        _MEMOIRE.move_to_end(cle)
+        return _reconstruire(df_reg, spec, _MEMOIRE[cle]), df_reg
+
+    fichier = dossier_cache("regressions") / f"{cle}.pkl"
+    if fichier.exists():
+        parametres = _lire(fichier)
+        resultat = _reconstruire(df_reg, spec, parametres)
+    else:
+        resultat = _ajuster_ols(df_reg, spec)
+        parametres = _parametres(resultat)
+        _ecrire(fichier, parametres)
+    _memoriser(cle, parametres)
+    return resultat, df_reg
+
+
+def vider_cache():
+    """
+    Supprime les résultats de régression gardés en mémoire et sur disque.
+    """
+
+    _MEMOIRE.clear()
+    for fichier in dossier_cache("regressions").glob("*.pkl"):
+        fichier.unlink(missing_ok=True)
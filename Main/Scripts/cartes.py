@@ -0,0 +1,353 @@
+"""
+Cartes statiques (PNG) des indicateurs par pays, sans navigateur ni plotly.
+
+La couche des pays Natural Earth (GeoJSON, domaine public) est lue une seule fois par
+processus ; les contours extérieurs de chaque pays sont projetés (projection Natural Earth,
+comme les cartes plotly de world_map) et mis en cache sur disque, indexés par code ISO3.
+Chaque carte colore ensuite ces polygones déjà projetés dans une PolyCollection matplotlib
+rendue par le moteur Agg.
+"""
+
+import io
+import json
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache import dossier_cache, empreinte
+from .chemins import FICHIER_PAYS
+from .instrumentation import mesurer
+
+# Couleur des pays sans valeur
+COULEUR_MANQUANTE = "#d9d9d9"
+
+# Version du contenu de la couche mise en cache (entre dans l'empreinte)
+FORMAT_COUCHE = 2
+
+# Couche projetée chargée dans le processus courant : (chemin, couche)
+_COUCHE = None
+
+# Figures de carte simple déjà construites, par taille d'image : seules les couleurs changent d'une carte à l'autre
+_GABARITS = {}
+
+
+def projection_natural_earth(lon, lat):
+    """
+    Projette des longitudes et latitudes (degrés) selon la projection Natural Earth
+    (Šavrič et al., 2011).
+    """
+
+    lam, phi = np.radians(lon), np.radians(lat)
+    phi2 = phi ** 2
+    phi4 = phi2 ** 2
+    x = lam * (0.870700 - 0.131979 * phi2 + phi4 * (-0.013791 + phi4 * (0.003971 * phi2 - 0.001529 * phi4)))
+    y = phi * (1.007226 + phi2 * (0.015085 + phi4 * (-0.044475 + 0.028874 * phi2 - 0.005916 * phi4)))
+    return x, y
+
+
+def _code_iso3(proprietes):
+    # ISO_A3 vaut "-99" pour quelques pays (ex. France, Norvège) dans Natural Earth
+    for cle in ("ISO_A3", "ISO_A3_EH", "ADM0_A3"):
+        code = proprietes.get(cle)
+        if code and code != "-99":
+            return code
+    return None
+
+
+def _centre_polygone(lon_lat):
+    # Centroïde d'un polygone (les polygones Natural Earth sont coupés à l'antiméridien) en vecteur
+    # unitaire 3-D, pondéré par sa surface approchée sur la sphère
+    lon, lat = lon_lat[:, 0], lon_lat[:, 1]
+    lon1, lat1 = np.roll(lon, -1), np.roll(lat, -1)
+    produit = lon * lat1 - lon1 * lat
+    aire = produit.sum() / 2
+    if aire == 0:
+        return np.zeros(3)
+    c_lon, c_lat = np.radians([((lon + lon1) * produit).sum() / (6 * aire), ((lat + lat1) * produit).sum() / (6 * aire)])
+    poids = abs(aire) * np.cos(c_lat)
+    return poids * np.array([np.cos(c_lat) * np.cos(c_lon), np.cos(c_lat) * np.sin(c_lon), np.sin(c_lat)])
+
+
+def _lire_couche(chemin, exclure):
+    with open(chemin, encoding="utf-8") as f:
+        entites = json.load(f)["features"]
+
+    codes, polygones, pays, centres = [], [], [], []
+    for entite in entites:
+        code = _code_iso3(entite["properties"])
+        geometrie = entite["geometry"]
+        if code is None or code in exclure or geometrie is None:
+            continue
+        if geometrie["type"] == "Polygon":
+            parties = [geometrie["coordinates"]]
+        elif geometrie["type"] == "MultiPolygon":
+            parties = geometrie["coordinates"]
+        else:
+            continue
+        centre = np.zeros(3)
+        for anneaux in parties:
+            # Contour extérieur seulement : les trous sont négligeables à cette échelle
+            lon_lat = np.asarray(anneaux[0], dtype="float64")
+            x, y = projection_natural_earth(lon_lat[:, 0], lon_lat[:, 1])
+            polygones.append(np.column_stack([x, y]).astype("float32"))
+            pays.append(len(codes))
+            # Centre du pays : celui de sa plus grande partie (ex. France métropolitaine, sans la Guyane)
+            centre_partie = _centre_polygone(lon_lat)
+            if np.linalg.norm(centre_partie) > np.linalg.norm(centre):
+                centre = centre_partie
+        codes.append(code)
+        centres.append(centre / (np.linalg.norm(centre) or 1.0))
+
+    points = np.concatenate(polygones)
+    return {
+        "codes": np.array(codes),
+        "centres": np.array(centres),
+        "polygones": polygones,
+        "pays": np.array(pays, dtype=np.int32),
+        "limites": (float(points[:, 0].min()), float(points[:, 0].max()),
+                    float(points[:, 1].min()), float(points[:, 1].max())),
+    }
+
+
+def charger_couche(chemin=None, exclure=("ATA",), cache=True):
+    """
+    Charge la couche des pays projetée (une seule lecture par processus).
+
+    Paramètres
+    ----------
+    chemin : str ou pathlib.Path, optional
+        Fichier GeoJSON Natural Earth des pays (par défaut chemins.FICHIER_PAYS).
+    exclure : tuple, optional
+        Codes ISO3 écartés (par défaut l'Antarctique, absent des cartes plotly).
+    cache : bool, optional
+        Relit les polygones déjà projetés sur disque (par défaut True).
+
+    Sortie
+    ------
+    dict
+        codes (ISO3 des pays), centres (centroïde de la plus grande partie de chaque pays en
+        vecteur unitaire 3-D, pour les distances sur la sphère), polygones (contours projetés), pays (indice du pays de chaque
+        polygone) et limites (xmin, xmax, ymin, ymax).
+    """
+
+    global _COUCHE
+
+    chemin = Path(FICHIER_PAYS if chemin is None else chemin)
+    if _COUCHE is not None and _COUCHE[0] == (str(chemin), tuple(exclure)):
+        return _COUCHE[1]
+
+    if not chemin.exists():
+        raise FileNotFoundError(f"Couche des pays introuvable : {chemin}. La couche fournie avec le projet est "
+                                "Main/Données_cartes/ne_110m_admin_0_countries.geojson (Natural Earth).")
+
+    fichier = None
+    if cache:
+        infos = chemin.stat()
+        cle = empreinte([str(chemin), infos.st_size, infos.st_mtime_ns, list(exclure), FORMAT_COUCHE])
+        fichier = dossier_cache("cartes") / f"{cle}.pkl"
+
+    if fichier is not None and fichier.exists():
+        with open(fichier, "rb") as f:
+            couche = pickle.load(f)
+    else:
+        couche = _lire_couche(chemin, set(exclure))
+        if fichier is not None:
+            with open(fichier, "wb") as f:
+                pickle.dump(couche, f)
+
+    _COUCHE = ((str(chemin), tuple(exclure)), couche)
+    return couche
+
+
+def _valeurs_par_pays(df, colonne, code_col):
+    serie = pd.Series(df[colonne].to_numpy(dtype="float64", na_value=np.nan), index=df[code_col].astype(str))
+    return serie[~serie.index.duplicated()]
+
+
+def _couleurs(couche, valeurs, cmap, norme):
+    from matplotlib.colors import to_rgba
+
+    # Valeur de chaque pays de la couche, puis de chaque polygone
+    v = valeurs.reindex(couche["codes"]).to_numpy()[couche["pays"]]
+    couleurs = cmap(norme(np.nan_to_num(v)))
+    couleurs[np.isnan(v)] = to_rgba(COULEUR_MANQUANTE)
+    return couleurs
+
+
+def _dessiner(ax, couche, couleurs=None):
+    from matplotlib.collections import PolyCollection
+
+    collection = ax.add_collection(PolyCollection(couche["polygones"], facecolors=couleurs,
+                                                  edgecolors="black", linewidths=0.2))
+    xmin, xmax, ymin, ymax = couche["limites"]
+    ax.set_xlim(xmin, xmax)
+    ax.set_ylim(ymin, ymax)
+    ax.set_aspect("equal")
+    ax.set_axis_off()
+    return collection
+
+
+def _gabarit(couche, largeur, hauteur, dpi):
+    from matplotlib.figure import Figure
+
+    cle = (largeur, hauteur, dpi)
+    if cle not in _GABARITS or _GABARITS[cle][0] is not couche:
+        figure = Figure(figsize=(largeur / dpi, hauteur / dpi), dpi=dpi)
+        ax = figure.add_axes((0.0, 0.0, 0.9, 0.92))
+        collection = _dessiner(ax, couche)
+        mappable = _mappable("turbo", None)
+        figure.colorbar(mappable, cax=figure.add_axes((0.91, 0.15, 0.02, 0.7)))
+        _GABARITS[cle] = (couche, figure, collection, mappable, ax.set_title("", fontsize=11))
+    return _GABARITS[cle][1:]
+
+
+def _png(figure, fichier):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from PIL import Image
+
+    # Un seul rendu, puis compression PNG rapide : l'encodage par défaut coûte autant que le rendu
+    canevas = FigureCanvasAgg(figure)
+    canevas.draw()
+    tampon = io.BytesIO()
+    Image.frombuffer("RGBA", canevas.get_width_height(), canevas.buffer_rgba()).save(
+        tampon, format="png", compress_level=1)
+    contenu = tampon.getvalue()
+    if fichier is not None:
+        with open(fichier, "wb") as f:
+            f.write(contenu)
+    return contenu
+
+
+@mesurer()
+def carte_statique(df, colonne, fichier=None, code_col="Pays_code_iso3", titre=None, cmap="turbo",
+                   vmin=None, vmax=None, largeur=900, hauteur=500, dpi=100, couche=None):
+    """
+    Dessine la carte du monde d'un indicateur et la renvoie au format PNG.
+
+    Paramètres
+    ----------
+    df : pandas.DataFrame
+        Table avec une ligne par pays (ex. table fusionnée).
+    colonne : str
+        Colonne à représenter.
+    fichier : str ou pathlib.Path, optional
+        Fichier PNG à écrire (par défaut, aucun).
+    code_col : str, optional
+        Colonne des codes pays ISO3 (par défaut "Pays_code_iso3").
+    titre : str, optional
+        Titre de la carte (par défaut, colonne).
+    cmap : str, optional
+        Palette matplotlib (par défaut "turbo", comme world_map).
+    vmin, vmax : float, optional
+        Bornes de l'échelle de couleurs (par défaut, minimum et maximum de la colonne).
+    largeur, hauteur : int, optional
+        Taille de l'image en pixels (par défaut 900 × 500).
+    dpi : int, optional
+        Résolution (par défaut 100).
+    couche : dict, optional
+        Couche renvoyée par charger_couche (par défaut, la couche Natural Earth du projet).
+
+    Sortie
+    ------
+    bytes
+        Image PNG.
+    """
+
+    from matplotlib import colormaps
+    from matplotlib.colors import Normalize
+
+    couche = charger_couche() if couche is None else couche
+    valeurs = _valeurs_par_pays(df, colonne, code_col)
+    norme = Normalize(vmin=valeurs.min() if vmin is None else vmin, vmax=valeurs.max() if vmax is None else vmax)
+    palette = colormaps[cmap]
+
+    figure, collection, mappable, titre_carte = _gabarit(couche, largeur, hauteur, dpi)
+    collection.set_facecolor(_couleurs(couche, valeurs, palette, norme))
+    mappable.set_cmap(palette)
+    mappable.set_norm(norme)
+    titre_carte.set_text(titre if titre else colonne)
+    return _png(figure, fichier)
+
+
+def _mappable(palette, norme):
+    from matplotlib.cm import ScalarMappable
+
+    return ScalarMappable(norm=norme, cmap=palette)
+
+
+@mesurer()
+def grille_cartes(df, colonnes, fichier=None, code_col="Pays_code_iso3", titres=None, ncol=3,
+                  echelle_commune=False, cmap="turbo", largeur_carte=450, hauteur_carte=250, dpi=100,
+                  couche=None):
+    """
+    Dessine une grille de petites cartes (plusieurs indicateurs, ou un indicateur sur plusieurs
+    années) dans une seule image PNG.
+
+    Paramètres
+    ----------
+    df : pandas.DataFrame
+        Table avec une ligne par pays.
+    colonnes : list
+        Colonnes à représenter, une carte chacune (ex. ["2015", ..., "2024"]).
+    fichier : str ou pathlib.Path, optional
+        Fichier PNG à écrire (par défaut, aucun).
+    code_col : str, optional
+        Colonne des codes pays ISO3 (par défaut "Pays_code_iso3").
+    titres : list, optional
+        Titres des cartes (par défaut, les noms de colonnes).
+    ncol : int, optional
+        Nombre de cartes par ligne (par défaut 3).
+    echelle_commune : bool, optional
+        Même échelle de couleurs pour toutes les cartes, ex. pour comparer des années
+        (par défaut False : une échelle par carte).
+    cmap : str, optional
+        Palette matplotlib (par défaut "turbo").
+    largeur_carte, hauteur_carte : int, optional
+        Taille de chaque carte en pixels (par défaut 450 × 250).
+    dpi : int, optional
+        Résolution (par défaut 100).
+    couche : dict, optional
+        Couche renvoyée par charger_couche.
+
+    Sortie
+    ------
+    bytes
+        Image PNG.
+    """
+
+    from matplotlib import colormaps
+    from matplotlib.colors import Normalize
+    from matplotlib.figure import Figure
+    from mpl_toolkits.axes_grid1 import make_axes_locatable
+
+    couche = charger_couche() if couche is None else couche
+    colonnes = list(colonnes)
+    titres = colonnes if titres is None else list(titres)
+    palette = colormaps[cmap]
+    nlig = -(-len(colonnes) // ncol)
+
+    valeurs = [_valeurs_par_pays(df, c, code_col) for c in colonnes]
+    if echelle_commune:
+        commune = Normalize(vmin=min(v.min() for v in valeurs), vmax=max(v.max() for v in valeurs))
+
+    figure = Figure(figsize=(ncol * largeur_carte / dpi, nlig * hauteur_carte / dpi), dpi=dpi)
+    axes = figure.subplots(nlig, ncol, squeeze=False).ravel()
+    # Avec une échelle par carte, l'espace entre colonnes accueille les graduations de chaque barre
+    figure.subplots_adjust(left=0.01, right=0.95 if echelle_commune else 0.93, bottom=0.01, top=0.95,
+                           wspace=0.05 if echelle_commune else 0.3, hspace=0.15)
+    for ax, v, titre in zip(axes, valeurs, titres):
+        norme = commune if echelle_commune else Normalize(vmin=v.min(), vmax=v.max())
+        _dessiner(ax, couche, _couleurs(couche, v, palette, norme))
+        ax.set_title(str(titre), fontsize=9)
+        if not echelle_commune:
+            # Barre accolée à sa carte, prise sur la largeur de celle-ci
+            cax = make_axes_locatable(ax).append_axes("right", size="3%", pad=0.05)
+            figure.colorbar(_mappable(palette, norme), cax=cax).ax.tick_params(labelsize=7)
+    for ax in axes[len(colonnes):]:
+        ax.set_axis_off()
+    if echelle_commune:
+        figure.colorbar(_mappable(palette, commune), ax=list(axes), fraction=0.02, pad=0.01)
+
+    return _png(figure, fichier)
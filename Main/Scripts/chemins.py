@@ -0,0 +1,31 @@
+from pathlib import Path
+
+# Dossier Main, point de départ de toutes les sauvegardes locales
+DOSSIER_MAIN = Path(__file__).resolve().parent.parent
+
+# Sauvegardes locales des sources
+FICHIERS_OMS = {
+    "SDG3": DOSSIER_MAIN / "Données_OMS" / "WHO_SDG3_standardisé_avec_code_pays_complet.csv",
+    "SDG_GPW": DOSSIER_MAIN / "Données_OMS" / "WHO_SDG_GPW_standardisé_avec_code_pays_complet.csv",
+}
+FICHIER_PIB = DOSSIER_MAIN / "Données_PIB" / "Données_PIB_habitant_2015_2024.csv"
+FICHIER_IHME = DOSSIER_MAIN / "Données_IHME" / "IHME_Mental_Health_2021.csv"
+FICHIER_IHME_LARGE = DOSSIER_MAIN / "Données_IHME" / "IHME_Mental_Health_WIDE.csv"
+FICHIER_NIVEAU_RICHESSE = DOSSIER_MAIN / "Données Income group" / "Données_niveau_richesse.csv"
+
+# Contours des pays Natural Earth 1:110m (GeoJSON, domaine public), pour les cartes statiques :
+# ne_110m_admin_0_countries réduit aux colonnes NAME, ISO_A3 et CONTINENT (codes -99 corrigés)
+FICHIER_PAYS = DOSSIER_MAIN / "Données_cartes" / "ne_110m_admin_0_countries.geojson"
+
+# Tables fusionnées
+FICHIER_FUSION = DOSSIER_MAIN / "Données_fusionnées" / "Table_fusion.csv"
+FICHIER_FUSION_GROUPE = DOSSIER_MAIN / "Données_fusionnées" / "Table_fusion_income_groupe.csv"
+
+# Tables fusionnées reconstruites par `python -m Scripts fuse`, sans écraser les tables ci-dessus
+DOSSIER_SORTIES = DOSSIER_MAIN / "Sorties"
+
+# Rapport HTML statique (rapport.py) : page et ressources externes
+DOSSIER_RAPPORT = DOSSIER_MAIN / "Rapport"
+
+# Réponses enregistrées des API (OMS, Banque mondiale) pour le serveur de rejeu (rejeu.py)
+DOSSIER_FIXTURES = DOSSIER_MAIN / "Fixtures_API"
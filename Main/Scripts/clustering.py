@@ -0,0 +1,167 @@
+"""
+Regroupement des pays selon leur trajectoire de PIB par habitant 2015-2024, éventuellement
+complétée par leurs indicateurs de santé.
+
+Chaque trajectoire est standardisée, puis MiniBatchKMeans est ajusté pour une plage de
+nombres de groupes k, en parallèle, et le k retenu est celui de meilleur score de
+silhouette. Les étiquettes sont mises en cache selon l'empreinte des données et des
+paramètres.
+"""
+
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .cache import dossier_cache, empreinte
+from .instrumentation import mesurer
+
+
+def matrice_trajectoires(df, annees=None, indicateurs=None, mode="forme"):
+    """
+    Construit la matrice standardisée des trajectoires de PIB (une ligne par pays).
+
+    Les années manquantes sont interpolées linéairement le long de chaque trajectoire
+    (valeur la plus proche aux extrémités) ; les pays sans aucune valeur de PIB sont écartés.
+
+    Paramètres
+    ----------
+    df : pandas.DataFrame
+        Table au format large avec une colonne par année de PIB ("2015", ..., "2024").
+    annees : list, optional
+        Colonnes années à utiliser (par défaut, toutes les colonnes dont le nom est une année).
+    indicateurs : list, optional
+        Indicateurs de santé ajoutés à la trajectoire (centrés-réduits, NaN remplacés par la moyenne).
+    mode : str, optional
+        "forme" : chaque trajectoire de log PIB est centrée-réduite (seule l'évolution compte) ;
+        "niveau" : chaque année de log PIB est centrée-réduite sur l'ensemble des pays
+        (le niveau de richesse compte). Par défaut "forme".
+
+    Sortie
+    ------
+    tuple
+        (X, index) : matrice float32 (pays × variables) et index des lignes de df retenues.
+    """
+
+    annees = [c for c in df.columns if str(c).isdigit()] if annees is None else [str(a) for a in annees]
+
+    pib = df[annees].astype("float64")
+    pib = pib.where(pib > 0)
+    pib = pib[pib.notna().any(axis=1)]
+    log_pib = np.log(pib).interpolate(axis=1, limit_direction="both").to_numpy()
+
+    if mode == "forme":
+        ecart = log_pib.std(axis=1, keepdims=True)
+        X = (log_pib - log_pib.mean(axis=1, keepdims=True)) / np.where(ecart > 0, ecart, 1.0)
+    elif mode == "niveau":
+        ecart = log_pib.std(axis=0)
+        X = (log_pib - log_pib.mean(axis=0)) / np.where(ecart > 0, ecart, 1.0)
+    else:
+        raise ValueError("Mode invalide : choisir 'forme' ou 'niveau'")
+
+    if indicateurs:
+        sante = df.loc[pib.index, list(indicateurs)].astype("float64")
+        sante = ((sante - sante.mean()) / sante.std()).fillna(0.0).to_numpy()
+        X = np.hstack([X, sante])
+
+    return X.astype("float32"), pib.index
+
+
+def _evaluer_k(tache):
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.metrics import silhouette_score
+
+    X, k, graine, taille_echantillon = tache
+    modele = MiniBatchKMeans(n_clusters=k, random_state=graine, n_init=3,
+                             batch_size=min(4096, len(X))).fit(X)
+    silhouette = silhouette_score(X, modele.labels_, sample_size=min(len(X), taille_echantillon),
+                                  random_state=graine)
+    return k, modele.labels_, float(modele.inertia_), float(silhouette)
+
+
+@mesurer()
+def clustering_trajectoires(df, ks=range(2, 9), annees=None, indicateurs=None, mode="forme",
+                            graine=0, taille_echantillon=5000, n_jobs=None, cache=True):
+    """
+    Regroupe les pays selon leur trajectoire de PIB par habitant (et leurs indicateurs de santé).
+
+    Paramètres
+    ----------
+    df : pandas.DataFrame
+        Table au format large (ex. table fusionnée ou PIB de get_gdp_per_capita_wide).
+    ks : iterable, optional
+        Nombres de groupes essayés (par défaut 2 à 8).
+    annees, indicateurs, mode
+        Voir matrice_trajectoires.
+    graine : int, optional
+        Graine aléatoire de MiniBatchKMeans et de l'échantillon de silhouette (par défaut 0).
+    taille_echantillon : int, optional
+        Nombre maximal de lignes utilisées pour le score de silhouette (par défaut 5 000).
+    n_jobs : int, optional
+        Nombre de processus ; 1 pour tout calculer dans le processus courant
+        (par défaut, nombre de processeurs).
+    cache : bool, optional
+        Réutilise les étiquettes déjà calculées pour les mêmes données et paramètres (par défaut True).
+
+    Sortie
+    ------
+    tuple
+        (etiquettes, scores) : série des groupes (1 à k) alignée sur df, NaN pour les pays sans
+        PIB, pour le k de meilleure silhouette ; DataFrame k | silhouette | inertie.
+    """
+
+    ks = list(ks)
+    X, index = matrice_trajectoires(df, annees, indicateurs, mode)
+
+    fichier = None
+    if cache:
+        cle = empreinte(X, np.asarray(index), [ks, graine, taille_echantillon])
+        fichier = dossier_cache("clustering") / f"{cle}.pkl"
+        if fichier.exists():
+            with open(fichier, "rb") as f:
+                etiquettes, scores = pickle.load(f)
+            return etiquettes.reindex(df.index), scores
+
+    taches = [(X, k, graine, taille_echantillon) for k in ks]
+    if n_jobs == 1 or len(taches) <= 1:
+        resultats = [_evaluer_k(t) for t in taches]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            resultats = list(pool.map(_evaluer_k, taches))
+
+    scores = pd.DataFrame([(k, s, i) for k, _, i, s in resultats], columns=["k", "silhouette", "inertie"])
+    _, labels, _, _ = max(resultats, key=lambda r: r[3])
+    etiquettes = pd.Series(labels + 1, index=index, name="Cluster")
+
+    if fichier is not None:
+        with open(fichier, "wb") as f:
+            pickle.dump((etiquettes, scores), f)
+
+    return etiquettes.reindex(df.index), scores
+
+
+def ajouter_clusters(df, etiquettes, colonne="Cluster"):
+    """
+    Ajoute les groupes à une table, sous forme catégorielle ("Cluster 1", "Cluster 2", ...),
+    pour les graphiques en barres de afficher_graphiques (paramètre groupe).
+
+    Paramètres
+    ----------
+    df : pandas.DataFrame
+        Table sur laquelle le clustering a été calculé.
+    etiquettes : pandas.Series
+        Étiquettes renvoyées par clustering_trajectoires.
+    colonne : str, optional
+        Nom de la colonne ajoutée (par défaut "Cluster").
+
+    Sortie
+    ------
+    pandas.DataFrame
+        Copie de df avec la colonne des groupes.
+    """
+
+    df = df.copy()
+    libelles = etiquettes.map(lambda e: f"Cluster {int(e)}" if pd.notna(e) else None)
+    df[colonne] = pd.Categorical(libelles, categories=[f"Cluster {k}" for k in sorted(etiquettes.dropna().unique().astype(int))])
+    return df
@@ -0,0 +1,125 @@
+import pandas as pd
+
+from .normalisation import normaliser_types
+from .instrumentation import mesurer
+
+
+@mesurer()
+def fusion_oms(df_gpw, df_sdg3):
+    """
+    Fusionne les deux groupes d'indicateurs de l'OMS (SDG_GPW et SDG3).
+
+    Paramètres
+    ----------
+    df_gpw : pandas.DataFrame
+        Indicateurs SDG_GPW avec les colonnes LOCATION et Pays_code_iso3.
+    df_sdg3 : pandas.DataFrame
+        Indicateurs SDG3 avec les colonnes LOCATION et Pays_code_iso3.
+
+    Sortie
+    ------
+    pandas.DataFrame
+        Jointure interne des deux tables sur LOCATION et Pays_code_iso3, et sur LOCATION_ID
+        lorsque les deux tables viennent d'un index de localisations (régions, infranational).
+    """
+
+    keys_oms = ['LOCATION', 'Pays_code_iso3']
+    if 'LOCATION_ID' in df_gpw.columns and 'LOCATION_ID' in df_sdg3.columns:
+        keys_oms = keys_oms + ['LOCATION_ID', 'LOCATION_CODE', 'LOCATION_TYPE_CODE']
+
+    # Vérification de la présence des clés dans les deux tables
+    missing_keys = [k for k in keys_oms if k not in df_gpw.columns or k not in df_sdg3.columns]
+    if missing_keys:
+        raise KeyError(f"Colonnes clés absentes : {missing_keys}")
+
+    return normaliser_types(pd.merge(df_gpw, df_sdg3, on=keys_oms, how='inner'))
+
+
+@mesurer()
+def fusion_ihme(df_fusion_oms, df_ihme):
+    """
+    Ajoute les indicateurs de santé mentale de l'IHME aux données de l'OMS.
+
+    Paramètres
+    ----------
+    df_fusion_oms : pandas.DataFrame
+        Table renvoyée par fusion_oms.
+    df_ihme : pandas.DataFrame
+        Indicateurs IHME avec une colonne LOCATION.
+
+    Sortie
+    ------
+    pandas.DataFrame
+        Jointure interne des deux tables sur LOCATION.
+    """
+
+    return normaliser_types(pd.merge(df_fusion_oms, df_ihme, on='LOCATION', how='inner'))
+
+
+@mesurer()
+def fusion_pib(df_fusion_health, df_pib):
+    """
+    Ajoute le PIB par habitant (format large) aux indicateurs de santé.
+
+    Paramètres
+    ----------
+    df_fusion_health : pandas.DataFrame
+        Table contenant la colonne Pays_code_iso3.
+    df_pib : pandas.DataFrame
+        PIB par habitant au format large (Country Name | Country Code | 2015 | ... | 2024).
+
+    Sortie
+    ------
+    pandas.DataFrame
+        Table fusionnée, sans les colonnes Country Name et Country Code.
+    """
+
+    df_final = pd.merge(df_fusion_health, df_pib, left_on='Pays_code_iso3', right_on='Country Code', how='inner')
+    return normaliser_types(df_final.drop(['Country Name', 'Country Code'], axis=1))
+
+
+@mesurer()
+def fusion_niveau_richesse(df_final, df_income_group):
+    """
+    Ajoute le groupe de revenu de la Banque mondiale à la table fusionnée.
+
+    Paramètres
+    ----------
+    df_final : pandas.DataFrame
+        Table renvoyée par fusion_pib.
+    df_income_group : pandas.DataFrame
+        Table Country Name | Country Code | IncomeGroup.
+
+    Sortie
+    ------
+    pandas.DataFrame
+        Table fusionnée avec une colonne IncomeGroup.
+    """
+
+    df_final_group = pd.merge(df_final, df_income_group, left_on='Pays_code_iso3', right_on='Country Code', how='inner')
+    return normaliser_types(df_final_group.drop(['Country Name', 'Country Code'], axis=1))
+
+
+def fusion_tables(df_gpw, df_sdg3, df_ihme, df_pib, df_income_group):
+    """
+    Enchaîne toutes les fusions pour construire les tables d'analyse.
+
+    Paramètres
+    ----------
+    df_gpw, df_sdg3 : pandas.DataFrame
+        Indicateurs de l'OMS.
+    df_ihme : pandas.DataFrame
+        Indicateurs de l'IHME.
+    df_pib : pandas.DataFrame
+        PIB par habitant au format large.
+    df_income_group : pandas.DataFrame
+        Groupes de revenu de la Banque mondiale.
+
+    Sortie
+    ------
+    tuple
+        (df_final, df_final_group) : table fusionnée et table avec le groupe de revenu.
+    """
+
+    df_final = fusion_pib(fusion_ihme(fusion_oms(df_gpw, df_sdg3), df_ihme), df_pib)
+    return df_final, fusion_niveau_richesse(df_final, df_income_group)
@@ -1,10 +1,62 @@
+import os
+
+import numpy as np
 import requests
 import pandas as pd
 import pycountry
 
-# URL de base pour accéder aux API publiques de l'OMS
-BASE_URL = "https://xmart-api-public.who.int/DEX_CMS/"
+from .localisations import index_depuis_faits, iso3
+from .normalisation import normaliser_types, valeurs_numeriques
+from .instrumentation import mesurer, ajouter_octets_http
+
+# URL de base pour accéder aux API publiques de l'OMS (hôte remplaçable par SCRIPTS_API_OMS,
+# ex. serveur local de rejeu.py)
+HOTE_OMS = "https://xmart-api-public.who.int"
+BASE_URL = os.environ.get("SCRIPTS_API_OMS", HOTE_OMS) + "/DEX_CMS/"
+
+# Indicateurs conservés pour chaque groupe
+COLONNES_GROUPES = {
+    "SDG3": ["HWF_0001", "SDGSUICIDE", "WHOSIS_000001_BTSX", "WHOSIS_000003", "MDG_0000000026"],
+    "SDG_GPW": ["NUTOVERWEIGHTPREV", "GHED_GGHE_DGGE_SHA2011", "NUTSTUNTINGPREV"],
+}
+
+# Libellés utilisés dans les sauvegardes standardisées (Données_OMS)
+NOMS_INDICATEURS = {
+    "HWF_0001": "Médecins pour 10k habitants",
+    "SDGSUICIDE": "Taux de suicides",
+    "WHOSIS_000001_BTSX": "Espérance de vie totale",
+    "WHOSIS_000003": "Taux mortalité brute",
+    "MDG_0000000026": "Mortalité Maternelle à la naissance",
+    "NUTOVERWEIGHTPREV": "Surpoids enfants <5 ans",
+    "GHED_GGHE_DGGE_SHA2011": "Dépenses publiques santé",
+    "NUTSTUNTINGPREV": "Retard croissance enfants",
+}
+
+def url_requete(table, grp, loc_type="COUNTRY", version="2025", tri="SORT"):
+    """
+    Construit l'URL OData d'une table de l'API de l'OMS pour un groupe d'indicateurs.
+    """
+
+    return (f"{BASE_URL}{table}?"
+            f"$filter=14 eq 14 and IND_GRP_CODE eq '{grp}' and LOCATION_TYPE_CODE eq '{loc_type}' and VERSION_CODE eq '{version}'"
+            f"&$orderby={tri} asc")
+
+
+def _lire_pages(url):
+    # Réponse OData éventuellement découpée en pages : la suivante est indiquée par @odata.nextLink
+    valeurs = []
+    while url:
+        # Requête GET vers l'API et vérification du succès de la requête
+        resp = requests.get(url)
+        resp.raise_for_status()
+        ajouter_octets_http(len(resp.content))
+        page = resp.json()
+        valeurs.extend(page["value"])
+        url = page.get("@odata.nextLink")
+    return valeurs
 
+
+@mesurer()
 def get_headers(grp, loc_type="COUNTRY", version="2025"):
     """
     Récupère les en-têtes (headers) pour un groupe d'indicateurs spécifique.
@@ -25,18 +77,13 @@ def get_headers(grp, loc_type="COUNTRY", version="2025"):
     """
 
     # Construction de l'URL avec filtres pour le groupe, le type de localisation et la version
-    url = (f"{BASE_URL}WHSA_HEADER?"
-           f"$filter=14 eq 14 and IND_GRP_CODE eq '{grp}' and LOCATION_TYPE_CODE eq '{loc_type}' and VERSION_CODE eq '{version}'"
-           f"&$orderby=SORT asc")
+    url = url_requete("WHSA_HEADER", grp, loc_type, version, "SORT")
 
-    # Requête GET vers l'API
-    resp = requests.get(url)
-    # Vérification du succès de la requête
-    resp.raise_for_status()
-    # Conversion du résultat JSON en DataFrame pandas
-    return pd.DataFrame(resp.json()["value"])
+    # Conversion du résultat JSON (toutes les pages) en DataFrame pandas
+    return pd.DataFrame(_lire_pages(url))
 
 
+@mesurer()
 def get_facts(grp, loc_type="COUNTRY", version="2025"):
     """
     Récupère les valeurs (facts) pour un groupe d'indicateurs spécifique.
@@ -57,18 +104,14 @@ def get_facts(grp, loc_type="COUNTRY", version="2025"):
     """
 
     # Construction de l'URL avec filtres
-    url = (f"{BASE_URL}WHSA_FACT_DISPLAY?"
-           f"$filter=14 eq 14 and IND_GRP_CODE eq '{grp}' and LOCATION_TYPE_CODE eq '{loc_type}' and VERSION_CODE eq '{version}'"
-           f"&$orderby=LOCATION_SORT asc")
+    url = url_requete("WHSA_FACT_DISPLAY", grp, loc_type, version, "LOCATION_SORT")
 
-    # Requête GET vers l'API
-    resp = requests.get(url)
-    resp.raise_for_status()
-    # Conversion du résultat JSON en DataFrame pandas
-    return pd.DataFrame(resp.json()["value"])
+    # Conversion du résultat JSON (toutes les pages) en DataFrame pandas
+    return pd.DataFrame(_lire_pages(url))
 
 
-def build_wide_table(headers_df, facts_df):
+@mesurer()
+def build_wide_table(headers_df, facts_df, index=None, loc_type="COUNTRY"):
     """
     Transforme les données en format large (wide) à partir des facts.
 
@@ -78,33 +121,62 @@ def build_wide_table(headers_df, facts_df):
         DataFrame contenant les informations des headers.
     facts_df : pandas.DataFrame
         DataFrame contenant les valeurs des indicateurs.
+    index : localisations.IndexLocalisations, optional
+        Index hiérarchique des localisations, complété avec celles des facts. Les lignes sont
+        alors identifiées par (type, code) et non plus par le seul LOCATION_CODE, ce qui
+        permet de mélanger régions, pays et localisations infranationales.
+    loc_type : str, optional
+        Type des localisations en l'absence de colonne LOCATION_TYPE_CODE (par défaut "COUNTRY").
 
     Sortie
     ------
     pandas.DataFrame
-        DataFrame en format large avec une ligne par pays et une colonne par indicateur.
+        DataFrame en format large avec une ligne par localisation et une colonne par indicateur.
+        Avec un index, les colonnes LOCATION_ID, LOCATION_CODE et LOCATION_TYPE_CODE suivent
+        LOCATION. Les valeurs sont numériques et les types normalisés (voir
+        normalisation.normaliser_types).
     """
 
-    # Dictionnaire pour stocker les lignes transformées
-    wide_records = {}
-
-    # Boucle sur chaque ligne
-    for _, fact in facts_df.iterrows():
-        loc = fact["LOCATION_CODE"]
-        # Si le pays n'existe pas encore dans le dictionnaire, on l'ajoute
-        if loc not in wide_records:
-            wide_records[loc] = {"LOCATION": fact["LOCATION"]}
-
-        # Création du nom de la colonne
-        dim_label = fact["FACT_IND"]
-        if fact.get("DIM_MEMBER_1"):
-            dim_label += f"_{fact['DIM_MEMBER_1']}"
-
-        # Ajout de la valeur correspondante à la colonne dans le dictionnaire
-        wide_records[loc][dim_label] = fact["VALUE_STRING"]
-
-    # Conversion du dictionnaire en DataFrame pandas
-    return pd.DataFrame.from_records(list(wide_records.values()))
+    # Création du nom de la colonne : code de l'indicateur, suivi de la dimension éventuelle
+    dim_label = facts_df["FACT_IND"].astype("string")
+    if "DIM_MEMBER_1" in facts_df.columns:
+        dim = facts_df["DIM_MEMBER_1"].astype("string")
+        avec_dim = dim.notna() & (dim != "")
+        dim_label = dim_label.where(~avec_dim, dim_label + "_" + dim)
+
+    # Clés entières des lignes (localisations) et des colonnes (indicateurs), dans l'ordre d'apparition
+    if index is None:
+        lignes, localisations = pd.factorize(facts_df["LOCATION_CODE"])
+    else:
+        _, ids = index_depuis_faits(facts_df, loc_type, index)
+        lignes, localisations = pd.factorize(ids)
+    colonnes, noms_colonnes = pd.factorize(dim_label)
+    valeurs = valeurs_numeriques(facts_df["VALUE_STRING"]).to_numpy()
+
+    # En cas de doublon, la dernière valeur rencontrée est conservée
+    cellules = lignes.astype("int64") * len(noms_colonnes) + colonnes
+    _, derniers = np.unique(cellules[::-1], return_index=True)
+    derniers = len(cellules) - 1 - derniers
+    derniers = derniers[(lignes[derniers] >= 0) & (colonnes[derniers] >= 0)]
+
+    # Une ligne par localisation, une colonne par indicateur
+    matrice = np.full((len(localisations), len(noms_colonnes)), np.nan)
+    matrice[lignes[derniers], colonnes[derniers]] = valeurs[derniers]
+    wide = pd.DataFrame(matrice, columns=pd.Index(noms_colonnes, dtype=dim_label.dtype))
+
+    if index is None:
+        # Nom du pays pris sur la première ligne de chaque localisation
+        _, premieres = np.unique(lignes, return_index=True)
+        premieres = premieres[lignes[premieres] >= 0]
+        wide.insert(0, "LOCATION", facts_df["LOCATION"].to_numpy()[premieres])
+    else:
+        table = index.to_frame().iloc[localisations]
+        wide.insert(0, "LOCATION", table["LOCATION"].to_numpy())
+        wide.insert(1, "LOCATION_ID", localisations.astype("int32"))
+        wide.insert(2, "LOCATION_CODE", table["LOCATION_CODE"].to_numpy())
+        wide.insert(3, "LOCATION_TYPE_CODE", table["LOCATION_TYPE_CODE"].to_numpy())
+
+    return normaliser_types(wide)
 
 
 def get_iso3(country_name):
@@ -130,42 +202,104 @@ def get_iso3(country_name):
         return None
 
 
-def get_data_health_with_iso():
+@mesurer("get_iso3")
+def get_iso3_lot(noms):
+    """
+    Convertit une série de noms de pays en codes ISO-3.
+
+    Paramètres
+    ----------
+    noms : pandas.Series
+        Noms des pays.
+
+    Sortie
+    ------
+    pandas.Series
+        Série catégorielle des codes ISO-3 (NaN si le pays n'est pas trouvé).
+    """
+
+    # Sur une colonne catégorielle, la conversion n'est faite qu'une fois par pays distinct
+    return noms.astype("category").map(get_iso3).astype("category")
+
+
+@mesurer()
+def preparer_groupe(headers_df, facts_df, colonnes, index=None, loc_type="COUNTRY"):
+    """
+    Construit la table large d'un groupe d'indicateurs et ajoute une colonne 'Pays_code_iso3'.
+
+    Sans index, le code ISO3 est le LOCATION_CODE de l'OMS, ou à défaut est retrouvé à partir du
+    nom du pays (get_iso3). Avec un index
+    hiérarchique, c'est le code du pays lui-même ou du pays parent d'une localisation
+    infranationale (NaN pour les régions et le monde).
+
+    Paramètres
+    ----------
+    headers_df : pandas.DataFrame
+        DataFrame contenant les informations des headers.
+    facts_df : pandas.DataFrame
+        DataFrame contenant les valeurs des indicateurs.
+    colonnes : list
+        Codes des indicateurs à conserver.
+    index : localisations.IndexLocalisations, optional
+        Index hiérarchique des localisations (voir build_wide_table).
+    loc_type : str, optional
+        Type des localisations en l'absence de colonne LOCATION_TYPE_CODE (par défaut "COUNTRY").
+
+    Sortie
+    ------
+    pandas.DataFrame
+        DataFrame avec les colonnes LOCATION, Pays_code_iso3 (puis LOCATION_ID, LOCATION_CODE
+        et LOCATION_TYPE_CODE avec un index) et les indicateurs demandés.
+    """
+
+    df = build_wide_table(headers_df, facts_df, index, loc_type)
+    if index is None:
+        # Les codes de pays de l'OMS sont des codes ISO3 ; le nom ne sert qu'à défaut de code
+        # (les noms de l'OMS ne sont pas tous reconnus, ex. "Republic of Korea")
+        codes = pd.Series(pd.factorize(facts_df["LOCATION_CODE"])[1], dtype="object")
+        codes = codes.where(codes.astype("string").str.fullmatch(r"[A-Z]{3}").fillna(False).astype(bool))
+        noms = get_iso3_lot(df["LOCATION"]).astype("object")
+        df["Pays_code_iso3"] = pd.Series(codes.to_numpy(), index=df.index).fillna(noms).astype("category")
+        identifiants = []
+    else:
+        df["Pays_code_iso3"] = iso3(index, df["LOCATION_ID"]).to_numpy()
+        identifiants = ["LOCATION_ID", "LOCATION_CODE", "LOCATION_TYPE_CODE"]
+    # Sélection des colonnes spécifiques à conserver, Pays_code_iso3 en deuxième position
+    return df[['LOCATION', 'Pays_code_iso3'] + identifiants + list(colonnes)]
+
+
+def get_data_health_with_iso(loc_type="COUNTRY", index=None):
     """
     Récupère les données OMS pour SDG3 et SDG_GPW, et ajoute une colonne 'Pays_code_iso3'.
 
     Paramètres
     ----------
-    Aucun
+    loc_type : str, optional
+        Type de localisation demandé à l'API : "COUNTRY" (par défaut), "REGION", "GLOBAL"
+        ou "SUBNATIONAL".
+    index : localisations.IndexLocalisations, optional
+        Index hiérarchique complété avec les localisations chargées. Obligatoire hors du
+        niveau pays ; les deux groupes partagent alors les mêmes identifiants LOCATION_ID.
 
     Sortie
     ------
     dict
         Dictionnaire avec deux DataFrames : {"SDG3": df_sdg3, "SDG_GPW": df_sdg_gpw}.
-        Chaque DataFrame contient les données des indicateurs par pays, avec une colonne Pays_code_iso3.
+        Chaque DataFrame contient les données des indicateurs par localisation, avec une colonne Pays_code_iso3.
     """
 
+    if index is None and loc_type != "COUNTRY":
+        raise ValueError("Un index de localisations est nécessaire hors du niveau pays")
+
     # SDG3
-    headers_sdg3 = get_headers("SDG3")
-    facts_sdg3 = get_facts("SDG3")
-    df_sdg3 = build_wide_table(headers_sdg3, facts_sdg3)
-    df_sdg3["Pays_code_iso3"] = df_sdg3["LOCATION"].apply(get_iso3)
-    # Réorganisation des colonnes pour mettre Pays_code_iso3 en deuxième position
-    cols = df_sdg3.columns.tolist()
-    cols.insert(1, cols.pop(cols.index("Pays_code_iso3")))
-    df_sdg3 = df_sdg3[cols]
-    # Sélection des colonnes spécifiques à conserver
-    df_sdg3 = df_sdg3[['LOCATION','Pays_code_iso3',"HWF_0001","SDGSUICIDE","WHOSIS_000001_BTSX","WHOSIS_000003","MDG_0000000026"]]
+    headers_sdg3 = get_headers("SDG3", loc_type)
+    facts_sdg3 = get_facts("SDG3", loc_type)
+    df_sdg3 = preparer_groupe(headers_sdg3, facts_sdg3, COLONNES_GROUPES["SDG3"], index, loc_type)
 
     # SDG_GPW
-    headers_sdg_gpw = get_headers("SDG_GPW")
-    facts_sdg_gpw = get_facts("SDG_GPW")
-    df_sdg_gpw = build_wide_table(headers_sdg_gpw, facts_sdg_gpw)
-    df_sdg_gpw["Pays_code_iso3"] = df_sdg_gpw["LOCATION"].apply(get_iso3)
-    cols = df_sdg_gpw.columns.tolist()
-    cols.insert(1, cols.pop(cols.index("Pays_code_iso3")))
-    df_sdg_gpw = df_sdg_gpw[cols]
-    df_sdg_gpw = df_sdg_gpw[['LOCATION','Pays_code_iso3','NUTOVERWEIGHTPREV','GHED_GGHE_DGGE_SHA2011','NUTSTUNTINGPREV']]
+    headers_sdg_gpw = get_headers("SDG_GPW", loc_type)
+    facts_sdg_gpw = get_facts("SDG_GPW", loc_type)
+    df_sdg_gpw = preparer_groupe(headers_sdg_gpw, facts_sdg_gpw, COLONNES_GROUPES["SDG_GPW"], index, loc_type)
 
     # Retourne un dictionnaire avec les deux DataFrames
-    return {"SDG3": df_sdg3, "SDG_GPW": df_sdg_gpw}
\ No newline at end of file
+    return {"SDG3": df_sdg3, "SDG_GPW": df_sdg_gpw}
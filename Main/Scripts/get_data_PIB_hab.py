@@ -1,6 +1,16 @@
+import os
+
 import requests
 import pandas as pd
 
+from .normalisation import normaliser_types
+from .instrumentation import mesurer, ajouter_octets_http
+
+# URL de base de l'API de la Banque mondiale (hôte remplaçable par SCRIPTS_API_BANQUE_MONDIALE,
+# ex. serveur local de rejeu.py)
+HOTE_BANQUE_MONDIALE = "https://api.worldbank.org"
+BASE_URL = os.environ.get("SCRIPTS_API_BANQUE_MONDIALE", HOTE_BANQUE_MONDIALE) + "/v2/"
+
 def check_api_availability(indicator="NY.GDP.PCAP.CD"):
     """
     Vérifie la disponibilité de l'API de la Banque mondiale pour un indicateur donné.
@@ -17,7 +27,7 @@ def check_api_availability(indicator="NY.GDP.PCAP.CD"):
     """
 
     # Construction de l'URL pour accéder à l'indicateur
-    url = f"https://api.worldbank.org/v2/country/all/indicator/{indicator}"
+    url = f"{BASE_URL}country/all/indicator/{indicator}"
     
     try:
         # Envoi d'une requête GET avec timeout de 60 secondes
@@ -31,9 +41,10 @@ def check_api_availability(indicator="NY.GDP.PCAP.CD"):
         return False
 
 
-def get_gdp_per_capita_wide(start_year=2015, end_year=2024, indicator="NY.GDP.PCAP.CD"):
+@mesurer()
+def telecharger_gdp_per_capita(start_year=2015, end_year=2024, indicator="NY.GDP.PCAP.CD"):
     """
-    Récupère le PIB par habitant depuis la Banque mondiale et retourne un DataFrame au format large.
+    Télécharge les observations brutes du PIB par habitant depuis la Banque mondiale.
 
     Paramètres
     ----------
@@ -46,24 +57,66 @@ def get_gdp_per_capita_wide(start_year=2015, end_year=2024, indicator="NY.GDP.PC
 
     Sortie
     ------
-    pandas.DataFrame
-        DataFrame au format large : Country Name | Country Code | 2015 | ... | 2024
+    list
+        Liste des enregistrements JSON renvoyés par l'API (toutes les pages).
+
+    Une réponse d'erreur de l'API lève requests.exceptions.HTTPError avec son message, ce qui
+    déclenche le repli sur la sauvegarde locale comme une indisponibilité.
     """
 
     # Construction de l'URL et des paramètres pour la requête API
-    url = f"https://api.worldbank.org/v2/country/all/indicator/{indicator}"
+    url = f"{BASE_URL}country/all/indicator/{indicator}"
     params = {
         "format": "json",
         "per_page": 20000,
         "date": f"{start_year}:{end_year}"
     }
 
-    # Requête GET vers l'API
-    r = requests.get(url, params=params)
-    r.raise_for_status()  # Vérifie que la requête a réussi
+    observations = []
+    page, pages = 1, 1
+    while page <= pages:
+        # Requête GET vers l'API
+        r = requests.get(url, params=params if page == 1 else {**params, "page": page})
+        r.raise_for_status()  # Vérifie que la requête a réussi
+        ajouter_octets_http(len(r.content))
+
+        # Le premier élément de la réponse décrit la pagination, le second contient les observations ;
+        # une erreur de l'API (ex. indicateur inconnu) est renvoyée avec le statut 200, sous la
+        # forme d'une liste à un seul élément contenant "message"
+        reponse = r.json()
+        if not isinstance(reponse, list) or len(reponse) < 2:
+            erreur = reponse[0] if isinstance(reponse, list) and reponse else reponse
+            messages = erreur.get("message", erreur) if isinstance(erreur, dict) else erreur
+            if isinstance(messages, list):
+                messages = "; ".join(m.get("value", str(m)) if isinstance(m, dict) else str(m) for m in messages)
+            raise requests.exceptions.HTTPError(
+                f"Réponse inattendue de l'API de la Banque mondiale pour {indicator} : {messages}", response=r)
+        meta, donnees = reponse[:2]
+        pages = int(meta.get("pages", 1))
+        observations.extend(donnees or [])
+        page += 1
+
+    return observations
+
+
+@mesurer()
+def gdp_format_long(data):
+    """
+    Met en forme les observations brutes de la Banque mondiale au format long.
+
+    Paramètres
+    ----------
+    data : list
+        Enregistrements JSON renvoyés par telecharger_gdp_per_capita.
+
+    Sortie
+    ------
+    pandas.DataFrame
+        DataFrame au format long : Country Name | Country Code | Year | GDP_per_capita,
+        avec des types normalisés (voir normalisation.normaliser_types).
+    """
 
     # Conversion de la réponse JSON en DataFrame
-    data = r.json()[1]
     df = pd.DataFrame(data)
 
     # Extraction du nom des pays depuis le dictionnaire renvoyé
@@ -71,10 +124,30 @@ def get_gdp_per_capita_wide(start_year=2015, end_year=2024, indicator="NY.GDP.PC
         lambda x: x["value"] if isinstance(x, dict) else None
     )
 
-    # Sélection des colonnes pertinentes
+    # Sélection des colonnes pertinentes et renommage
     df = df[["Country Name", "countryiso3code", "date", "value"]]
     df.columns = ["Country Name", "Country Code", "Year", "GDP_per_capita"]
 
+    # Year en int16, codes pays catégoriels et PIB en float32 si la précision le permet
+    return normaliser_types(df)
+
+
+@mesurer()
+def gdp_format_large(df):
+    """
+    Transforme le PIB par habitant du format long au format large.
+
+    Paramètres
+    ----------
+    df : pandas.DataFrame
+        DataFrame au format long renvoyé par gdp_format_long.
+
+    Sortie
+    ------
+    pandas.DataFrame
+        DataFrame au format large : Country Name | Country Code | 2015 | ... | 2024
+    """
+
     # Transformation du format long (Year, Value) en format large (colonnes années)
     df_wide = (
         df.pivot(
@@ -85,6 +158,9 @@ def get_gdp_per_capita_wide(start_year=2015, end_year=2024, indicator="NY.GDP.PC
         .reset_index()
     )
 
+    # Les colonnes années restent nommées par des chaînes ("2015", ..., "2024")
+    df_wide.columns = [str(c) for c in df_wide.columns]
+
     # Tri des colonnes années par ordre croissant
     year_cols = sorted(
         [c for c in df_wide.columns if c.isdigit()],
@@ -95,12 +171,12 @@ def get_gdp_per_capita_wide(start_year=2015, end_year=2024, indicator="NY.GDP.PC
     # Supprime le nom de la hiérarchie des colonnes
     df_wide.columns.name = None
 
-    return df_wide
+    return normaliser_types(df_wide)
 
 
-def get_gdp_per_capita(start_year=2015, end_year=2024, indicator="NY.GDP.PCAP.CD"):
+def get_gdp_per_capita_wide(start_year=2015, end_year=2024, indicator="NY.GDP.PCAP.CD"):
     """
-    Récupère le PIB par habitant depuis la Banque mondiale et retourne un DataFrame au format long.
+    Récupère le PIB par habitant depuis la Banque mondiale et retourne un DataFrame au format large.
 
     Paramètres
     ----------
@@ -114,32 +190,31 @@ def get_gdp_per_capita(start_year=2015, end_year=2024, indicator="NY.GDP.PCAP.CD
     Sortie
     ------
     pandas.DataFrame
-        DataFrame au format long : Country Name | Country Code | Year | GDP_per_capita
+        DataFrame au format large : Country Name | Country Code | 2015 | ... | 2024
     """
 
-    # Construction de l'URL et des paramètres pour la requête API
-    url = f"https://api.worldbank.org/v2/country/all/indicator/{indicator}"
-    params = {
-        "format": "json",
-        "per_page": 20000,
-        "date": f"{start_year}:{end_year}"
-    }
+    data = telecharger_gdp_per_capita(start_year, end_year, indicator)
+    return gdp_format_large(gdp_format_long(data))
 
-    # Requête GET vers l'API
-    r = requests.get(url, params=params)
-    r.raise_for_status()
 
-    # Conversion de la réponse JSON en DataFrame
-    data = r.json()[1]
-    df = pd.DataFrame(data)
+def get_gdp_per_capita(start_year=2015, end_year=2024, indicator="NY.GDP.PCAP.CD"):
+    """
+    Récupère le PIB par habitant depuis la Banque mondiale et retourne un DataFrame au format long.
 
-    # Extraction du nom des pays depuis le dictionnaire renvoyé
-    df["Country Name"] = df["country"].apply(
-        lambda x: x["value"] if isinstance(x, dict) else None
-    )
+    Paramètres
+    ----------
+    start_year : int, optional
+        Année de début de la période (par défaut 2015).
+    end_year : int, optional
+        Année de fin de la période (par défaut 2024).
+    indicator : str, optional
+        Code de l'indicateur de la Banque mondiale (par défaut "NY.GDP.PCAP.CD").
 
-    # Sélection des colonnes pertinentes et renommage
-    df = df[["Country Name", "countryiso3code", "date", "value"]]
-    df.columns = ["Country Name", "Country Code", "Year", "GDP_per_capita"]
+    Sortie
+    ------
+    pandas.DataFrame
+        DataFrame au format long : Country Name | Country Code | Year | GDP_per_capita
+    """
 
-    return df
+    data = telecharger_gdp_per_capita(start_year, end_year, indicator)
+    return gdp_format_long(data)
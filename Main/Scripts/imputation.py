@@ -0,0 +1,183 @@
+"""
+Imputation des valeurs manquantes de la table fusionnée, entre la fusion et les modèles.
+
+- PIB par habitant : interpolation linéaire le long des années de chaque pays (valeur la plus
+  proche aux extrémités, ex. PIB 2024 de l'Afghanistan), calculée en une fois sur la matrice
+  pays × années.
+- Indicateurs de santé : k plus proches voisins. Pour chaque indicateur, un arbre k-d (scipy) est
+  construit sur les pays où il est renseigné, dans l'espace des autres indicateurs
+  centrés-réduits (valeurs manquantes à la moyenne) et du log PIB moyen ; la valeur imputée est
+  la moyenne des k voisins. Les pays à imputer sont recherchés en une seule requête par
+  indicateur, répartie sur tous les processeurs.
+
+Un arbre k-d perd son efficacité au-delà d'une dizaine de dimensions : avec une vingtaine
+d'indicateurs, la recherche exacte est presque exhaustive (environ 26 s pour 20 000 lignes et
+20 indicateurs sur un processeur). Au-delà de 10 000 lignes, les voisins sont donc cherchés
+par défaut dans l'espace des 8 premières composantes principales des donneurs : 100 000
+lignes et 20 indicateurs sont imputés en moins de 20 s sur un processeur, avec une
+erreur d'imputation comparable sur des données simulées.
+
+Les tables imputées et les masques des valeurs manquantes d'origine sont mis en cache selon
+l'empreinte des données et des paramètres.
+"""
+
+import pickle
+import numpy as np
+import pandas as pd
+
+from .cache import dossier_cache, empreinte
+from .instrumentation import mesurer
+from .recherche_modeles import indicateurs_disponibles
+
+# Recherche exacte des voisins jusqu'à ce nombre de lignes, sinon dans un espace réduit
+LIGNES_ESPACE_EXACT = 10_000
+# Nombre de composantes principales de l'espace réduit
+COMPOSANTES = 8
+
+
+def interpoler_annees(valeurs):
+    """
+    Interpole linéairement chaque ligne d'une matrice le long de ses colonnes (années),
+    en prolongeant la valeur la plus proche aux extrémités. Les lignes vides restent vides.
+
+    Paramètres
+    ----------
+    valeurs : numpy.ndarray
+        Matrice pays × années (float, NaN pour les valeurs manquantes).
+
+    Sortie
+    ------
+    numpy.ndarray
+        Matrice interpolée.
+    """
+
+    n, t = valeurs.shape
+    present = ~np.isnan(valeurs)
+    colonnes = np.broadcast_to(np.arange(t), (n, t))
+
+    # Indice de la dernière année renseignée à gauche et de la première à droite de chaque case
+    gauche = np.maximum.accumulate(np.where(present, colonnes, -1), axis=1)
+    droite = np.minimum.accumulate(np.where(present, colonnes, t)[:, ::-1], axis=1)[:, ::-1]
+
+    # Aux extrémités, la valeur la plus proche est utilisée des deux côtés
+    gauche_ok, droite_ok = gauche >= 0, droite < t
+    gauche = np.where(gauche_ok, gauche, droite)
+    droite = np.where(droite_ok, droite, gauche)
+    vide = ~(gauche_ok | droite_ok)
+    gauche, droite = np.where(vide, 0, gauche), np.where(vide, 0, droite)
+
+    lignes = np.arange(n)[:, None]
+    v_gauche, v_droite = valeurs[lignes, gauche], valeurs[lignes, droite]
+    ecart = droite - gauche
+    poids = np.where(ecart > 0, (colonnes - gauche) / np.where(ecart > 0, ecart, 1), 0.0)
+    resultat = v_gauche + poids * (v_droite - v_gauche)
+    return np.where(vide, np.nan, resultat)
+
+
+def _imputer_colonne(tache):
+    from scipy.spatial import cKDTree
+
+    j, Z, y, k, workers, composantes = tache
+    manquant = np.isnan(y)
+    if not manquant.any() or manquant.all():
+        return j, y
+
+    # Espace des voisins : toutes les variables sauf l'indicateur à imputer
+    espace = np.delete(Z, j, axis=1)
+    donneurs = ~manquant
+    if composantes and composantes < espace.shape[1]:
+        # Projection sur les premières composantes principales des donneurs
+        centre = espace[donneurs].mean(axis=0)
+        _, _, axes = np.linalg.svd(espace[donneurs] - centre, full_matrices=False)
+        espace = (espace - centre) @ axes[:composantes].T
+    # Arbre équilibré par défaut : requêtes environ deux fois plus rapides que l'arbre non
+    # équilibré sur ces données ; tous les pays à imputer sont cherchés en une seule requête
+    arbre = cKDTree(espace[donneurs])
+    _, voisins = arbre.query(espace[manquant], k=min(k, int(donneurs.sum())), workers=workers)
+    voisins = voisins.reshape(int(manquant.sum()), -1)
+
+    resultat = y.copy()
+    resultat[manquant] = y[donneurs][voisins].mean(axis=1)
+    return j, resultat
+
+
+@mesurer()
+def imputer(df, indicateurs=None, annees=None, k=5, n_jobs=None, cache=True, composantes="auto"):
+    """
+    Impute les indicateurs de santé (k plus proches voisins) et le PIB par habitant
+    (interpolation temporelle par pays) de la table fusionnée.
+
+    Paramètres
+    ----------
+    df : pandas.DataFrame
+        Table fusionnée (indicateurs de santé et colonnes années de PIB).
+    indicateurs : list, optional
+        Indicateurs à imputer (par défaut, tous les indicateurs de santé de la table).
+    annees : list, optional
+        Colonnes années de PIB (par défaut, toutes celles de la table).
+    k : int, optional
+        Nombre de voisins (par défaut 5).
+    n_jobs : int, optional
+        Nombre de threads des requêtes de voisins (par défaut, tous les processeurs).
+    cache : bool, optional
+        Réutilise les tables déjà imputées pour les mêmes données et paramètres (par défaut True).
+    composantes : int, None ou "auto", optional
+        Nombre de composantes principales de l'espace de recherche des voisins ; None pour
+        l'espace complet. Par défaut ("auto"), l'espace complet jusqu'à LIGNES_ESPACE_EXACT
+        lignes et COMPOSANTES composantes au-delà.
+
+    Sortie
+    ------
+    tuple
+        (df_impute, manquants) : copie de df avec les valeurs imputées, et DataFrame booléen
+        (mêmes lignes, colonnes imputées) valant True là où la valeur d'origine manquait.
+        Les pays sans aucune valeur de PIB gardent un PIB manquant.
+    """
+
+    indicateurs = indicateurs_disponibles(df) if indicateurs is None else list(indicateurs)
+    annees = [c for c in df.columns if str(c).isdigit()] if annees is None else [str(a) for a in annees]
+    colonnes = indicateurs + annees
+    if composantes == "auto":
+        composantes = None if len(df) <= LIGNES_ESPACE_EXACT else COMPOSANTES
+
+    fichier = None
+    if cache:
+        cle = empreinte(df[colonnes], [k] if composantes is None else [k, composantes])
+        fichier = dossier_cache("imputation") / f"{cle}.pkl"
+        if fichier.exists():
+            with open(fichier, "rb") as f:
+                valeurs, manquants = pickle.load(f)
+            df_impute = df.copy()
+            df_impute[colonnes] = valeurs
+            return df_impute, manquants
+
+    manquants = df[colonnes].isna()
+
+    # PIB : interpolation temporelle de toutes les lignes à la fois
+    pib = interpoler_annees(df[annees].to_numpy(dtype="float64", na_value=np.nan))
+
+    # Indicateurs : espace commun centré-réduit (NaN à la moyenne), complété par le log PIB moyen
+    X = df[indicateurs].to_numpy(dtype="float64", na_value=np.nan, copy=True)
+    moyenne, ecart = np.nanmean(X, axis=0), np.nanstd(X, axis=0)
+    Z = np.nan_to_num((X - moyenne) / np.where(ecart > 0, ecart, 1.0))
+    log_pib = np.log(np.where(pib > 0, pib, 1.0))
+    nb_annees = (pib > 0).sum(axis=1)
+    log_pib = np.where(nb_annees > 0, np.where(pib > 0, log_pib, 0.0).sum(axis=1) / np.maximum(nb_annees, 1), np.nan)
+    log_pib = np.nan_to_num((log_pib - np.nanmean(log_pib)) / np.nanstd(log_pib))
+    Z = np.column_stack([Z, log_pib])
+
+    # Indicateurs traités l'un après l'autre, chaque requête utilisant déjà tous les processeurs
+    for j in range(len(indicateurs)):
+        X[:, j] = _imputer_colonne((j, Z, X[:, j], k, n_jobs or -1, composantes))[1]
+
+    valeurs = pd.DataFrame(np.column_stack([X, pib]), columns=colonnes, index=df.index)
+    # Les colonnes flottantes gardent leur type (float32 après normalisation des types)
+    valeurs = valeurs.astype({c: df[c].dtype for c in colonnes if pd.api.types.is_float_dtype(df[c])})
+
+    if fichier is not None:
+        with open(fichier, "wb") as f:
+            pickle.dump((valeurs, manquants), f)
+
+    df_impute = df.copy()
+    df_impute[colonnes] = valeurs
+    return df_impute, manquants
@@ -0,0 +1,341 @@
+"""
+Mesures optionnelles des étapes du projet : temps réel et CPU, lignes en entrée et en sortie,
+octets HTTP reçus et pic mémoire (tracemalloc).
+
+L'instrumentation est désactivée par défaut ; un appel décoré coûte alors un seul test de
+booléen. Elle s'active avec activer() ou la variable d'environnement SCRIPTS_INSTRUMENTATION=1
+(SCRIPTS_INSTRUMENTATION=memoire pour suivre aussi la mémoire). Les mesures sont celles du
+processus courant : une fonction confiée à un pool de processus doit passer par
+executer_dans_worker, qui renvoie ses mesures avec son résultat (voir ajouter_mesures).
+
+Le temps CPU est celui du thread qui exécute l'étape. Le pic mémoire de tracemalloc est en
+revanche global au processus : il n'est mesuré que pour les étapes qui ne se sont exécutées en
+même temps qu'aucune étape d'un autre thread, et vaut None sinon.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+_ACTIF = os.environ.get("SCRIPTS_INSTRUMENTATION", "0") not in ("", "0")
+_MEMOIRE = os.environ.get("SCRIPTS_INSTRUMENTATION", "") == "memoire"
+_MESURES = []
+_LOCAL = threading.local()
+
+# Étapes en cours dans tous les threads, pour détecter les mesures mémoire concurrentes
+_EN_COURS = []
+_VERROU = threading.Lock()
+
+if _MEMOIRE and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+
+def activer(memoire=False):
+    """
+    Active l'instrumentation.
+
+    Paramètres
+    ----------
+    memoire : bool, optional
+        Si True, suit aussi le pic d'allocation avec tracemalloc (plus coûteux, par défaut False).
+    """
+
+    global _ACTIF, _MEMOIRE
+    _ACTIF, _MEMOIRE = True, memoire
+    if memoire and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def desactiver():
+    """
+    Désactive l'instrumentation (les mesures déjà enregistrées sont conservées).
+    """
+
+    global _ACTIF, _MEMOIRE
+    if _MEMOIRE and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _ACTIF, _MEMOIRE = False, False
+
+
+def est_actif():
+    return _ACTIF
+
+
+def mesures():
+    """
+    Sortie
+    ------
+    list
+        Copie de la liste des mesures enregistrées (un dictionnaire par étape).
+    """
+
+    return list(_MESURES)
+
+
+def reinitialiser():
+    """
+    Efface les mesures enregistrées.
+    """
+
+    _MESURES.clear()
+
+
+def ajouter_mesures(nouvelles):
+    """
+    Ajoute des mesures prises ailleurs (ex. dans un worker, voir executer_dans_worker).
+
+    Paramètres
+    ----------
+    nouvelles : list
+        Mesures à ajouter (un dictionnaire par étape).
+    """
+
+    _MESURES.extend(nouvelles)
+
+
+def executer_dans_worker(memoire, fonction, *args):
+    """
+    Exécute une fonction dans un worker d'un pool de processus, instrumentation active.
+
+    L'état hérité du processus parent (mesures, étapes en cours, verrou) est remis à zéro : un
+    worker créé par fork en garde sinon une copie.
+
+    Paramètres
+    ----------
+    memoire : bool
+        Suit aussi le pic mémoire, comme dans le processus parent.
+    fonction : callable
+        Fonction à exécuter, avec les arguments args.
+
+    Sortie
+    ------
+    tuple
+        (résultat, mesures) : résultat de la fonction et mesures prises pendant l'appel.
+    """
+
+    global _VERROU
+    _VERROU = threading.Lock()
+    _EN_COURS.clear()
+    _pile().clear()
+    reinitialiser()
+    activer(memoire=memoire)
+    try:
+        return fonction(*args), mesures()
+    finally:
+        reinitialiser()
+
+
+def _pile():
+    if not hasattr(_LOCAL, "pile"):
+        _LOCAL.pile = []
+    return _LOCAL.pile
+
+
+def _nb_lignes(objet):
+    # Nombre de lignes d'un DataFrame, d'une série, ou total d'un dict / tuple de DataFrames
+    if hasattr(objet, "shape") and len(getattr(objet, "shape", ())) > 0:
+        return int(objet.shape[0])
+    if isinstance(objet, dict):
+        tailles = [_nb_lignes(v) for v in objet.values()]
+    elif isinstance(objet, (tuple, list)):
+        tailles = [_nb_lignes(v) for v in objet]
+    else:
+        return None
+    tailles = [t for t in tailles if t is not None]
+    return sum(tailles) if tailles else None
+
+
+def ajouter_octets_http(nb_octets):
+    """
+    Ajoute des octets HTTP reçus à l'étape en cours (sans effet si l'instrumentation est inactive).
+
+    Paramètres
+    ----------
+    nb_octets : int
+        Taille du corps de la réponse.
+    """
+
+    if _ACTIF and _pile():
+        _pile()[-1]["octets_http"] += nb_octets
+
+
+class etape:
+    """
+    Gestionnaire de contexte mesurant un bloc de code.
+
+    Exemple
+    -------
+    with etape("fusion_oms", lignes_entree=len(df)) as m:
+        df_oms = ...
+        m["lignes_sortie"] = len(df_oms)
+    """
+
+    def __init__(self, nom, lignes_entree=None):
+        self.nom = nom
+        self.lignes_entree = lignes_entree
+        self.mesure = None
+
+    def __enter__(self):
+        if not _ACTIF:
+            return {}
+        self.mesure = {"etape": self.nom, "lignes_entree": self.lignes_entree,
+                       "lignes_sortie": None, "octets_http": 0, "memoire_pic": None,
+                       "debut": time.time(), "_pic_enfants": 0, "_concurrente": False}
+        pile = _pile()
+        self._suivi_memoire = _MEMOIRE and tracemalloc.is_tracing()
+        if self._suivi_memoire:
+            with _VERROU:
+                autres = [m for m in _EN_COURS if not any(m is p for p in pile)]
+                if autres:
+                    # Un autre thread mesure déjà : le pic global ne peut plus être attribué
+                    for m in autres + pile:
+                        m["_concurrente"] = True
+                    self.mesure["_concurrente"] = True
+                else:
+                    # Le pic atteint jusqu'ici par l'étape parente est conservé avant la remise à zéro
+                    if pile:
+                        pile[-1]["_pic_enfants"] = max(pile[-1]["_pic_enfants"],
+                                                       tracemalloc.get_traced_memory()[1])
+                    tracemalloc.reset_peak()
+                self._memoire_debut = tracemalloc.get_traced_memory()[0]
+                _EN_COURS.append(self.mesure)
+        pile.append(self.mesure)
+        self._cpu = time.thread_time()
+        self._debut = time.perf_counter()
+        return self.mesure
+
+    def __exit__(self, *exc):
+        if self.mesure is None:
+            return False
+        m = self.mesure
+        m["duree"] = time.perf_counter() - self._debut
+        m["cpu"] = time.thread_time() - self._cpu
+        m["erreur"] = exc[0].__name__ if exc[0] is not None else None
+
+        pile = _pile()
+        pile.pop()
+        pic_absolu = None
+        if self._suivi_memoire:
+            with _VERROU:
+                del _EN_COURS[next(i for i, e in enumerate(_EN_COURS) if e is m)]
+                if not m["_concurrente"] and tracemalloc.is_tracing():
+                    pic_absolu = max(tracemalloc.get_traced_memory()[1], m["_pic_enfants"])
+                    m["memoire_pic"] = pic_absolu - self._memoire_debut
+        del m["_pic_enfants"], m["_concurrente"]
+
+        if pile:
+            # Les octets et le pic mémoire d'une sous-étape comptent aussi pour l'étape parente
+            pile[-1]["octets_http"] += m["octets_http"]
+            if pic_absolu is not None:
+                pile[-1]["_pic_enfants"] = max(pile[-1]["_pic_enfants"], pic_absolu)
+
+        _MESURES.append(m)
+        return False
+
+
+def mesurer(nom=None):
+    """
+    Décorateur mesurant chaque appel d'une fonction lorsque l'instrumentation est active.
+
+    Les lignes en entrée sont celles du premier argument possédant une forme (DataFrame,
+    Series), les lignes en sortie celles du résultat.
+
+    Paramètres
+    ----------
+    nom : str, optional
+        Nom de l'étape (par défaut, nom de la fonction).
+    """
+
+    def decorateur(fonction):
+        nom_etape = nom or fonction.__name__
+
+        @functools.wraps(fonction)
+        def wrapper(*args, **kwargs):
+            if not _ACTIF:
+                return fonction(*args, **kwargs)
+            entree = next((n for n in map(_nb_lignes, args) if n is not None), None)
+            with etape(nom_etape, lignes_entree=entree) as m:
+                resultat = fonction(*args, **kwargs)
+                m["lignes_sortie"] = _nb_lignes(resultat)
+            return resultat
+
+        return wrapper
+
+    return decorateur
+
+
+def exporter_jsonl(chemin=None):
+    """
+    Exporte les mesures au format JSON lines (une étape par ligne).
+
+    Paramètres
+    ----------
+    chemin : str ou pathlib.Path, optional
+        Fichier de sortie ; si absent, le texte est seulement renvoyé.
+
+    Sortie
+    ------
+    str
+        Texte JSON lines.
+    """
+
+    texte = "".join(json.dumps(m, ensure_ascii=False) + "\n" for m in _MESURES)
+    if chemin is not None:
+        with open(chemin, "w", encoding="utf-8") as f:
+            f.write(texte)
+    return texte
+
+
+def exporter_prometheus(chemin=None):
+    """
+    Exporte les mesures agrégées par étape au format texte de Prometheus.
+
+    Paramètres
+    ----------
+    chemin : str ou pathlib.Path, optional
+        Fichier de sortie ; si absent, le texte est seulement renvoyé.
+
+    Sortie
+    ------
+    str
+        Texte au format d'exposition Prometheus.
+    """
+
+    # Agrégation par étape : sommes, nombre d'appels et maximum du pic mémoire
+    agregats = {}
+    for m in _MESURES:
+        a = agregats.setdefault(m["etape"], {"appels": 0, "duree": 0.0, "cpu": 0.0, "lignes_entree": 0,
+                                             "lignes_sortie": 0, "octets_http": 0, "memoire_pic": 0})
+        a["appels"] += 1
+        a["duree"] += m["duree"]
+        a["cpu"] += m["cpu"]
+        a["lignes_entree"] += m["lignes_entree"] or 0
+        a["lignes_sortie"] += m["lignes_sortie"] or 0
+        a["octets_http"] += m["octets_http"]
+        a["memoire_pic"] = max(a["memoire_pic"], m["memoire_pic"] or 0)
+
+    metriques = [
+        ("scripts_etape_appels_total", "counter", "appels", "Nombre d'appels de l'étape"),
+        ("scripts_etape_duree_secondes_total", "counter", "duree", "Temps réel cumulé"),
+        ("scripts_etape_cpu_secondes_total", "counter", "cpu", "Temps CPU cumulé"),
+        ("scripts_etape_lignes_entree_total", "counter", "lignes_entree", "Lignes reçues"),
+        ("scripts_etape_lignes_sortie_total", "counter", "lignes_sortie", "Lignes produites"),
+        ("scripts_etape_octets_http_total", "counter", "octets_http", "Octets HTTP reçus"),
+        ("scripts_etape_memoire_pic_octets", "gauge", "memoire_pic", "Pic d'allocation tracemalloc"),
+    ]
+    lignes = []
+    for nom, type_metrique, cle, aide in metriques:
+        lignes.append(f"# HELP {nom} {aide}")
+        lignes.append(f"# TYPE {nom} {type_metrique}")
+        for nom_etape, a in agregats.items():
+            etiquette = nom_etape.replace("\\", "\\\\").replace('"', '\\"')
+            lignes.append(f'{nom}{{etape="{etiquette}"}} {a[cle]}')
+    texte = "\n".join(lignes) + "\n"
+
+    if chemin is not None:
+        with open(chemin, "w", encoding="utf-8") as f:
+            f.write(texte)
+    return texte
@@ -0,0 +1,406 @@
+"""
+Index hiérarchique des localisations de l'OMS : monde → région → pays → infranational.
+
+Chaque localisation reçoit un identifiant entier compact (0, 1, 2, ... dans l'ordre
+d'ajout), unique pour un couple (niveau, code) : le code d'une région et celui d'un pays ne se
+confondent donc pas. L'index garde pour chaque identifiant son code, son nom, son niveau et
+l'identifiant de son parent dans des tableaux NumPy ; la recherche des ancêtres d'un lot de
+localisations se fait en au plus quatre indexations vectorisées.
+
+Les tables larges construites avec un index (get_data_OMS_code_pays.build_wide_table) portent
+une colonne LOCATION_ID. Les agrégations d'un niveau vers un niveau supérieur (moyennes
+pondérées, ex. par la population) s'appuient sur ces identifiants et sur np.bincount : leur
+coût est linéaire dans le nombre de lignes, quel que soit le nombre de localisations.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import mesurer
+
+# Type de localisation de l'API de l'OMS (LOCATION_TYPE_CODE) -> niveau dans la hiérarchie
+NIVEAUX = {"GLOBAL": 0, "REGION": 1, "COUNTRY": 2, "SUBNATIONAL": 3}
+TYPES = {niveau: type_loc for type_loc, niveau in NIVEAUX.items()}
+
+# Racine de la hiérarchie, toujours présente avec l'identifiant 0
+CODE_MONDE = "GLOBAL"
+
+# Colonnes de parent reconnues dans les facts de l'OMS
+COLONNES_PARENT = ("PARENT_LOCATION_CODE", "ParentLocationCode")
+
+
+def niveau(loc_type):
+    """
+    Renvoie le niveau d'un type de localisation (0 pour GLOBAL à 3 pour SUBNATIONAL).
+    """
+
+    if isinstance(loc_type, (int, np.integer)):
+        return int(loc_type)
+    try:
+        return NIVEAUX[loc_type]
+    except KeyError:
+        raise ValueError(f"Type de localisation inconnu : {loc_type!r} (attendu : {', '.join(NIVEAUX)})") from None
+
+
+class IndexLocalisations:
+    """
+    Index des localisations : identifiants entiers compacts, codes, noms, niveaux et parents.
+
+    L'identifiant 0 est la racine (monde). Les localisations sont ajoutées par lots avec
+    ajouter() ; un parent absent de l'index y est ajouté au niveau supérieur.
+    """
+
+    def __init__(self):
+        self.codes = [CODE_MONDE]
+        self.noms = ["Monde"]
+        self._niveaux = [0]
+        self._parents = [-1]
+        self._ids = {(0, CODE_MONDE): 0}
+        self._tableaux = None
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _arrays(self):
+        # Tableaux NumPy reconstruits seulement après un ajout
+        if self._tableaux is None:
+            self._tableaux = (np.asarray(self._niveaux, dtype="int8"), np.asarray(self._parents, dtype="int32"))
+        return self._tableaux
+
+    @property
+    def niveaux(self):
+        return self._arrays()[0]
+
+    @property
+    def parents(self):
+        return self._arrays()[1]
+
+    def identifiants(self, codes, loc_type=None):
+        """
+        Identifiants d'un lot de codes (-1 pour un code inconnu).
+
+        Paramètres
+        ----------
+        codes : iterable
+            Codes des localisations (LOCATION_CODE).
+        loc_type : str, optional
+            Type de localisation des codes ; par défaut, le niveau le plus fin où le code existe.
+
+        Sortie
+        ------
+        numpy.ndarray
+            Identifiants (int32).
+        """
+
+        codes = pd.Series(codes, dtype="object")
+        # Une recherche par code distinct : efficace sur les colonnes très répétitives
+        positions, distincts = pd.factorize(codes, use_na_sentinel=False)
+        if loc_type is not None:
+            n = niveau(loc_type)
+            ids = [self._ids.get((n, code), -1) for code in distincts]
+        else:
+            # Du niveau le plus fin au plus général : le premier niveau où le code existe
+            ids = [next((self._ids[(n, code)] for n in sorted(TYPES, reverse=True) if (n, code) in self._ids), -1)
+                   for code in distincts]
+        return np.asarray(ids, dtype="int32")[positions]
+
+    def ajouter(self, codes, loc_type, noms=None, parents=None):
+        """
+        Ajoute un lot de localisations d'un même type (les codes déjà présents sont conservés).
+
+        Paramètres
+        ----------
+        codes : iterable
+            Codes des localisations.
+        loc_type : str
+            Type de localisation : "GLOBAL", "REGION", "COUNTRY" ou "SUBNATIONAL".
+        noms : iterable, optional
+            Noms des localisations (par défaut, les codes).
+        parents : iterable, optional
+            Codes des parents, au niveau immédiatement supérieur. Par défaut : la racine pour
+            les régions et les pays, et le pays désigné par les trois premiers caractères du
+            code pour les localisations infranationales (ex. "IND_MH" -> "IND").
+
+        Sortie
+        ------
+        numpy.ndarray
+            Identifiants (int32) des localisations, dans l'ordre des codes.
+        """
+
+        n = niveau(loc_type)
+        # Un seul traitement par localisation distincte, sur sa première ligne
+        positions, distincts = pd.factorize(pd.Series(codes, dtype="object"), use_na_sentinel=False)
+        premieres = np.unique(positions, return_index=True)[1]
+        distincts = distincts.to_numpy()
+        noms = distincts if noms is None else np.asarray(pd.Series(noms, dtype="object"))[premieres]
+        if parents is None and n == NIVEAUX["SUBNATIONAL"]:
+            parents = pd.Series(distincts, dtype="object").str[:3].to_numpy()
+        elif parents is not None:
+            parents = np.asarray(pd.Series(parents, dtype="object"))[premieres]
+
+        nouveaux = np.asarray([(n, code) not in self._ids for code in distincts], dtype=bool)
+        if nouveaux.any():
+            if n == 0 or parents is None:
+                ids_parents = np.zeros(int(nouveaux.sum()), dtype="int32")
+            else:
+                codes_parents = pd.Series(parents[nouveaux], dtype="object")
+                ids_parents = self.identifiants(codes_parents, n - 1)
+                # Parents inconnus : ajoutés au niveau supérieur, rattachés à leurs propres défauts
+                inconnus = pd.unique(codes_parents[ids_parents < 0].dropna())
+                if len(inconnus):
+                    self.ajouter(inconnus, n - 1)
+                    ids_parents = self.identifiants(codes_parents, n - 1)
+                ids_parents = np.where(ids_parents < 0, 0, ids_parents)
+
+            for code, nom, parent in zip(distincts[nouveaux], noms[nouveaux], ids_parents):
+                self._ids[(n, code)] = len(self.codes)
+                self.codes.append(code)
+                self.noms.append(nom if isinstance(nom, str) else code)
+                self._niveaux.append(n)
+                self._parents.append(int(parent))
+            self._tableaux = None
+
+        ids = np.asarray([self._ids[(n, code)] for code in distincts], dtype="int32")
+        return ids[positions]
+
+    def ancetres(self, ids, loc_type):
+        """
+        Identifiants des ancêtres d'un lot de localisations à un niveau donné.
+
+        Paramètres
+        ----------
+        ids : array-like
+            Identifiants des localisations.
+        loc_type : str
+            Niveau recherché ; une localisation de ce niveau est son propre ancêtre.
+
+        Sortie
+        ------
+        numpy.ndarray
+            Identifiants (int32) des ancêtres, -1 pour les localisations de niveau supérieur
+            (ou d'identifiant -1).
+        """
+
+        n = niveau(loc_type)
+        niveaux, parents = self._arrays()
+        courant = np.asarray(ids, dtype="int32")
+        valide = courant >= 0
+        courant = np.where(valide, courant, 0)
+        # Remontée d'un niveau à la fois, pour tout le lot (profondeur maximale : 3)
+        for _ in range(len(NIVEAUX) - 1):
+            plus_fin = niveaux[courant] > n
+            if not plus_fin.any():
+                break
+            courant = np.where(plus_fin, parents[courant], courant)
+        return np.where(valide & (niveaux[courant] == n), courant, -1).astype("int32")
+
+    def to_frame(self):
+        """
+        Sortie
+        ------
+        pandas.DataFrame
+            Une ligne par localisation : LOCATION_ID | LOCATION_CODE | LOCATION |
+            LOCATION_TYPE_CODE | parent.
+        """
+
+        niveaux, parents = self._arrays()
+        return pd.DataFrame({
+            "LOCATION_ID": np.arange(len(self), dtype="int32"),
+            "LOCATION_CODE": pd.Series(self.codes, dtype="string"),
+            "LOCATION": pd.Series(self.noms, dtype="string"),
+            "LOCATION_TYPE_CODE": pd.Categorical.from_codes(niveaux, list(NIVEAUX)),
+            "parent": parents,
+        })
+
+
+def index_depuis_faits(facts_df, loc_type="COUNTRY", index=None):
+    """
+    Ajoute à un index les localisations d'une table de facts de l'OMS.
+
+    Le type de chaque ligne est lu dans LOCATION_TYPE_CODE si la colonne existe (sinon
+    loc_type) et le parent dans PARENT_LOCATION_CODE si elle existe (sinon, voir
+    IndexLocalisations.ajouter). Les types sont ajoutés du plus général au plus fin.
+
+    Paramètres
+    ----------
+    facts_df : pandas.DataFrame
+        Facts de l'OMS (colonnes LOCATION_CODE et LOCATION).
+    loc_type : str, optional
+        Type des localisations en l'absence de LOCATION_TYPE_CODE (par défaut "COUNTRY").
+    index : IndexLocalisations, optional
+        Index à compléter (par défaut, un nouvel index).
+
+    Sortie
+    ------
+    tuple
+        (index, ids) : index complété et identifiant (int32) de chaque ligne de facts_df.
+    """
+
+    index = IndexLocalisations() if index is None else index
+    types = (facts_df["LOCATION_TYPE_CODE"].astype("string").fillna(loc_type)
+             if "LOCATION_TYPE_CODE" in facts_df.columns else pd.Series(loc_type, index=facts_df.index))
+    col_parent = next((c for c in COLONNES_PARENT if c in facts_df.columns), None)
+
+    ids = np.full(len(facts_df), -1, dtype="int32")
+    for type_loc in sorted(pd.unique(types), key=niveau):
+        lignes = (types == type_loc).to_numpy()
+        sous = facts_df.loc[lignes]
+        parents = None
+        if col_parent is not None and sous[col_parent].notna().any():
+            parents = sous[col_parent]
+        ids[lignes] = index.ajouter(sous["LOCATION_CODE"], type_loc, sous["LOCATION"], parents)
+    return index, ids
+
+
+def index_depuis_regions(regions, noms=None, index=None):
+    """
+    Construit la hiérarchie monde → région → pays à partir d'une correspondance pays -> région
+    (ex. régions de l'OMS, ou régions de la Banque mondiale de Niveau_richesse_pays.csv).
+
+    Paramètres
+    ----------
+    regions : pandas.Series ou dict
+        Code ISO3 du pays -> code (ou nom) de sa région.
+    noms : pandas.Series ou dict, optional
+        Code ISO3 -> nom du pays.
+    index : IndexLocalisations, optional
+        Index à compléter (par défaut, un nouvel index).
+
+    Sortie
+    ------
+    IndexLocalisations
+        Index complété.
+    """
+
+    index = IndexLocalisations() if index is None else index
+    regions = pd.Series(regions, dtype="object").dropna()
+    index.ajouter(pd.unique(regions), "REGION")
+    noms_pays = None if noms is None else regions.index.map(pd.Series(noms, dtype="object"))
+    index.ajouter(regions.index, "COUNTRY", noms_pays, regions.to_numpy())
+    return index
+
+
+def iso3(index, ids):
+    """
+    Code ISO3 du pays de chaque localisation (le pays lui-même, ou le pays parent d'une
+    localisation infranationale), NaN au-dessus du niveau pays.
+
+    Paramètres
+    ----------
+    index : IndexLocalisations
+        Index des localisations.
+    ids : array-like
+        Identifiants des localisations.
+
+    Sortie
+    ------
+    pandas.Series
+        Série catégorielle des codes ISO3.
+    """
+
+    pays = index.ancetres(ids, "COUNTRY")
+    codes = np.asarray(index.codes, dtype="object")
+    return pd.Series(np.where(pays >= 0, codes[np.maximum(pays, 0)], None), dtype="category")
+
+
+@mesurer()
+def agreger(df, index, loc_type, colonnes=None, poids=None, col_id="LOCATION_ID", depuis=None):
+    """
+    Agrège une table vers un niveau supérieur de la hiérarchie (moyennes, éventuellement
+    pondérées, ex. par la population).
+
+    Pour chaque colonne, seules les lignes où la valeur est renseignée comptent dans la
+    moyenne et dans la somme des poids. Un niveau peut être agrégé directement vers n'importe
+    quel niveau supérieur (ex. infranational -> région).
+
+    Une table peut mêler plusieurs niveaux (ex. l'Inde et ses États). Pour ne pas compter deux
+    fois la même population, une valeur dont la localisation a un ancêtre (jusqu'au niveau
+    demandé) renseigné pour la même colonne est ignorée : chaque groupe est agrégé, colonne par
+    colonne, depuis ses lignes renseignées les plus générales.
+    Avec depuis, seules les lignes de ce niveau sont agrégées.
+
+    Paramètres
+    ----------
+    df : pandas.DataFrame
+        Table à agréger, avec une colonne d'identifiants col_id ou, à défaut, une colonne
+        Pays_code_iso3 (table fusionnée au niveau pays).
+    index : IndexLocalisations
+        Index des localisations de df.
+    loc_type : str
+        Niveau d'agrégation : "GLOBAL", "REGION" ou "COUNTRY".
+    colonnes : list, optional
+        Colonnes à agréger (par défaut, toutes les colonnes numériques sauf col_id et poids).
+    poids : str, optional
+        Colonne de pondération (ex. population) ; par défaut, moyenne simple.
+    col_id : str, optional
+        Colonne des identifiants de localisation (par défaut "LOCATION_ID").
+    depuis : str, optional
+        Niveau des lignes à agréger (ex. "COUNTRY"), égal ou plus fin que loc_type ; par
+        défaut, les lignes les plus générales de chaque groupe (voir plus haut).
+
+    Sortie
+    ------
+    pandas.DataFrame
+        Une ligne par localisation du niveau demandé : LOCATION_ID | LOCATION_CODE | LOCATION |
+        n_localisations | colonnes agrégées (et somme des poids sous le nom de la colonne de
+        pondération).
+    """
+
+    if col_id in df.columns:
+        ids = df[col_id].to_numpy(dtype="int32")
+    else:
+        ids = index.identifiants(df["Pays_code_iso3"].astype("object"), "COUNTRY")
+    if colonnes is None:
+        colonnes = [c for c in df.columns if c not in (col_id, poids)
+                    and pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+
+    n = niveau(loc_type)
+    niveaux = index.niveaux
+    niveaux_lignes = np.where(ids >= 0, niveaux[np.maximum(ids, 0)], -1)
+    groupes = index.ancetres(ids, loc_type)
+    base = groupes >= 0
+    if depuis is not None:
+        if niveau(depuis) < n:
+            raise ValueError(f"depuis ({depuis!r}) doit être un niveau égal ou plus fin que loc_type ({loc_type!r})")
+        base &= niveaux_lignes == niveau(depuis)
+    # Ancêtres de chaque ligne entre le niveau demandé et le sien (calculés une seule fois)
+    ancetres = []
+    if depuis is None:
+        for niveau_ancetre in range(n, len(NIVEAUX) - 1):
+            a = index.ancetres(ids, niveau_ancetre)
+            ancetres.append(((niveaux_lignes > niveau_ancetre) & (a >= 0), np.maximum(a, 0)))
+
+    def retenues(valide):
+        # Lignes valides qui ne sont pas couvertes par un ancêtre valide présent dans la table
+        garde = base & valide
+        presentes = np.zeros(len(index), dtype=bool)
+        presentes[ids[garde]] = True
+        for a_ancetre, ancetre in ancetres:
+            garde &= ~(a_ancetre & presentes[ancetre])
+        return garde
+
+    taille = len(index)
+    w = (np.ones(len(df)) if poids is None else df[poids].to_numpy(dtype="float64", na_value=np.nan))
+    w = np.where(np.isnan(w), 0.0, w)
+
+    # La couverture est décidée colonne par colonne : un ancêtre sans valeur pour une colonne
+    # ne masque pas les valeurs de ses descendants (ex. indicateur publié par État seulement)
+    resultat = {}
+    X = df[colonnes].to_numpy(dtype="float64", na_value=np.nan)
+    utilisees = np.zeros(len(df), dtype=bool) if colonnes else retenues(np.ones(len(df), dtype=bool))
+    for j, col in enumerate(colonnes):
+        garde = retenues(~np.isnan(X[:, j]))
+        utilisees |= garde
+        somme_poids = np.bincount(groupes[garde], weights=w[garde], minlength=taille)
+        somme = np.bincount(groupes[garde], weights=(w * X[:, j])[garde], minlength=taille)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            resultat[col] = np.where(somme_poids > 0, somme / somme_poids, np.nan)
+    resultat = {"n_localisations": np.bincount(groupes[utilisees], minlength=taille), **resultat}
+    if poids is not None:
+        resultat[poids] = np.bincount(groupes[utilisees], weights=w[utilisees], minlength=taille)
+
+    presents = np.flatnonzero(np.bincount(groupes[base], minlength=taille) > 0)
+    table = index.to_frame().iloc[presents, :3].reset_index(drop=True)
+    for nom, valeurs in resultat.items():
+        table[nom] = valeurs[presents]
+    return table
@@ -0,0 +1,275 @@
+"""
+Table fusionnée placée en mémoire partagée pour les analyses multi-processus.
+
+Les colonnes numériques sont écrites une seule fois dans un segment
+multiprocessing.shared_memory (ou dans un fichier projeté en mémoire) ; les colonnes
+catégorielles ou textuelles y sont stockées sous forme de codes entiers. Un petit
+descripteur (dictionnaire picklable) décrit les colonnes, leurs types, leurs décalages et
+les catégories. Les workers s'attachent au segment et lisent les colonnes comme des vues
+NumPy, sans copie ni désérialisation de la table.
+"""
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# Alignement des colonnes dans le segment (octets)
+ALIGNEMENT = 64
+
+
+def _aligner(position):
+    return -(-position // ALIGNEMENT) * ALIGNEMENT
+
+
+def _colonnes_a_stocker(df):
+    # Colonne -> (tableau NumPy, catégories éventuelles)
+    colonnes = {}
+    for col in df.columns:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            colonnes[col] = (serie.cat.codes.to_numpy(), serie.cat.categories.tolist())
+        elif pd.api.types.is_bool_dtype(serie) or pd.api.types.is_numeric_dtype(serie):
+            if serie.hasnans and not pd.api.types.is_float_dtype(serie):
+                serie = serie.astype("float64")
+            colonnes[col] = (serie.to_numpy(), None)
+        else:
+            codes, categories = pd.factorize(serie)
+            colonnes[col] = (codes.astype("int32"), categories.tolist())
+    return colonnes
+
+
+def _ouvrir_segment(nom):
+    try:
+        # Python >= 3.13 : pas de suivi par le resource_tracker pour un simple attachement
+        return shared_memory.SharedMemory(name=nom, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=nom)
+
+
+class JeuPartage:
+    """
+    Accès à une table placée en mémoire partagée (voir partager et attacher).
+    """
+
+    def __init__(self, descripteur, tampon, segment=None, proprietaire=False):
+        self.descripteur = descripteur
+        self._tampon = tampon
+        self._segment = segment
+        self._proprietaire = proprietaire
+
+    def __len__(self):
+        return self.descripteur["n_lignes"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+        return False
+
+    @property
+    def colonnes(self):
+        return [c["nom"] for c in self.descripteur["colonnes"]]
+
+    def colonne(self, nom):
+        """
+        Renvoie une colonne sous forme de vue NumPy en lecture sur le segment partagé.
+
+        Les colonnes catégorielles sont renvoyées sous forme de codes entiers (-1 pour NaN),
+        les catégories étant disponibles avec categories(nom).
+        """
+
+        for c in self.descripteur["colonnes"]:
+            if c["nom"] == nom:
+                vue = np.ndarray((len(self),), dtype=np.dtype(c["dtype"]), buffer=self._tampon, offset=c["decalage"])
+                vue.flags.writeable = False
+                return vue
+        raise KeyError(nom)
+
+    def categories(self, nom):
+        for c in self.descripteur["colonnes"]:
+            if c["nom"] == nom:
+                return c["categories"]
+        raise KeyError(nom)
+
+    def matrice(self, colonnes):
+        """
+        Assemble plusieurs colonnes numériques dans une matrice float64 (n_lignes × n_colonnes).
+        Contrairement à colonne(), cette opération copie les données.
+        """
+
+        return np.column_stack([self.colonne(c).astype("float64", copy=False) for c in colonnes])
+
+    def to_frame(self, colonnes=None):
+        """
+        Reconstruit un DataFrame pandas (les colonnes catégorielles retrouvent leurs libellés).
+
+        Paramètres
+        ----------
+        colonnes : list, optional
+            Colonnes à reconstruire (par défaut toutes).
+
+        Sortie
+        ------
+        pandas.DataFrame
+            DataFrame, copie des données partagées.
+        """
+
+        donnees = {}
+        for nom in colonnes or self.colonnes:
+            valeurs = self.colonne(nom)
+            categories = self.categories(nom)
+            donnees[nom] = pd.Categorical.from_codes(valeurs, categories) if categories is not None else valeurs
+        return pd.DataFrame(donnees)
+
+    def fermer(self):
+        """
+        Détache le segment ; le propriétaire le supprime également.
+        """
+
+        self._tampon = None
+        if self._segment is not None:
+            try:
+                self._segment.close()
+            except BufferError:
+                # Des vues NumPy sont encore utilisées : le segment sera libéré avec elles
+                pass
+            if self._proprietaire:
+                self._segment.unlink()
+            self._segment = None
+
+
+def partager(df, support="shm", chemin=None):
+    """
+    Place une table dans un segment de mémoire partagée ou dans un fichier projeté en mémoire.
+
+    Paramètres
+    ----------
+    df : pandas.DataFrame
+        Table à partager (ex. Table_fusion_income_groupe normalisée).
+    support : str, optional
+        "shm" pour multiprocessing.shared_memory, "memmap" pour un fichier (par défaut "shm").
+    chemin : str ou pathlib.Path, optional
+        Fichier de données pour support="memmap" ; le descripteur est écrit à côté (.json).
+
+    Sortie
+    ------
+    JeuPartage
+        Accès propriétaire ; son attribut descripteur est à transmettre aux workers.
+        Le segment est supprimé par fermer() (ou en sortie de bloc with).
+    """
+
+    colonnes = _colonnes_a_stocker(df)
+
+    # Calcul des décalages de chaque colonne dans le segment
+    entetes, position = [], 0
+    for nom, (valeurs, categories) in colonnes.items():
+        position = _aligner(position)
+        entetes.append({"nom": nom, "dtype": valeurs.dtype.str, "decalage": position, "categories": categories})
+        position += valeurs.nbytes
+    taille = max(position, 1)
+
+    descripteur = {"support": support, "n_lignes": len(df), "taille": taille, "colonnes": entetes}
+
+    if support == "shm":
+        segment = shared_memory.SharedMemory(create=True, size=taille)
+        descripteur["nom"] = segment.name
+        tampon = segment.buf
+    elif support == "memmap":
+        if chemin is None:
+            raise ValueError("Le support 'memmap' nécessite un chemin de fichier")
+        segment = None
+        descripteur["chemin"] = str(chemin)
+        tampon = np.memmap(chemin, dtype=np.uint8, mode="w+", shape=(taille,))
+    else:
+        raise ValueError("Support invalide : choisir 'shm' ou 'memmap'")
+
+    # Écriture unique des colonnes
+    for entete, (valeurs, _) in zip(entetes, colonnes.values()):
+        cible = np.ndarray(valeurs.shape, dtype=valeurs.dtype, buffer=tampon, offset=entete["decalage"])
+        cible[:] = valeurs
+
+    if support == "memmap":
+        tampon.flush()
+        with open(f"{chemin}.json", "w", encoding="utf-8") as f:
+            json.dump(descripteur, f, ensure_ascii=False)
+
+    return JeuPartage(descripteur, tampon, segment, proprietaire=True)
+
+
+def attacher(descripteur):
+    """
+    S'attache à une table partagée, sans copie.
+
+    Paramètres
+    ----------
+    descripteur : dict, str ou pathlib.Path
+        Descripteur renvoyé par partager (JeuPartage.descripteur), ou chemin du fichier .json
+        écrit pour le support "memmap".
+
+    Sortie
+    ------
+    JeuPartage
+        Accès en lecture ; fermer() détache sans supprimer les données.
+    """
+
+    if not isinstance(descripteur, dict):
+        with open(descripteur, encoding="utf-8") as f:
+            descripteur = json.load(f)
+
+    if descripteur["support"] == "shm":
+        segment = _ouvrir_segment(descripteur["nom"])
+        return JeuPartage(descripteur, segment.buf, segment)
+
+    tampon = np.memmap(descripteur["chemin"], dtype=np.uint8, mode="r", shape=(descripteur["taille"],))
+    return JeuPartage(descripteur, tampon)
+
+
+# Table partagée du worker courant, attachée une seule fois par initialiser_worker
+_JEU_WORKER = None
+
+
+def initialiser_worker(descripteur):
+    """
+    Initialiseur de pool : attache la table partagée une fois par worker.
+    """
+
+    global _JEU_WORKER
+    _JEU_WORKER = attacher(descripteur)
+
+
+def jeu_du_worker():
+    """
+    Renvoie la table partagée attachée par initialiser_worker dans le worker courant.
+    """
+
+    if _JEU_WORKER is None:
+        raise RuntimeError("Aucune table partagée : utiliser initialiser_worker comme initialiseur du pool")
+    return _JEU_WORKER
+
+
+def pool_partage(jeu, max_workers=None):
+    """
+    Crée un pool de processus dont chaque worker est attaché à la table partagée.
+
+    Les fonctions soumises au pool récupèrent la table avec jeu_du_worker() ; seuls leurs
+    arguments propres (ex. une année, une liste d'indicateurs) sont sérialisés.
+
+    Paramètres
+    ----------
+    jeu : JeuPartage
+        Table renvoyée par partager.
+    max_workers : int, optional
+        Nombre de workers (par défaut, nombre de processeurs).
+
+    Sortie
+    ------
+    concurrent.futures.ProcessPoolExecutor
+        Pool à utiliser dans un bloc with.
+    """
+
+    return ProcessPoolExecutor(max_workers=max_workers, initializer=initialiser_worker,
+                               initargs=(jeu.descripteur,))
@@ -0,0 +1,195 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+import requests
+
+from . import instrumentation
+from .chemins import FICHIERS_OMS, FICHIER_PIB, FICHIER_IHME, FICHIER_NIVEAU_RICHESSE
+from .fusion_donnees import fusion_oms, fusion_ihme, fusion_pib, fusion_niveau_richesse
+from .get_data_OMS_code_pays import get_headers, get_facts, preparer_groupe, COLONNES_GROUPES, NOMS_INDICATEURS
+from .get_data_PIB_hab import telecharger_gdp_per_capita, gdp_format_long, gdp_format_large
+from .imputation import imputer
+from .normalisation import lire_csv
+from .traitement_données_IHME import restructure_data, harmoniser_noms
+
+
+class Chronologie:
+    """
+    Enregistre le début et la fin de chaque étape du pipeline, en secondes depuis son lancement.
+    """
+
+    def __init__(self):
+        self.origine = time.perf_counter()
+        self.etapes = []
+
+    def ajouter(self, etape, type_etape, debut, fin):
+        self.etapes.append({
+            "etape": etape,
+            "type": type_etape,
+            "debut": debut - self.origine,
+            "fin": fin - self.origine,
+            "duree": fin - debut,
+        })
+
+    def to_frame(self):
+        """
+        Sortie
+        ------
+        pandas.DataFrame
+            Une ligne par étape, triée par heure de début.
+        """
+        return pd.DataFrame(self.etapes, columns=["etape", "type", "debut", "fin", "duree"]).sort_values("debut", ignore_index=True)
+
+
+async def _executer(chrono, etape, type_etape, executeur, fonction, *args):
+    """
+    Exécute une fonction bloquante dans un exécuteur et enregistre sa durée dans la chronologie.
+    """
+
+    loop = asyncio.get_running_loop()
+    debut = time.perf_counter()
+    try:
+        if isinstance(executeur, ProcessPoolExecutor) and instrumentation.est_actif():
+            # Les mesures prises dans le worker reviennent avec le résultat
+            resultat, mesures = await loop.run_in_executor(
+                executeur, instrumentation.executer_dans_worker, instrumentation._MEMOIRE, fonction, *args)
+            instrumentation.ajouter_mesures(mesures)
+            return resultat
+        return await loop.run_in_executor(executeur, fonction, *args)
+    finally:
+        chrono.ajouter(etape, type_etape, debut, time.perf_counter())
+
+
+def _transformer_oms(headers_df, facts_df, colonnes):
+    # Table large renommée avec les libellés des sauvegardes standardisées
+    return preparer_groupe(headers_df, facts_df, colonnes).rename(columns=NOMS_INDICATEURS)
+
+
+def _transformer_pib(data):
+    return gdp_format_large(gdp_format_long(data))
+
+
+def _transformer_ihme(chemin):
+    # Sélection des deux indicateurs nous intéressant, noms alignés sur ceux de l'OMS
+    return harmoniser_noms(restructure_data(chemin)[['LOCATION', 'Eating_disorders', 'Mental_disorders']])
+
+
+async def _charger_oms(grp, chrono, io, cpu):
+    try:
+        headers_df, facts_df = await asyncio.gather(
+            _executer(chrono, f"headers_{grp}", "reseau", io, get_headers, grp),
+            _executer(chrono, f"facts_{grp}", "reseau", io, get_facts, grp),
+        )
+    except requests.exceptions.RequestException:
+        print(f"L'API de l'OMS n'est pas disponible pour {grp}, la sauvegarde locale a été utilisée")
+        return await _executer(chrono, f"lecture_{grp}", "disque", io, lire_csv, FICHIERS_OMS[grp])
+
+    # Le payload est transmis au pool de calcul dès son arrivée
+    return await _executer(chrono, f"transformation_{grp}", "calcul", cpu,
+                           _transformer_oms, headers_df, facts_df, COLONNES_GROUPES[grp])
+
+
+async def _charger_pib(chrono, io, cpu):
+    try:
+        data = await _executer(chrono, "telechargement_PIB", "reseau", io, telecharger_gdp_per_capita)
+    except requests.exceptions.RequestException:
+        print("L'API n'est pas disponible, la sauvegarde locale a été utilisée")
+        return await _executer(chrono, "lecture_PIB", "disque", io, lire_csv, FICHIER_PIB)
+
+    return await _executer(chrono, "transformation_PIB", "calcul", cpu, _transformer_pib, data)
+
+
+async def pipeline_asynchrone(max_workers=None, processus=True, imputation=False):
+    """
+    Récupère et fusionne toutes les sources en recouvrant les accès réseau et les transformations.
+
+    Tous les téléchargements (OMS, Banque mondiale) et lectures locales (IHME, groupes de revenu)
+    démarrent en même temps. Chaque payload est confié au pool de calcul dès son arrivée et
+    chaque fusion est lancée dès que ses deux entrées sont prêtes. Le temps total est ainsi proche
+    de celui de la source la plus lente.
+
+    Dans un notebook, utiliser directement `await pipeline_asynchrone()`.
+
+    Paramètres
+    ----------
+    max_workers : int, optional
+        Nombre de workers du pool de calcul (par défaut, nombre de processeurs).
+    processus : bool, optional
+        True pour un pool de processus, False pour un pool de threads (par défaut True).
+    imputation : bool, optional
+        Ajoute la table fusionnée imputée (voir imputation.imputer) sous la clé
+        "fusion_imputee" et le masque des valeurs manquantes d'origine sous la clé
+        "manquants" (par défaut False).
+
+    Sortie
+    ------
+    dict
+        Dictionnaire contenant les DataFrames "SDG3", "SDG_GPW", "IHME", "PIB", "fusion",
+        "fusion_niveau_richesse" et la chronologie des étapes sous la clé "chronologie".
+    """
+
+    chrono = Chronologie()
+    pool_calcul = ProcessPoolExecutor if processus else ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=8) as io, pool_calcul(max_workers=max_workers) as cpu:
+        # Lancement simultané de toutes les sources
+        t_sdg3 = asyncio.create_task(_charger_oms("SDG3", chrono, io, cpu))
+        t_gpw = asyncio.create_task(_charger_oms("SDG_GPW", chrono, io, cpu))
+        t_ihme = asyncio.create_task(_executer(chrono, "transformation_IHME", "calcul", cpu,
+                                               _transformer_ihme, FICHIER_IHME))
+        t_pib = asyncio.create_task(_charger_pib(chrono, io, cpu))
+        t_income = asyncio.create_task(_executer(chrono, "lecture_niveau_richesse", "disque", io,
+                                                 lire_csv, FICHIER_NIVEAU_RICHESSE))
+
+        # Chaque fusion attend uniquement ses propres entrées
+        df_sdg3, df_gpw = await asyncio.gather(t_sdg3, t_gpw)
+        df_oms = await _executer(chrono, "fusion_oms", "fusion", io, fusion_oms, df_gpw, df_sdg3)
+        df_ihme = await t_ihme
+        df_health = await _executer(chrono, "fusion_ihme", "fusion", io, fusion_ihme, df_oms, df_ihme)
+        df_pib = await t_pib
+        df_final = await _executer(chrono, "fusion_pib", "fusion", io, fusion_pib, df_health, df_pib)
+        df_income = await t_income
+        df_final_group = await _executer(chrono, "fusion_niveau_richesse", "fusion", io,
+                                         fusion_niveau_richesse, df_final, df_income)
+
+        resultats = {
+            "SDG3": df_sdg3,
+            "SDG_GPW": df_gpw,
+            "IHME": df_ihme,
+            "PIB": df_pib,
+            "fusion": df_final,
+            "fusion_niveau_richesse": df_final_group,
+        }
+
+        # Imputation entre la fusion et les modèles : indicateurs traités l'un après l'autre, chaque
+        # requête de voisins répartie sur tous les processeurs (workers=-1)
+        if imputation:
+            resultats["fusion_imputee"], resultats["manquants"] = await _executer(
+                chrono, "imputation", "calcul", io, imputer, df_final_group)
+
+    resultats["chronologie"] = chrono.to_frame()
+    return resultats
+
+
+def executer_pipeline(max_workers=None, processus=True, imputation=False):
+    """
+    Version synchrone de pipeline_asynchrone, pour les scripts.
+
+    Paramètres
+    ----------
+    max_workers : int, optional
+        Nombre de workers du pool de calcul.
+    processus : bool, optional
+        True pour un pool de processus, False pour un pool de threads (par défaut True).
+    imputation : bool, optional
+        Ajoute la table fusionnée imputée (par défaut False).
+
+    Sortie
+    ------
+    dict
+        Même contenu que pipeline_asynchrone.
+    """
+
+    return asyncio.run(pipeline_asynchrone(max_workers=max_workers, processus=processus, imputation=imputation))
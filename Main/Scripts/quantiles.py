@@ -0,0 +1,140 @@
+"""
+Moteur de quantiles du PIB par habitant : un seul tri par année (ou sur toutes les années
+regroupées) et l'affectation aux quantiles pour plusieurs valeurs de k en une passe vectorisée.
+
+Le quantile d'un pays est défini par son rang moyen pondéré dans l'année : la position
+p = (poids cumulé avant le pays + moitié de son poids) / poids total de l'année, puis
+quantile = floor(p × k) + 1. Les valeurs ex aequo partagent la même position.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import mesurer
+
+
+def _format_long(df, y_col, col_pays, col_annee):
+    # Table au format large (une colonne par année) -> format long
+    if col_annee in df.columns:
+        return df
+    annees = [c for c in df.columns if str(c).isdigit()]
+    long_df = df.melt(id_vars=[col_pays], value_vars=annees, var_name=col_annee, value_name=y_col)
+    long_df[col_annee] = long_df[col_annee].astype("int16")
+    return long_df
+
+
+@mesurer()
+def table_quantiles(df, ks=(4, 10), y_col="GDP_per_capita", mode="annee", poids=None,
+                    col_pays="Country Code", col_annee="Year", pays=None):
+    """
+    Affecte chaque pays et chaque année à un quantile de PIB, pour plusieurs valeurs de k.
+
+    Paramètres
+    ----------
+    df : pandas.DataFrame
+        PIB au format long (get_gdp_per_capita : Country Code | Year | GDP_per_capita) ou au
+        format large (une colonne par année, ex. table fusionnée avec col_pays="Pays_code_iso3").
+    ks : iterable, optional
+        Nombres de quantiles (par défaut (4, 10) : quartiles et déciles).
+    y_col : str, optional
+        Colonne de valeurs (par défaut 'GDP_per_capita').
+    mode : str, optional
+        "annee" : quantiles calculés séparément pour chaque année (position relative du pays) ;
+        "global" : toutes les années regroupées, comme l'ancien pd.qcut. Par défaut "annee".
+    poids : str, optional
+        Colonne de pondération (ex. population, telecharger_gdp_per_capita(indicator="SP.POP.TOTL")) ;
+        par défaut chaque pays compte pour un.
+    col_pays, col_annee : str, optional
+        Colonnes du pays et de l'année (par défaut "Country Code" et "Year").
+    pays : iterable, optional
+        Codes des pays à classer, les autres lignes sont écartées. Permet d'exclure les agrégats
+        régionaux de la Banque mondiale, qui ont un code (ex. les codes dont l'IncomeGroup est
+        renseigné dans Données_niveau_richesse.csv). Par défaut toutes les lignes ayant un code.
+
+    Sortie
+    ------
+    pandas.DataFrame
+        Table « tidy » pays × année × k : col_pays | col_annee | k | quantile | y_col,
+        quantile allant de 1 à k. Les valeurs manquantes et les lignes sans code pays (agrégats
+        par niveau de revenu de la sauvegarde de la Banque mondiale) sont écartées.
+    """
+
+    if mode not in ("annee", "global"):
+        raise ValueError("Mode invalide : choisir 'annee' ou 'global'")
+
+    d = _format_long(df, y_col, col_pays, col_annee)
+    garder = d[y_col].notna() & d[col_pays].notna()
+    if pays is not None:
+        garder &= d[col_pays].isin(list(pays))
+    d = d[garder]
+    valeurs = d[y_col].to_numpy(dtype="float64")
+    w = np.ones(len(d)) if poids is None else d[poids].fillna(0).to_numpy(dtype="float64")
+    groupes = pd.factorize(d[col_annee])[0] if mode == "annee" else np.zeros(len(d), dtype=np.int64)
+    ks = np.asarray(list(ks), dtype=np.int64)
+
+    # Tri unique par (groupe, valeur)
+    ordre = np.lexsort((valeurs, groupes))
+    v, g, ws = valeurs[ordre], groupes[ordre], w[ordre]
+
+    # Poids cumulé avant chaque observation, à l'intérieur de son groupe
+    total = np.bincount(g, weights=ws)
+    cumul = np.cumsum(ws)
+    debut_groupe = np.concatenate([[0.0], np.cumsum(total)[:-1]])
+    avant = cumul - ws - debut_groupe[g]
+
+    # Les ex aequo (même groupe, même valeur) partagent la position centrale de leur bloc
+    nouveau = np.r_[True, (g[1:] != g[:-1]) | (v[1:] != v[:-1])]
+    bloc = np.cumsum(nouveau) - 1
+    debut_bloc = avant[nouveau]
+    fin_bloc = np.bincount(bloc, weights=ws) + debut_bloc
+    position = (debut_bloc[bloc] + fin_bloc[bloc]) / 2 / np.where(total[g] > 0, total[g], 1.0)
+
+    # Affectation pour toutes les valeurs de k en une seule opération
+    quantiles_tries = np.minimum(np.floor(position[:, None] * ks[None, :]).astype(np.int64) + 1, ks[None, :])
+    quantiles = np.empty_like(quantiles_tries)
+    quantiles[ordre] = quantiles_tries
+
+    n, nk = quantiles.shape
+    return pd.DataFrame({
+        col_pays: np.repeat(d[col_pays].to_numpy(), nk),
+        col_annee: np.repeat(d[col_annee].to_numpy(), nk),
+        "k": np.tile(ks, n).astype("int16"),
+        "quantile": quantiles.ravel().astype("int16"),
+        y_col: np.repeat(valeurs, nk),
+    }).astype({col_pays: "category"})
+
+
+def ajouter_quantiles(df, table, k, annee, col_pays="Pays_code_iso3", colonne=None):
+    """
+    Ajoute à une table par pays (ex. table fusionnée) le quantile de PIB d'une année,
+    pour les graphiques en barres (paramètre groupe de afficher_graphiques) ou les régressions.
+
+    Paramètres
+    ----------
+    df : pandas.DataFrame
+        Table avec une ligne par pays.
+    table : pandas.DataFrame
+        Table renvoyée par table_quantiles.
+    k : int
+        Nombre de quantiles.
+    annee : int ou str
+        Année de PIB.
+    col_pays : str, optional
+        Colonne des codes pays de df (par défaut "Pays_code_iso3").
+    colonne : str, optional
+        Nom de la colonne ajoutée (par défaut f"Quantile PIB {annee} (k={k})").
+
+    Sortie
+    ------
+    pandas.DataFrame
+        Copie de df avec la colonne des quantiles (entiers, NaN si absent).
+    """
+
+    col_pays_table, col_annee = table.columns[0], table.columns[1]
+    selection = table[(table["k"] == k) & (table[col_annee] == int(annee))]
+    # Codes comparés en objets : un code manquant reste NaN au lieu de devenir la chaîne "nan"
+    correspondance = pd.Series(selection["quantile"].to_numpy(), index=selection[col_pays_table].astype(object))
+
+    df = df.copy()
+    df[colonne or f"Quantile PIB {annee} (k={k})"] = df[col_pays].astype(object).map(correspondance).astype("Int16")
+    return df
@@ -0,0 +1,433 @@
+"""
+Rapport HTML statique des analyses, à la place des sorties embarquées dans Main.ipynb.
+
+Chaque section exécute des fonctions d'analyse du package. Leurs sorties sont capturées :
+texte imprimé, figures matplotlib (au moment de plt.show()), et figures plotly, tables ou
+paragraphes renvoyés par la section. Elles sont ensuite converties en HTML.
+
+- Les figures sont des ressources externes du dossier assets, nommées par l'empreinte de leur
+  contenu. Une figure identique d'une exécution à l'autre garde donc son fichier, qui n'est
+  pas réécrit.
+- plotly.js et le gabarit de mise en forme plotly ne sont chargés qu'une fois pour toute la
+  page. Chaque figure plotly n'est tracée qu'à son arrivée à l'écran.
+- Le fragment HTML de chaque section est mis en cache (.cache/rapport). La clé est l'empreinte
+  des colonnes d'entrée de la section, de son code et des modules d'analyse qu'elle utilise.
+  Une section dont rien n'a changé est reprise telle quelle, sans relancer ses calculs.
+"""
+
+import hashlib
+import html
+import inspect
+import io
+import json
+import pickle
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import pandas as pd
+
+from .cache import dossier_cache, empreinte
+from .chemins import DOSSIER_RAPPORT, FICHIER_FUSION_GROUPE
+from .instrumentation import mesurer
+from .recherche_modeles import indicateurs_disponibles
+
+# À incrémenter quand le rendu HTML change, pour invalider les sections en cache
+VERSION = 1
+
+TITRE = "Développement économique et Santé"
+
+# Tracé différé des figures plotly : chaque ressource de figure appelle tracer() avec son JSON
+_SCRIPT_PAGE = """
+var gabarits = {};
+function gabarit(nom, valeur) { gabarits[nom] = valeur; }
+var observateur = new IntersectionObserver(function (entrees) {
+  entrees.forEach(function (entree) {
+    if (!entree.isIntersecting) return;
+    observateur.unobserve(entree.target);
+    var f = entree.target.figure;
+    if (f.gabarit) f.layout.template = gabarits[f.gabarit];
+    Plotly.newPlot(entree.target, {data: f.data, layout: f.layout, frames: f.frames || [],
+                                   config: {responsive: true}});
+  });
+}, {rootMargin: "300px"});
+function tracer(script, nomGabarit, f) {
+  var div = script.previousElementSibling;
+  f.gabarit = nomGabarit;
+  div.figure = f;
+  observateur.observe(div);
+}
+"""
+
+_STYLE = """
+body { font-family: sans-serif; max-width: 1200px; margin: auto; padding: 0 1em; color: #222; }
+nav ul { columns: 2; }
+pre { background: #f6f6f6; padding: .6em; overflow-x: auto; font-size: 12px; }
+img { max-width: 100%; height: auto; display: block; margin: 1em 0; }
+table.table { border-collapse: collapse; font-size: 13px; margin: 1em 0; }
+table.table th, table.table td { padding: 2px 8px; border-bottom: 1px solid #ddd; text-align: right; }
+.figure { min-height: 500px; margin: 1em 0; }
+"""
+
+
+def _annees(df):
+    return [c for c in df.columns if str(c).isdigit()]
+
+
+def _pib_long(df):
+    # Format long attendu par les fonctions du PIB : Country Code | Year | GDP_per_capita
+    long = df.melt(id_vars="Pays_code_iso3", value_vars=_annees(df),
+                   var_name="Year", value_name="GDP_per_capita")
+    long["Year"] = long["Year"].astype(int)
+    return long.rename(columns={"Pays_code_iso3": "Country Code"})
+
+
+# --- Sections -----------------------------------------------------------------------------
+# Une section est un générateur appelé avec la table fusionnée : il produit des paragraphes
+# (str), des tables (DataFrame) ou des figures plotly, et peut imprimer ou appeler plt.show().
+
+def _section_donnees(df):
+    indicateurs, annees = indicateurs_disponibles(df), _annees(df)
+    yield (f"{df['Pays_code_iso3'].nunique()} pays, {len(indicateurs)} indicateurs de santé et "
+           f"PIB par habitant de {annees[0]} à {annees[-1]}.")
+    yield df[indicateurs + annees].describe().T
+    if "IncomeGroup" in df.columns:
+        yield df["IncomeGroup"].value_counts().rename_axis("Groupe de revenu").to_frame("Pays")
+
+
+def _section_valeurs_manquantes(df):
+    from .analyse_données_OMS import desc_missing_health
+    from .analyse_données_pib_habitant import plot_missing_gdp
+
+    for var in indicateurs_disponibles(df):
+        desc_missing_health(df, var, "LOCATION")
+    yield None
+    plot_missing_gdp(_pib_long(df))
+
+
+def _section_description(df):
+    from .analyse_données_OMS import description_indicateurs
+
+    indicateurs = indicateurs_disponibles(df)
+    for i in range(0, len(indicateurs), 2):
+        paire = indicateurs[i:i + 2]
+        description_indicateurs(df, paire, disposition=str(len(paire)))
+        yield None
+
+
+def _section_cartes(df):
+    from .analyse_données_OMS import world_map
+
+    for var in indicateurs_disponibles(df):
+        yield world_map(df, var, afficher=False)
+
+
+def _section_pib(df):
+    from .analyse_données_pib_habitant import quantiles_gdp, world_map_gdp
+
+    long = _pib_long(df)
+    yield world_map_gdp(long, afficher=False)
+    quantiles_gdp(long, 4)
+
+
+def _section_regressions(df):
+    from .analyse_graphique_data import afficher_graphiques
+
+    for var in indicateurs_disponibles(df):
+        afficher_graphiques([(var, var, f"{var} et log du PIB par habitant", "2021", "regression"),
+                             (var, var, f"{var} par groupe de revenu", "2021", "barres")],
+                            df, disposition="2")
+        yield None
+
+
+def _section_regression_multiple(df):
+    from .reg_multiple_sante import (analyse_sante_vers_pib, graphique_coefficients,
+                                     graphique_valeurs_predites_vs_reelles)
+
+    model, df_reg = analyse_sante_vers_pib(df)
+    yield None
+    graphique_valeurs_predites_vs_reelles(model, df_reg)
+    graphique_coefficients(model)
+
+
+def _section_associations(df):
+    from .associations import matrice_associations
+
+    table = matrice_associations(df, methodes=("pearson", "spearman"))
+    for methode, groupe in table.groupby("methode", sort=False):
+        yield f"Corrélation de {methode} avec le log du PIB par habitant, par année de PIB."
+        yield groupe.pivot(index="indicateur", columns="annee", values="r")
+
+
+def _colonnes_sante(df):
+    return ["LOCATION", "Pays_code_iso3"] + indicateurs_disponibles(df)
+
+
+def _colonnes_pib(df):
+    return ["Pays_code_iso3"] + _annees(df)
+
+
+# identifiant -> titre, section, colonnes d'entrée (None : toute la table), modules utilisés
+SECTIONS = {
+    "donnees": ("Données fusionnées", _section_donnees, None, ["recherche_modeles"]),
+    "valeurs_manquantes": ("Valeurs manquantes", _section_valeurs_manquantes, None,
+                           ["analyse_données_OMS", "analyse_données_pib_habitant", "recherche_modeles"]),
+    "description": ("Description des indicateurs", _section_description, _colonnes_sante,
+                    ["analyse_données_OMS", "recherche_modeles"]),
+    "cartes": ("Cartographie des indicateurs", _section_cartes, _colonnes_sante,
+               ["analyse_données_OMS", "recherche_modeles"]),
+    "pib": ("PIB par habitant", _section_pib, _colonnes_pib,
+            ["analyse_données_pib_habitant", "quantiles"]),
+    "regressions": ("Indicateurs de santé et développement économique", _section_regressions, None,
+                    ["analyse_graphique_data", "cache_regressions", "regression_robuste", "recherche_modeles"]),
+    "regression_multiple": ("Régression multiple santé -> PIB", _section_regression_multiple, None,
+                            ["reg_multiple_sante", "cache_regressions"]),
+    "associations": ("Associations avec le PIB", _section_associations, None,
+                     ["associations", "recherche_modeles"]),
+}
+
+
+# --- Capture des sorties -----------------------------------------------------------------
+
+def _png_matplotlib(figure):
+    tampon = io.BytesIO()
+    figure.savefig(tampon, format="png", dpi=100, bbox_inches="tight")
+    return tampon.getvalue()
+
+
+def _executer_section(fonction, df):
+    # Exécute une section et renvoie ses sorties dans l'ordre : (type, contenu)
+    import matplotlib.pyplot as plt
+
+    blocs, tampon = [], io.StringIO()
+
+    def vider_texte():
+        texte = tampon.getvalue().strip("\n")
+        if texte:
+            blocs.append(("texte", texte))
+        tampon.seek(0)
+        tampon.truncate()
+
+    def montrer(*args, **kwargs):
+        # Remplace plt.show() : les figures ouvertes deviennent des images du rapport
+        vider_texte()
+        for numero in plt.get_fignums():
+            figure = plt.figure(numero)
+            blocs.append(("image", _png_matplotlib(figure)))
+            plt.close(figure)
+
+    show = plt.show
+    plt.show = montrer
+    try:
+        with redirect_stdout(tampon):
+            for objet in fonction(df):
+                vider_texte()
+                if isinstance(objet, str):
+                    blocs.append(("paragraphe", objet))
+                elif isinstance(objet, pd.DataFrame):
+                    blocs.append(("table", objet))
+                elif objet is not None:
+                    blocs.append(("plotly", objet))
+            montrer()
+    finally:
+        plt.show = show
+    return blocs
+
+
+# --- Rendu HTML et ressources ------------------------------------------------------------
+
+def _ecrire_ressource(dossier, contenu, suffixe):
+    # Nom tiré du contenu : une ressource identique n'est écrite qu'une fois
+    nom = hashlib.sha256(contenu).hexdigest()[:20] + suffixe
+    fichier = dossier / nom
+    if not fichier.exists():
+        temporaire = fichier.with_name(fichier.name + ".tmp")
+        temporaire.write_bytes(contenu)
+        temporaire.replace(fichier)
+    return nom
+
+
+def _ressource_plotly(figure, dossier):
+    from plotly.io.json import to_json_plotly
+
+    # Le gabarit de mise en forme, identique pour toutes les figures, est une ressource à part
+    donnees = figure.to_plotly_json()
+    donnees["layout"] = dict(donnees.get("layout", {}))
+    gabarit = donnees["layout"].pop("template", None)
+    nom_gabarit, scripts = "", []
+    if gabarit is not None:
+        json_gabarit = to_json_plotly(gabarit)
+        nom_gabarit = hashlib.sha256(json_gabarit.encode()).hexdigest()[:20]
+        scripts.append(_ecrire_ressource(
+            dossier, f'gabarit("{nom_gabarit}", {json_gabarit});'.encode(), ".js"))
+
+    contenu = f'tracer(document.currentScript, "{nom_gabarit}", {to_json_plotly(donnees)});'
+    nom = _ecrire_ressource(dossier, contenu.encode(), ".js")
+    return nom, scripts
+
+
+def _rendre(blocs, dossier):
+    # Renvoie le fragment HTML, les ressources qu'il référence et les scripts à charger en tête
+    morceaux, ressources, scripts = [], [], []
+    for type_bloc, contenu in blocs:
+        if type_bloc == "paragraphe":
+            morceaux.append(f"<p>{html.escape(contenu)}</p>")
+        elif type_bloc == "texte":
+            morceaux.append(f"<pre>{html.escape(contenu)}</pre>")
+        elif type_bloc == "table":
+            morceaux.append(contenu.to_html(border=0, classes="table", na_rep="",
+                                            float_format="{:.4g}".format))
+        elif type_bloc == "image":
+            nom = _ecrire_ressource(dossier, contenu, ".png")
+            ressources.append(nom)
+            morceaux.append(f'<img src="assets/{nom}" alt="" loading="lazy">')
+        else:
+            nom, gabarits = _ressource_plotly(contenu, dossier)
+            ressources += [nom] + gabarits
+            scripts += gabarits
+            morceaux.append(f'<div class="figure"></div><script src="assets/{nom}"></script>')
+    return "\n".join(morceaux), ressources, scripts
+
+
+def _cle_section(identifiant, df):
+    _, fonction, colonnes, modules = SECTIONS[identifiant]
+    colonnes = list(df.columns) if colonnes is None else colonnes(df)
+    sources = [inspect.getsource(fonction)]
+    sources += [Path(__file__).with_name(f"{module}.py").read_text(encoding="utf-8") for module in modules]
+    return empreinte(df[colonnes], identifiant, sources, VERSION)
+
+
+def _page(titre, fragments, scripts, plotly_js):
+    entete = [f"<script>{_SCRIPT_PAGE}</script>"]
+    if plotly_js is not None:
+        entete.append(f'<script src="assets/{plotly_js}"></script>')
+    entete += [f'<script src="assets/{nom}"></script>' for nom in dict.fromkeys(scripts)]
+
+    sommaire = "\n".join(f'<li><a href="#{identifiant}">{html.escape(SECTIONS[identifiant][0])}</a></li>'
+                         for identifiant in fragments)
+    corps = "\n".join(f'<section id="{identifiant}">\n<h2>{html.escape(SECTIONS[identifiant][0])}</h2>\n'
+                      f'{fragment}\n</section>' for identifiant, fragment in fragments.items())
+    return (f'<!DOCTYPE html>\n<html lang="fr">\n<head>\n<meta charset="utf-8">\n'
+            f'<title>{html.escape(titre)}</title>\n<style>{_STYLE}</style>\n' + "\n".join(entete) +
+            f'\n</head>\n<body>\n<h1>{html.escape(titre)}</h1>\n<nav><ul>\n{sommaire}\n</ul></nav>\n'
+            f'{corps}\n</body>\n</html>\n')
+
+
+def _lire_manifeste(dossier):
+    fichier = dossier / "manifeste.json"
+    if not fichier.exists():
+        return {}
+    return json.loads(fichier.read_text(encoding="utf-8"))
+
+
+def _ecrire_manifeste(dossier, manifeste):
+    fichier = dossier / "manifeste.json"
+    temporaire = fichier.with_name("manifeste.json.tmp")
+    temporaire.write_text(json.dumps(manifeste, ensure_ascii=False, indent=1), encoding="utf-8")
+    temporaire.replace(fichier)
+
+
+@mesurer()
+def construire_rapport(df=None, dossier=None, sections=None, titre=TITRE, cache=True, nettoyer=True):
+    """
+    Construit le rapport HTML statique des analyses.
+
+    Paramètres
+    ----------
+    df : pandas.DataFrame, optional
+        Table fusionnée avec groupes de revenu (par défaut, la sauvegarde Table_fusion_income_groupe.csv).
+    dossier : str ou pathlib.Path, optional
+        Dossier du rapport : index.html et ressources dans assets (par défaut Main/Rapport).
+    sections : list, optional
+        Identifiants des sections à inclure, dans l'ordre (par défaut toutes, voir SECTIONS).
+    titre : str, optional
+        Titre de la page.
+    cache : bool, optional
+        Reprend les sections dont les entrées, le code et les modules n'ont pas changé
+        (par défaut True).
+    nettoyer : bool, optional
+        Supprime du dossier assets les ressources qui ne sont plus référencées par aucune section
+        (par défaut True). Les références de chaque section sont tenues dans manifeste.json : une
+        construction partielle conserve les ressources des autres sections, seule une construction
+        de toutes les sections oublie les sections retirées.
+
+    Sortie
+    ------
+    dict
+        "fichier" : chemin de index.html ; "sections" : DataFrame section | reutilisee | duree |
+        ressources ; "octets_html" et "octets_ressources" : taille de la page et des ressources
+        référencées ; "duree" : temps total de construction (s).
+    """
+
+    debut = time.perf_counter()
+    if df is None:
+        from .normalisation import lire_csv
+        df = lire_csv(FICHIER_FUSION_GROUPE)
+    dossier = Path(DOSSIER_RAPPORT if dossier is None else dossier)
+    assets = dossier / "assets"
+    assets.mkdir(parents=True, exist_ok=True)
+    sections = list(SECTIONS) if sections is None else list(sections)
+
+    fragments, references, ressources, scripts, suivi = {}, {}, [], [], []
+    for identifiant in sections:
+        debut_section = time.perf_counter()
+        fichier_cache = dossier_cache("rapport") / f"{_cle_section(identifiant, df)}.pkl"
+
+        entree = None
+        if cache and fichier_cache.exists():
+            with open(fichier_cache, "rb") as f:
+                entree = pickle.load(f)
+            # Une section n'est reprise que si toutes ses ressources sont encore présentes
+            if not all((assets / nom).exists() for nom in entree[1]):
+                entree = None
+        reutilisee = entree is not None
+
+        if entree is None:
+            entree = _rendre(_executer_section(SECTIONS[identifiant][1], df), assets)
+            with open(fichier_cache, "wb") as f:
+                pickle.dump(entree, f)
+
+        fragments[identifiant] = entree[0]
+        references[identifiant] = sorted(set(entree[1]))
+        ressources += entree[1]
+        scripts += entree[2]
+        suivi.append({"section": identifiant, "reutilisee": reutilisee,
+                      "duree": time.perf_counter() - debut_section, "ressources": len(entree[1])})
+
+    # plotly.js : une seule copie, chargée une fois pour toutes les figures de la page
+    plotly_js = None
+    if any(fragment.count('class="figure"') for fragment in fragments.values()):
+        import plotly
+        source = Path(plotly.__file__).parent / "package_data" / "plotly.min.js"
+        plotly_js = _ecrire_ressource(assets, source.read_bytes(), ".js")
+        ressources.append(plotly_js)
+
+    fichier = dossier / "index.html"
+    contenu = _page(titre, fragments, scripts, plotly_js).encode("utf-8")
+    temporaire = fichier.with_name("index.html.tmp")
+    temporaire.write_bytes(contenu)
+    temporaire.replace(fichier)
+
+    # Manifeste des ressources de chaque section, partagé entre constructions : une construction
+    # partielle ne supprime pas les ressources des sections qu'elle n'a pas reconstruites
+    manifeste = _lire_manifeste(dossier)
+    if set(sections) >= set(SECTIONS):
+        manifeste = {}
+    manifeste.update(references)
+    manifeste["plotly.js"] = sorted(set(manifeste.get("plotly.js", [])) | ({plotly_js} - {None}))
+    _ecrire_manifeste(dossier, manifeste)
+
+    ressources = set(ressources)
+    if nettoyer:
+        conservees = set().union(*manifeste.values())
+        for ancien in assets.iterdir():
+            if ancien.name not in conservees:
+                ancien.unlink(missing_ok=True)
+
+    return {
+        "fichier": fichier,
+        "sections": pd.DataFrame(suivi, columns=["section", "reutilisee", "duree", "ressources"]),
+        "octets_html": len(contenu),
+        "octets_ressources": sum((assets / nom).stat().st_size for nom in ressources),
+        "duree": time.perf_counter() - debut,
+    }
@@ -0,0 +1,205 @@
+"""
+Recherche exhaustive des meilleurs sous-ensembles d'indicateurs de santé pour expliquer le
+log du PIB par habitant, avec validation croisée à k plis.
+
+Aucune régression n'est réajustée avec statsmodels : pour chaque année, la matrice de Gram
+Z'Z de [1, indicateurs, log PIB] est calculée une fois par pli. Les coefficients de chaque
+sous-ensemble sur les plis d'apprentissage, puis l'erreur sur le pli de validation, se
+déduisent de ces petites matrices par des résolutions groupées (tous les sous-ensembles de
+même taille à la fois). Les années sont réparties sur un pool de processus.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import mesurer
+
+# Colonnes qui ne sont pas des indicateurs de santé dans la table fusionnée
+COLONNES_HORS_INDICATEURS = ["LOCATION", "Pays_code_iso3", "IncomeGroup"]
+
+
+def indicateurs_disponibles(df):
+    """
+    Renvoie les colonnes numériques de la table fusionnée qui sont des indicateurs de santé
+    (hors identifiants, groupe de revenu et colonnes années de PIB).
+    """
+
+    return [c for c in df.columns
+            if c not in COLONNES_HORS_INDICATEURS and not str(c).isdigit()
+            and pd.api.types.is_numeric_dtype(df[c])]
+
+
+def _plis(n, k, graine):
+    # Affectation aléatoire mais reproductible des observations aux k plis, de tailles équilibrées
+    rng = np.random.default_rng(graine)
+    plis = np.empty(n, dtype=np.int64)
+    plis[rng.permutation(n)] = np.arange(n) % k
+    return plis
+
+
+def _evaluer_annee(X, y, k, graine, taille_max):
+    """
+    Évalue tous les sous-ensembles de colonnes de X pour une année.
+
+    Sortie
+    ------
+    list
+        Un tuple (colonnes du sous-ensemble, somme des carrés de validation, somme des carrés
+        sur l'échantillon complet) par sous-ensemble.
+    """
+
+    n, p = X.shape
+
+    # Centrage-réduction : mêmes prédictions, meilleur conditionnement des matrices de Gram
+    X = (X - X.mean(axis=0)) / np.where(X.std(axis=0) > 0, X.std(axis=0), 1.0)
+    Z = np.column_stack([np.ones(n), X, y])
+    iy = p + 1
+
+    # Matrices de Gram de chaque pli, de l'ensemble et des plis d'apprentissage
+    plis = _plis(n, k, graine)
+    G_plis = np.stack([Z[plis == f].T @ Z[plis == f] for f in range(k)])
+    G = G_plis.sum(axis=0)
+    G_app = G[None] - G_plis
+
+    resultats = []
+    for m in range(0, min(p, taille_max) + 1):
+        combinaisons = list(combinations(range(p), m))
+        sous_ensembles = np.array(combinaisons, dtype=np.int64).reshape(len(combinaisons), m)
+        idx = np.column_stack([np.zeros(len(sous_ensembles), dtype=np.int64), sous_ensembles + 1])
+
+        # Sous-matrices (plis, sous-ensembles, m+1, m+1) et seconds membres (plis, sous-ensembles, m+1)
+        A = G_app[:, idx[:, :, None], idx[:, None, :]]
+        b = G_app[:, idx, iy]
+        A = A + 1e-10 * np.eye(m + 1)  # régularisation infime contre les colinéarités exactes
+        beta = np.linalg.solve(A, b[..., None])[..., 0]
+
+        # Erreur de validation : y'y - 2 β'X'y + β'X'Xβ, calculée à partir du Gram du pli
+        Gv = G_plis[:, idx[:, :, None], idx[:, None, :]]
+        bv = G_plis[:, idx, iy]
+        sse_cv = (G_plis[:, iy, iy][:, None] - 2 * np.einsum("fsi,fsi->fs", beta, bv)
+                  + np.einsum("fsi,fsij,fsj->fs", beta, Gv, beta)).sum(axis=0)
+
+        # Ajustement sur l'échantillon complet
+        A_tot = G[idx[:, :, None], idx[:, None, :]] + 1e-10 * np.eye(m + 1)
+        b_tot = G[idx, iy]
+        beta_tot = np.linalg.solve(A_tot, b_tot[..., None])[..., 0]
+        sse = G[iy, iy] - np.einsum("si,si->s", beta_tot, b_tot)
+
+        resultats.extend(zip(map(tuple, sous_ensembles), sse_cv, sse))
+
+    return resultats
+
+
+def _evaluer_tache(tache):
+    annee, X, y, noms, k, graine, taille_max = tache
+    n = len(y)
+    sst = float(((y - y.mean()) ** 2).sum())
+
+    lignes = []
+    for sous_ensemble, sse_cv, sse in _evaluer_annee(X, y, k, graine, taille_max):
+        nb = len(sous_ensemble)
+        sse = max(float(sse), 1e-300)
+        # Log-vraisemblance gaussienne, même convention que statsmodels pour AIC et BIC
+        llf = -n / 2 * (np.log(2 * np.pi) + np.log(sse / n) + 1)
+        lignes.append({
+            "annee": annee,
+            "indicateurs": tuple(noms[j] for j in sous_ensemble),
+            "nb_indicateurs": nb,
+            "n_obs": n,
+            "rmse_cv": float(np.sqrt(max(sse_cv, 0.0) / n)),
+            "r2": 1 - sse / sst,
+            "r2_ajuste": 1 - (sse / (n - nb - 1)) / (sst / (n - 1)) if n - nb - 1 > 0 else np.nan,
+            "aic": -2 * llf + 2 * (nb + 1),
+            "bic": -2 * llf + np.log(n) * (nb + 1),
+        })
+    return lignes
+
+
+@mesurer()
+def recherche_meilleurs_sous_ensembles(df, indicateurs=None, annees=None, k=10, graine=0,
+                                       taille_max=None, n_jobs=None):
+    """
+    Évalue, pour chaque année de PIB, tous les sous-ensembles d'indicateurs de santé en
+    régression du log du PIB par habitant, avec validation croisée à k plis.
+
+    Pour une année donnée, tous les sous-ensembles sont évalués sur le même échantillon :
+    les pays dont le PIB est strictement positif et tous les indicateurs renseignés.
+
+    Paramètres
+    ----------
+    df : pandas.DataFrame
+        Table fusionnée (indicateurs de santé et colonnes années de PIB).
+    indicateurs : list, optional
+        Indicateurs candidats (par défaut, tous les indicateurs de santé de la table).
+    annees : list, optional
+        Colonnes années de PIB à expliquer (par défaut, toutes celles de la table).
+    k : int, optional
+        Nombre de plis de la validation croisée (par défaut 10).
+    graine : int, optional
+        Graine de l'affectation aux plis (par défaut 0).
+    taille_max : int, optional
+        Nombre maximal d'indicateurs par modèle (par défaut, aucun maximum).
+    n_jobs : int, optional
+        Nombre de processus ; 1 pour tout calculer dans le processus courant
+        (par défaut, nombre de processeurs).
+
+    Sortie
+    ------
+    pandas.DataFrame
+        Une ligne par (année, sous-ensemble) : indicateurs, nb_indicateurs, n_obs, rmse_cv,
+        r2, r2_ajuste, aic, bic et rang (1 = plus faible erreur de validation de l'année),
+        triée par année puis par rang.
+    """
+
+    indicateurs = indicateurs_disponibles(df) if indicateurs is None else list(indicateurs)
+    annees = [c for c in df.columns if str(c).isdigit()] if annees is None else [str(a) for a in annees]
+    taille_max = len(indicateurs) if taille_max is None else taille_max
+
+    taches = []
+    for annee in annees:
+        donnees = df[indicateurs + [annee]].astype("float64").dropna()
+        donnees = donnees[donnees[annee] > 0]
+        if len(donnees) <= k or len(donnees) <= len(indicateurs) + 1:
+            print(f"Année {annee} ignorée : {len(donnees)} pays avec toutes les données")
+            continue
+        taches.append((annee, donnees[indicateurs].to_numpy(), np.log(donnees[annee].to_numpy()),
+                       indicateurs, k, graine, taille_max))
+
+    if n_jobs == 1 or len(taches) <= 1:
+        lignes = [l for t in taches for l in _evaluer_tache(t)]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            lignes = [l for res in pool.map(_evaluer_tache, taches) for l in res]
+
+    resultats = pd.DataFrame(lignes)
+    if resultats.empty:
+        return resultats
+    resultats["rang"] = resultats.groupby("annee")["rmse_cv"].rank(method="first").astype("int32")
+    return resultats.sort_values(["annee", "rang"], ignore_index=True)
+
+
+def meilleur_modele(resultats, annee, critere="rmse_cv"):
+    """
+    Renvoie les indicateurs du meilleur modèle d'une année selon un critère.
+
+    Paramètres
+    ----------
+    resultats : pandas.DataFrame
+        Table renvoyée par recherche_meilleurs_sous_ensembles.
+    annee : str
+        Année de PIB.
+    critere : str, optional
+        "rmse_cv", "aic" ou "bic" (à minimiser), ou "r2_ajuste" (à maximiser). Par défaut "rmse_cv".
+
+    Sortie
+    ------
+    list
+        Indicateurs du meilleur modèle, à transmettre à analyse_sante_vers_pib.
+    """
+
+    annee_res = resultats[resultats["annee"] == str(annee)]
+    ligne = annee_res.loc[annee_res[critere].idxmax() if critere == "r2_ajuste" else annee_res[critere].idxmin()]
+    return list(ligne["indicateurs"])
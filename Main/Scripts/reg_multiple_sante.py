@@ -1,9 +1,9 @@
 import numpy as np
-import pandas as pd
-import statsmodels.api as sm
-import matplotlib.pyplot as plt
 
-def analyse_sante_vers_pib(df, annee_pib='2021'):
+from .instrumentation import mesurer
+
+@mesurer()
+def analyse_sante_vers_pib(df, annee_pib='2021', indicateurs=None, cov_type='HC1', cache=True, afficher=True):
     """
     Réalise une régression multiple pour étudier l'effet simultané de plusieurs indicateurs de santé sur le PIB.
 
@@ -17,42 +17,49 @@ def analyse_sante_vers_pib(df, annee_pib='2021'):
         - Dépenses publiques santé
     annee_pib : str, optional
         Année du PIB à utiliser (par défaut '2021').
+    indicateurs : list, optional
+        Variables explicatives (par défaut les trois ci-dessus). Voir
+        recherche_modeles.meilleur_modele pour retenir le meilleur sous-ensemble.
+    cov_type : str, optional
+        Type de covariance statsmodels (par défaut 'HC1', estimation robuste).
+    cache : bool, optional
+        Réutilise le résultat d'un ajustement identique (mêmes données, même spécification),
+        voir cache_regressions (par défaut True).
+    afficher : bool, optional
+        Affiche le résumé du modèle (par défaut True).
 
     Sortie
     ------
     model : statsmodels.regression.linear_model.RegressionResultsWrapper
-        Objet contenant les résultats de la régression OLS.
+        Résultats de la régression OLS, reconstruits sans réajustement lorsqu'ils sont en cache.
     df_reg : pandas.DataFrame
         DataFrame filtré utilisé pour la régression (sans valeurs manquantes et PIB > 0).
     """
 
+    from .cache_regressions import ajuster, specification
+
     # Définition des variables explicatives
-    indicateurs = ['Espérance de vie totale', 'Taux mortalité brute', 'Dépenses publiques santé']
-    
-    # Suppression des lignes avec valeurs manquantes pour le PIB et les indicateurs
-    df_reg = df.dropna(subset=[annee_pib] + indicateurs).copy()
-    # On ne garde que les pays dont le PIB est strictement positif
-    df_reg = df_reg[df_reg[annee_pib] > 0]
-    
-    # Variable dépendante : logarithme du PIB
-    Y = np.log(df_reg[annee_pib])
-    # Variables explicatives
-    X = df_reg[indicateurs]
-    # Ajout de la constante pour le modèle OLS
-    X = sm.add_constant(X)
-    
-    # Ajustement du modèle de régression OLS avec estimation robuste (HC1)
-    model = sm.OLS(Y, X).fit(cov_type='HC1')
-    
+    if indicateurs is None:
+        indicateurs = ['Espérance de vie totale', 'Taux mortalité brute', 'Dépenses publiques santé']
+    indicateurs = list(indicateurs)
+
+    # Variable dépendante : logarithme du PIB ; lignes complètes et PIB strictement positif uniquement
+    model, df_reg = ajuster(df, specification(annee_pib, indicateurs, cov_type=cov_type), cache=cache)
+
+    if not afficher:
+        return model, df_reg
+
     # Affichage d’un résumé clair
     print(f"\n--- REGRESSION MULTIPLE : SANTE -> PIB ({annee_pib}) ---")
     print(f"Nombre de pays : {len(df_reg)}")
-    print(f"\nModèle : Log(PIB) = β0 + β1×Espérance + β2×Mortalité + β3×Dépenses\n")
+    termes = " + ".join(f"β{i + 1}×{nom}" for i, nom in enumerate(indicateurs))
+    print(f"\nModèle : Log(PIB) = β0 + {termes}\n")
     print(model.summary())
     
     return model, df_reg
 
 
+@mesurer()
 def graphique_valeurs_predites_vs_reelles(model, df_reg, annee_pib='2021'):
     """
     Affiche un graphique comparant les valeurs de PIB prédites par le modèle et les valeurs réelles observées.
@@ -60,7 +67,7 @@ def graphique_valeurs_predites_vs_reelles(model, df_reg, annee_pib='2021'):
     Paramètres
     ----------
     model : statsmodels.regression.linear_model.RegressionResultsWrapper
-        Résultats de la régression multiple.
+        Résultats de la régression multiple (analyse_sante_vers_pib), sans nouvel ajustement.
     df_reg : pandas.DataFrame
         DataFrame utilisé pour la régression.
     annee_pib : str, optional
@@ -71,6 +78,8 @@ def graphique_valeurs_predites_vs_reelles(model, df_reg, annee_pib='2021'):
     Affiche un graphique de dispersion et la ligne de prédiction parfaite.
     """
 
+    import matplotlib.pyplot as plt
+
     # Valeurs observées (log du PIB réel)
     Y_obs = np.log(df_reg[annee_pib])
     # Valeurs prédites par le modèle
@@ -103,6 +112,7 @@ def graphique_valeurs_predites_vs_reelles(model, df_reg, annee_pib='2021'):
     plt.show()
 
 
+@mesurer()
 def graphique_coefficients(model):
     """
     Affiche un graphique en barres des coefficients de la régression avec leurs intervalles de confiance à 95%.
@@ -110,13 +120,15 @@ def graphique_coefficients(model):
     Paramètres
     ----------
     model : statsmodels.regression.linear_model.RegressionResultsWrapper
-        Résultats de la régression multiple.
+        Résultats de la régression multiple (analyse_sante_vers_pib), sans nouvel ajustement.
 
     Sortie
     ------
     Affiche un graphique en barres des coefficients β.
     """
 
+    import matplotlib.pyplot as plt
+
     # Extraction des coefficients et des intervalles de confiance, excluant la constante
     params = model.params.drop('const')
     conf_int = model.conf_int().drop('const')
@@ -0,0 +1,217 @@
+"""
+Régressions robustes des indicateurs de santé sur le log du PIB par habitant, pour tous les
+indicateurs à la fois.
+
+- M-estimateurs de Huber et de Tukey (bicarré) par moindres carrés repondérés itératifs (IRLS).
+- Régression quantile pour plusieurs τ, par IRLS également (même algorithme que
+  statsmodels.QuantReg).
+
+Les indicateurs partagent la même matrice de régresseurs ; leurs valeurs manquantes sont
+traitées par des poids nuls. À chaque itération, les systèmes normaux pondérés de tous les
+indicateurs (et de tous les τ) sont formés par np.einsum et résolus en un seul appel groupé,
+au lieu d'un ajustement statsmodels par indicateur et par τ.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import mesurer
+
+# Constantes d'accord usuelles (efficacité de 95 % sous loi normale)
+CONSTANTES = {"huber": 1.345, "tukey": 4.685}
+TAUS = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+
+def _resoudre(X, W, Y):
+    # Résout X'WX β = X'Wy pour toutes les colonnes (et tous les τ) : W, Y de forme (..., n, m)
+    A = np.einsum("ni,...nm,nj->...mij", X, W, X)
+    b = np.einsum("ni,...nm->...mi", X, W * Y)
+    return np.linalg.solve(A, b[..., None])[..., 0]
+
+
+def _psi_poids(u, methode, c):
+    # Poids w(u) = psi(u) / u et dérivée psi'(u) de la fonction de perte
+    a = np.abs(u)
+    if methode == "huber":
+        return np.where(a <= c, 1.0, c / np.maximum(a, 1e-300)), (a <= c).astype("float64")
+    interieur = a < c
+    poids = np.where(interieur, (1 - (u / c) ** 2) ** 2, 0.0)
+    derivee = np.where(interieur, (1 - (u / c) ** 2) * (1 - 5 * (u / c) ** 2), 0.0)
+    return poids, derivee
+
+
+def _echelle_mad(R, M):
+    # Écart absolu médian des résidus (centré en 0) de chaque colonne, sur les valeurs observées
+    return np.nanmedian(np.where(M, np.abs(R), np.nan), axis=0) / 0.6745
+
+
+def m_estimation(X, Y, methode="huber", c=None, max_iter=100, tol=1e-8):
+    """
+    M-estimation par IRLS de Y[:, j] sur X, pour toutes les colonnes j à la fois.
+
+    L'échelle est réestimée à chaque itération (écart absolu médian des résidus) ; Tukey part
+    de l'estimation de Huber, sa fonction de perte n'étant pas convexe. Les erreurs types
+    suivent la formule H1 de Huber (comme statsmodels.RLM par défaut).
+
+    Paramètres
+    ----------
+    X : numpy.ndarray
+        Régresseurs communs (n × p), constante comprise.
+    Y : numpy.ndarray
+        Variables expliquées (n × m), NaN pour les valeurs manquantes.
+    methode : str, optional
+        "huber" ou "tukey" (par défaut "huber").
+    c : float, optional
+        Constante d'accord (par défaut 1.345 pour Huber, 4.685 pour Tukey).
+    max_iter : int, optional
+        Nombre maximal d'itérations (par défaut 100).
+    tol : float, optional
+        Seuil de convergence sur la variation des coefficients (par défaut 1e-8).
+
+    Sortie
+    ------
+    tuple
+        (beta, erreurs_types, poids) : coefficients (m × p), erreurs types (m × p) et poids
+        finaux des observations (n × m, 0 pour les valeurs manquantes).
+    """
+
+    if methode not in CONSTANTES:
+        raise ValueError("Méthode invalide : choisir 'huber' ou 'tukey'")
+    if methode == "tukey":
+        beta, _, _ = m_estimation(X, Y, "huber", max_iter=max_iter, tol=tol)
+    else:
+        beta = None
+    c = CONSTANTES[methode] if c is None else c
+
+    M = ~np.isnan(Y)
+    Y0 = np.where(M, Y, 0.0)
+    W = M.astype("float64")
+    if beta is None:
+        beta = _resoudre(X, W, Y0)
+
+    for _ in range(max_iter):
+        R = Y0 - X @ beta.T
+        echelle = _echelle_mad(R, M)
+        echelle = np.where(echelle > 0, echelle, 1.0)
+        poids, _ = _psi_poids(R / echelle, methode, c)
+        W = poids * M
+        nouveau = _resoudre(X, W, Y0)
+        ecart = np.max(np.abs(nouveau - beta))
+        beta = nouveau
+        if ecart < tol:
+            break
+
+    # Erreurs types H1 : k² · Σψ²/(n-p) · s² / (moyenne ψ')² · (X'X)⁻¹, par colonne
+    R = Y0 - X @ beta.T
+    echelle = np.where(_echelle_mad(R, M) > 0, _echelle_mad(R, M), 1.0)
+    u = R / echelle
+    poids, derivee = _psi_poids(u, methode, c)
+    psi = poids * u
+    n, p = M.sum(axis=0), X.shape[1]
+    moyenne_d = (derivee * M).sum(axis=0) / n
+    variance_d = (((derivee - moyenne_d) ** 2) * M).sum(axis=0) / n
+    k = 1 + p / n * variance_d / moyenne_d ** 2
+    facteur = k ** 2 * ((psi ** 2) * M).sum(axis=0) / (n - p) * echelle ** 2 / moyenne_d ** 2
+    XtX_inv = np.linalg.inv(np.einsum("ni,nm,nj->mij", X, M.astype("float64"), X))
+    erreurs_types = np.sqrt(facteur[:, None] * np.diagonal(XtX_inv, axis1=1, axis2=2))
+
+    return beta, erreurs_types, W
+
+
+def regression_quantile(X, Y, taus=TAUS, max_iter=1000, tol=1e-6, seuil=1e-6):
+    """
+    Régression quantile de Y[:, j] sur X pour plusieurs τ, tous les couples (τ, colonne)
+    étant itérés ensemble.
+
+    Paramètres
+    ----------
+    X : numpy.ndarray
+        Régresseurs communs (n × p), constante comprise.
+    Y : numpy.ndarray
+        Variables expliquées (n × m), NaN pour les valeurs manquantes.
+    taus : iterable, optional
+        Quantiles (par défaut 0.1, 0.25, 0.5, 0.75, 0.9).
+    max_iter : int, optional
+        Nombre maximal d'itérations (par défaut 1000).
+    tol : float, optional
+        Seuil de convergence sur la variation des coefficients (par défaut 1e-6).
+    seuil : float, optional
+        Valeur absolue minimale des résidus dans les poids (par défaut 1e-6).
+
+    Sortie
+    ------
+    numpy.ndarray
+        Coefficients (nombre de τ × m × p).
+    """
+
+    taus = np.asarray(list(taus), dtype="float64")[:, None, None]
+    M = ~np.isnan(Y)
+    Y0 = np.where(M, Y, 0.0)
+    beta = np.broadcast_to(_resoudre(X, M.astype("float64"), Y0), (len(taus),) + (Y.shape[1], X.shape[1]))
+
+    for _ in range(max_iter):
+        R = Y0[None] - np.einsum("np,tmp->tnm", X, beta)
+        R = np.where(np.abs(R) < seuil, np.where(R < 0, -seuil, seuil), R)
+        W = np.where(R < 0, 1 - taus, taus) / np.abs(R) * M
+        nouveau = _resoudre(X, W, np.broadcast_to(Y0, W.shape))
+        ecart = np.max(np.abs(nouveau - beta))
+        beta = nouveau
+        if ecart < tol:
+            break
+
+    return beta
+
+
+@mesurer()
+def regression_robuste(df, indicateurs, annee_pib='2021', methode="huber", taus=TAUS):
+    """
+    Régresse chaque indicateur de santé sur le log du PIB par habitant avec un estimateur
+    robuste, tous les indicateurs étant estimés ensemble.
+
+    Paramètres
+    ----------
+    df : pandas.DataFrame
+        Table fusionnée.
+    indicateurs : list
+        Indicateurs à expliquer.
+    annee_pib : str, optional
+        Année du PIB (par défaut '2021').
+    methode : str, optional
+        "huber", "tukey" ou "quantile" (par défaut "huber").
+    taus : iterable, optional
+        Quantiles pour methode="quantile".
+
+    Sortie
+    ------
+    pandas.DataFrame
+        Une ligne par (indicateur, tau) : indicateur | tau | const | log_PIB | n_obs, plus les
+        erreurs types se_const et se_log_PIB pour Huber et Tukey (tau vaut alors NaN).
+    """
+
+    df = df[df[annee_pib] > 0]
+    log_pib = np.log(df[annee_pib].to_numpy(dtype="float64"))
+    X = np.column_stack([np.ones(len(df)), log_pib])
+    Y = df[list(indicateurs)].to_numpy(dtype="float64", na_value=np.nan)
+    n_obs = (~np.isnan(Y)).sum(axis=0)
+
+    if methode == "quantile":
+        taus = list(taus)
+        beta = regression_quantile(X, Y, taus)
+        return pd.DataFrame({
+            "indicateur": np.repeat([indicateurs], len(taus), axis=0).ravel(),
+            "tau": np.repeat(taus, len(indicateurs)),
+            "const": beta[..., 0].ravel(),
+            "log_PIB": beta[..., 1].ravel(),
+            "n_obs": np.tile(n_obs, len(taus)),
+        })
+
+    beta, erreurs_types, _ = m_estimation(X, Y, methode)
+    return pd.DataFrame({
+        "indicateur": list(indicateurs),
+        "tau": np.nan,
+        "const": beta[:, 0],
+        "log_PIB": beta[:, 1],
+        "se_const": erreurs_types[:, 0],
+        "se_log_PIB": erreurs_types[:, 1],
+        "n_obs": n_obs,
+    })
@@ -0,0 +1,551 @@
+"""
+Enregistrement et rejeu hors ligne des API de l'OMS et de la Banque mondiale.
+
+Un serveur HTTP local (ServeurRejeu) se substitue aux deux API. Les chargeurs
+(get_data_OMS_code_pays, get_data_PIB_hab) y sont redirigés pendant un bloc `with`, ou par les
+variables d'environnement SCRIPTS_API_OMS et SCRIPTS_API_BANQUE_MONDIALE pour un autre
+processus. Le serveur répond à partir de fixtures : un fichier JSON compressé (gzip) par
+requête, nommé par l'empreinte de la requête.
+
+- Enregistrement : en mode enregistrer=True, une requête sans fixture est transmise à la
+  vraie API. Toutes ses pages sont récupérées et la réponse complète est écrite en fixture.
+  fixtures_depuis_sauvegardes() produit aussi des fixtures hors ligne, au format des API, à
+  partir des sauvegardes CSV.
+- Pagination : le serveur découpe lui-même les réponses, comme les API. La Banque mondiale
+  suit page/per_page ; l'OMS renvoie @odata.nextLink lorsque taille_page est fixée. Les
+  paramètres de pagination ne font donc pas partie de l'empreinte d'une requête.
+- Volume : facteur > 1 duplique les enregistrements de chaque localisation sous de nouveaux
+  codes ("FRA_1", ...), pour tester des réponses 10 à 100 fois plus grosses qu'aujourd'hui.
+- Conditions réseau : latence (avec gigue), débit limité, compression gzip, ETag et réponses
+  304. Les échecs injectés sont des réponses 503 ou des connexions coupées au milieu du corps.
+
+Les tirages aléatoires (gigue, échecs) dépendent uniquement de la graine, de la requête et de
+son rang parmi les requêtes identiques : un scénario se rejoue à l'identique, même avec des
+requêtes concurrentes.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from .chemins import DOSSIER_FIXTURES
+
+# Préfixe de chemin du serveur local -> hôte de l'API réelle
+SERVICES = {
+    "oms": "https://xmart-api-public.who.int",
+    "bm": "https://api.worldbank.org",
+}
+
+# Paramètres de pagination, exclus de l'empreinte d'une requête
+PARAMETRES_PAGINATION = {"page", "per_page", "$skip", "$top"}
+
+# Nombre d'enregistrements par page de la Banque mondiale sans paramètre per_page
+PAR_PAGE_BANQUE_MONDIALE = 50
+
+TAILLE_BLOC = 64 * 1024
+
+
+def _service_et_chemin(url):
+    # (service, chemin relatif à l'hôte de l'API, paramètres) d'une URL réelle ou locale
+    parties = urlsplit(url)
+    hote = f"{parties.scheme}://{parties.netloc}"
+    parametres = parse_qsl(parties.query, keep_blank_values=True)
+    for service, amont in SERVICES.items():
+        if hote == amont:
+            return service, parties.path, parametres
+    service, _, chemin = parties.path.lstrip("/").partition("/")
+    if service not in SERVICES:
+        raise ValueError(f"URL hors des API rejouées : {url}")
+    return service, "/" + chemin, parametres
+
+
+def cle_requete(url):
+    """
+    Empreinte d'une requête GET, indépendante de l'hôte (API réelle ou serveur local), de
+    l'ordre des paramètres et de la pagination.
+
+    Paramètres
+    ----------
+    url : str
+        URL complète de la requête.
+
+    Sortie
+    ------
+    str
+        Nom de la fixture correspondante (ex. "bm_3f2a...").
+    """
+
+    service, chemin, parametres = _service_et_chemin(url)
+    parametres = sorted((k, v) for k, v in parametres if k not in PARAMETRES_PAGINATION)
+    texte = f"{chemin}?{urlencode(parametres)}"
+    return f"{service}_{hashlib.sha256(texte.encode()).hexdigest()[:24]}"
+
+
+def ecrire_fixture(dossier, url, corps, statut=200):
+    """
+    Écrit une réponse complète (toutes pages réunies) en fixture compressée.
+
+    Paramètres
+    ----------
+    dossier : str ou pathlib.Path
+        Dossier des fixtures.
+    url : str
+        URL de la requête (sans importance pour la pagination).
+    corps : object
+        Corps JSON décodé de la réponse.
+    statut : int, optional
+        Code HTTP (par défaut 200).
+
+    Sortie
+    ------
+    pathlib.Path
+        Chemin de la fixture.
+    """
+
+    dossier = Path(dossier)
+    dossier.mkdir(parents=True, exist_ok=True)
+    fichier = dossier / f"{cle_requete(url)}.json.gz"
+    contenu = json.dumps({"url": url, "statut": statut, "corps": corps}, ensure_ascii=False)
+    temporaire = fichier.with_name(fichier.name + ".tmp")
+    temporaire.write_bytes(gzip.compress(contenu.encode("utf-8"), compresslevel=6))
+    temporaire.replace(fichier)
+    return fichier
+
+
+def lire_fixture(dossier, cle):
+    """
+    Relit une fixture (dictionnaire url | statut | corps), None si elle n'existe pas.
+    """
+
+    fichier = Path(dossier) / f"{cle}.json.gz"
+    if not fichier.exists():
+        return None
+    return json.loads(gzip.decompress(fichier.read_bytes()))
+
+
+def _dupliquer(enregistrements, facteur):
+    # Copies des enregistrements de chaque localisation sous de nouveaux codes et noms
+    if facteur <= 1 or not enregistrements or not isinstance(enregistrements[0], dict):
+        return enregistrements
+    premier = enregistrements[0]
+    if "LOCATION_CODE" not in premier and "countryiso3code" not in premier:
+        return enregistrements  # ex. en-têtes des indicateurs : rien à dupliquer
+
+    resultat = list(enregistrements)
+    for i in range(1, facteur):
+        for e in enregistrements:
+            copie = dict(e)
+            if "LOCATION_CODE" in copie:
+                copie["LOCATION_CODE"] = f"{copie['LOCATION_CODE']}_{i}"
+                copie["LOCATION"] = f"{copie.get('LOCATION')} ({i})"
+            if "countryiso3code" in copie:
+                copie["countryiso3code"] = f"{copie['countryiso3code']}_{i}"
+                if isinstance(copie.get("country"), dict):
+                    pays = copie["country"]
+                    copie["country"] = {**pays, "id": f"{pays.get('id')}_{i}", "value": f"{pays.get('value')} ({i})"}
+            resultat.append(copie)
+    return resultat
+
+
+def _agrandir(corps, facteur):
+    if isinstance(corps, list) and len(corps) == 2 and isinstance(corps[0], dict):
+        enregistrements = _dupliquer(corps[1] or [], facteur)
+        return [{**corps[0], "total": len(enregistrements)}, enregistrements]
+    if isinstance(corps, dict) and isinstance(corps.get("value"), list):
+        return {**corps, "value": _dupliquer(corps["value"], facteur)}
+    return corps
+
+
+def _tirage(*elements):
+    # Nombre pseudo-aléatoire reproductible dans [0, 1)
+    h = hashlib.sha256("|".join(map(str, elements)).encode()).digest()
+    return int.from_bytes(h[:8], "big") / 2 ** 64
+
+
+class ServeurRejeu:
+    """
+    Serveur HTTP local qui rejoue (ou enregistre) les réponses des API de l'OMS et de la
+    Banque mondiale.
+
+    Paramètres
+    ----------
+    dossier : str ou pathlib.Path, optional
+        Dossier des fixtures (par défaut Main/Fixtures_API).
+    facteur : int, optional
+        Multiplicateur du nombre de localisations des réponses (par défaut 1).
+    latence : float, optional
+        Délai avant chaque réponse, en secondes (par défaut 0).
+    gigue : float, optional
+        Délai supplémentaire aléatoire, uniforme entre 0 et gigue secondes (par défaut 0).
+    debit : float, optional
+        Débit maximal par réponse, en octets par seconde (par défaut illimité).
+    taux_echec : float, optional
+        Proportion de requêtes en échec (par défaut 0).
+    echec : str, optional
+        "503" (réponse d'erreur) ou "coupure" (connexion fermée au milieu du corps).
+    taille_page : int, optional
+        Nombre maximal d'enregistrements par page OData de l'OMS (par défaut, pas de pagination).
+    compression : bool, optional
+        Compresse les réponses en gzip si le client l'accepte, comme les API (par défaut True).
+    enregistrer : bool, optional
+        Interroge les vraies API pour les requêtes sans fixture et les enregistre (par défaut False).
+    graine : int, optional
+        Graine des tirages de gigue et d'échecs (par défaut 0).
+    port : int, optional
+        Port d'écoute (par défaut, un port libre).
+
+    Utilisation
+    -----------
+    with ServeurRejeu(facteur=10, latence=0.05) as serveur:
+        df = get_facts("SDG3")
+    print(serveur.statistiques)
+    """
+
+    def __init__(self, dossier=None, facteur=1, latence=0.0, gigue=0.0, debit=None, taux_echec=0.0,
+                 echec="503", taille_page=None, compression=True, enregistrer=False, graine=0, port=0):
+        if echec not in ("503", "coupure"):
+            raise ValueError("echec doit valoir '503' ou 'coupure'")
+        self.dossier = Path(DOSSIER_FIXTURES if dossier is None else dossier)
+        self.facteur = int(facteur)
+        self.latence, self.gigue, self.debit = latence, gigue, debit
+        self.taux_echec, self.echec = taux_echec, echec
+        self.taille_page, self.compression = taille_page, compression
+        self.enregistrer, self.graine = enregistrer, graine
+        self.statistiques = {"requetes": 0, "octets": 0, "echecs": 0, "non_modifiees": 0,
+                             "manquantes": 0, "enregistrees": 0}
+
+        self._verrou = threading.Lock()
+        self._occurrences = {}
+        self._corps = {}      # clé -> corps agrandi (ou None si la fixture manque)
+        self._reponses = {}   # (clé, page, compression) -> (statut, octets, etag)
+        self._serveur = ThreadingHTTPServer(("127.0.0.1", port), self._gestionnaire())
+        self._serveur.daemon_threads = True
+        self._fil = None
+        self._urls_precedentes = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._serveur.server_address[1]}"
+
+    def variables_environnement(self):
+        """
+        Variables à définir pour rediriger les chargeurs d'un autre processus vers ce serveur.
+        """
+
+        return {"SCRIPTS_API_OMS": f"{self.url}/oms", "SCRIPTS_API_BANQUE_MONDIALE": f"{self.url}/bm"}
+
+    def demarrer(self):
+        self._fil = threading.Thread(target=self._serveur.serve_forever, daemon=True)
+        self._fil.start()
+        return self
+
+    def arreter(self):
+        self._serveur.shutdown()
+        self._serveur.server_close()
+
+    def __enter__(self):
+        from . import get_data_OMS_code_pays as oms
+        from . import get_data_PIB_hab as pib
+
+        self.demarrer()
+        # Redirection des chargeurs de ce processus, rétablie à la sortie du bloc
+        self._urls_precedentes = (oms.BASE_URL, pib.BASE_URL)
+        variables = self.variables_environnement()
+        oms.BASE_URL = variables["SCRIPTS_API_OMS"] + "/DEX_CMS/"
+        pib.BASE_URL = variables["SCRIPTS_API_BANQUE_MONDIALE"] + "/v2/"
+        return self
+
+    def __exit__(self, *exc):
+        from . import get_data_OMS_code_pays as oms
+        from . import get_data_PIB_hab as pib
+
+        oms.BASE_URL, pib.BASE_URL = self._urls_precedentes
+        self.arreter()
+        return False
+
+    # --- Réponses -------------------------------------------------------------------------
+
+    def _enregistrer_amont(self, service, chemin, parametres):
+        import requests
+
+        # Réponse complète de la vraie API : toutes les pages sont réunies
+        url = f"{SERVICES[service]}{chemin}"
+        parametres = [(k, v) for k, v in parametres if k not in PARAMETRES_PAGINATION]
+        resp = requests.get(url, params=parametres, timeout=120)
+        resp.raise_for_status()
+        corps = resp.json()
+        if isinstance(corps, list) and len(corps) == 2 and isinstance(corps[0], dict):
+            for page in range(2, int(corps[0].get("pages", 1)) + 1):
+                suite = requests.get(url, params=parametres + [("page", page)], timeout=120)
+                suite.raise_for_status()
+                corps[1].extend(suite.json()[1] or [])
+            corps[0].update({"page": 1, "pages": 1, "per_page": len(corps[1] or [])})
+        elif isinstance(corps, dict):
+            suivante = corps.pop("@odata.nextLink", None)
+            while suivante:
+                page = requests.get(suivante, timeout=120)
+                page.raise_for_status()
+                page = page.json()
+                corps["value"].extend(page["value"])
+                suivante = page.get("@odata.nextLink")
+        ecrire_fixture(self.dossier, f"{url}?{urlencode(parametres)}", corps)
+        with self._verrou:
+            self.statistiques["enregistrees"] += 1
+
+    def _corps_agrandi(self, cle, service, chemin, parametres):
+        with self._verrou:
+            if cle in self._corps:
+                return self._corps[cle]
+        fixture = lire_fixture(self.dossier, cle)
+        if fixture is None and self.enregistrer:
+            self._enregistrer_amont(service, chemin, parametres)
+            fixture = lire_fixture(self.dossier, cle)
+        corps = None if fixture is None else (fixture["statut"], _agrandir(fixture["corps"], self.facteur))
+        with self._verrou:
+            self._corps[cle] = corps
+        return corps
+
+    def _paginer(self, corps, parametres, service, chemin):
+        # Page demandée d'une réponse complète, et position de page pour l'empreinte
+        requete = dict(parametres)
+        if isinstance(corps, list) and len(corps) == 2 and isinstance(corps[0], dict):
+            par_page = max(int(requete.get("per_page", PAR_PAGE_BANQUE_MONDIALE)), 1)
+            page = max(int(requete.get("page", 1)), 1)
+            enregistrements = corps[1] or []
+            pages = max(-(-len(enregistrements) // par_page), 1)
+            meta = {**corps[0], "page": page, "pages": pages, "per_page": par_page, "total": len(enregistrements)}
+            return [meta, enregistrements[(page - 1) * par_page:page * par_page]], (page, par_page)
+
+        if isinstance(corps, dict) and isinstance(corps.get("value"), list):
+            debut = int(requete.get("$skip", 0))
+            taille = int(requete["$top"]) if "$top" in requete else None
+            if self.taille_page is not None:
+                taille = self.taille_page if taille is None else min(taille, self.taille_page)
+            if taille is None:
+                return {**corps, "value": corps["value"][debut:]}, (debut, None)
+            page = {**corps, "value": corps["value"][debut:debut + taille]}
+            if debut + taille < len(corps["value"]) and "$top" not in requete:
+                suivants = [(k, v) for k, v in parametres if k != "$skip"] + [("$skip", debut + taille)]
+                page["@odata.nextLink"] = f"{self.url}/{service}{chemin}?{urlencode(suivants)}"
+            return page, (debut, taille)
+
+        return corps, None
+
+    def _reponse(self, chemin_complet, gzip_accepte):
+        service, chemin, parametres = _service_et_chemin(chemin_complet)
+        cle = cle_requete(chemin_complet)
+        corps = self._corps_agrandi(cle, service, chemin, parametres)
+        if corps is None:
+            return cle, None, 404, json.dumps({"erreur": f"fixture absente : {cle}"}).encode(), None
+
+        statut, corps = corps
+        page, position = self._paginer(corps, parametres, service, chemin)
+        cle_reponse = (cle, position, gzip_accepte and self.compression)
+        with self._verrou:
+            reponse = self._reponses.get(cle_reponse)
+        if reponse is None:
+            octets = json.dumps(page, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            etag = '"' + hashlib.sha256(octets).hexdigest()[:32] + '"'
+            if cle_reponse[2]:
+                octets = gzip.compress(octets, compresslevel=1)
+            reponse = (statut, octets, etag)
+            with self._verrou:
+                self._reponses[cle_reponse] = reponse
+        statut, octets, etag = reponse
+        return cle, position, statut, octets, etag
+
+    def _gestionnaire(self):
+        serveur = self
+
+        class Gestionnaire(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                gzip_accepte = "gzip" in self.headers.get("Accept-Encoding", "")
+                try:
+                    cle, position, statut, octets, etag = serveur._reponse(self.path, gzip_accepte)
+                except ValueError as erreur:
+                    cle, position, statut, octets, etag = None, None, 404, str(erreur).encode(), None
+                except OSError as erreur:
+                    # Enregistrement impossible : vraie API indisponible
+                    cle, position, statut, octets, etag = None, None, 502, str(erreur).encode(), None
+
+                with serveur._verrou:
+                    rang = serveur._occurrences.get((cle, position), 0)
+                    serveur._occurrences[(cle, position)] = rang + 1
+                    serveur.statistiques["requetes"] += 1
+                    if statut == 404:
+                        serveur.statistiques["manquantes"] += 1
+
+                # Latence, gigue et échecs tirés selon la requête et son rang, pas selon l'ordre d'arrivée
+                tirage = (serveur.graine, cle, position, rang)
+                time.sleep(serveur.latence + serveur.gigue * _tirage("gigue", *tirage))
+                en_echec = statut == 200 and _tirage("echec", *tirage) < serveur.taux_echec
+                if en_echec and serveur.echec == "503":
+                    statut, octets, etag = 503, b'{"erreur": "service indisponible (injection)"}', None
+                if en_echec or statut != 200:
+                    with serveur._verrou:
+                        serveur.statistiques["echecs"] += int(en_echec)
+
+                if etag is not None and statut == 200 and self.headers.get("If-None-Match") == etag:
+                    with serveur._verrou:
+                        serveur.statistiques["non_modifiees"] += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                self.send_response(statut)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(octets)))
+                if statut == 200 and gzip_accepte and serveur.compression:
+                    self.send_header("Content-Encoding", "gzip")
+                if etag is not None and statut == 200:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+
+                # Coupure : la moitié du corps seulement, puis fermeture de la connexion
+                envoi = octets[:len(octets) // 2] if en_echec and serveur.echec == "coupure" else octets
+                for debut in range(0, len(envoi), TAILLE_BLOC):
+                    bloc = envoi[debut:debut + TAILLE_BLOC]
+                    self.wfile.write(bloc)
+                    if serveur.debit:
+                        time.sleep(len(bloc) / serveur.debit)
+                with serveur._verrou:
+                    serveur.statistiques["octets"] += len(envoi)
+                if len(envoi) < len(octets):
+                    self.wfile.flush()
+                    self.close_connection = True
+
+        return Gestionnaire
+
+
+def fixtures_depuis_sauvegardes(dossier=None):
+    """
+    Produit des fixtures au format des API à partir des sauvegardes CSV (Données_OMS et
+    Données_PIB) : facts et en-têtes de SDG3 et SDG_GPW au niveau pays, observations du PIB
+    par habitant (2015-2024) et requête de disponibilité de la Banque mondiale.
+
+    Paramètres
+    ----------
+    dossier : str ou pathlib.Path, optional
+        Dossier des fixtures (par défaut Main/Fixtures_API).
+
+    Sortie
+    ------
+    list
+        Chemins des fixtures écrites.
+    """
+
+    import pandas as pd
+
+    from . import get_data_OMS_code_pays as oms
+    from . import get_data_PIB_hab as pib
+    from .chemins import FICHIERS_OMS, FICHIER_PIB
+
+    dossier = DOSSIER_FIXTURES if dossier is None else dossier
+    base_oms = f"{oms.HOTE_OMS}/DEX_CMS/"
+    base_pib = f"{pib.HOTE_BANQUE_MONDIALE}/v2/"
+    codes_indicateurs = {nom: code for code, nom in oms.NOMS_INDICATEURS.items()}
+    fichiers = []
+
+    for grp, chemin in FICHIERS_OMS.items():
+        df = pd.read_csv(chemin)
+        codes = oms.COLONNES_GROUPES[grp]
+        entetes = {"value": [{"IND_GRP_CODE": grp, "IND_CODE": code, "SORT": i} for i, code in enumerate(codes)]}
+        url = oms.url_requete("WHSA_HEADER", grp, tri="SORT").replace(oms.BASE_URL, base_oms, 1)
+        fichiers.append(ecrire_fixture(dossier, url, entetes))
+
+        faits = []
+        for rang, ligne in df.iterrows():
+            # Un pays sans aucune valeur garde un fait vide (comme "No data" dans l'API) pour
+            # rester dans la table large
+            colonnes = [c for c in df.columns[2:] if pd.notna(ligne[c])] or [df.columns[2]]
+            for colonne in colonnes:
+                faits.append({"LOCATION_CODE": ligne["Pays_code_iso3"], "LOCATION": ligne["LOCATION"],
+                              "LOCATION_TYPE_CODE": "COUNTRY", "LOCATION_SORT": rang, "IND_GRP_CODE": grp,
+                              "FACT_IND": codes_indicateurs.get(colonne, colonne), "DIM_MEMBER_1": "",
+                              "VALUE_STRING": repr(float(ligne[colonne])) if pd.notna(ligne[colonne]) else ""})
+        url = oms.url_requete("WHSA_FACT_DISPLAY", grp, tri="LOCATION_SORT").replace(oms.BASE_URL, base_oms, 1)
+        fichiers.append(ecrire_fixture(dossier, url, {"value": faits}))
+
+    df = pd.read_csv(FICHIER_PIB)
+    annees = [c for c in df.columns if c.isdigit()]
+    observations = [
+        {"indicator": {"id": "NY.GDP.PCAP.CD", "value": "GDP per capita (current US$)"},
+         "country": {"id": ligne["Country Code"], "value": ligne["Country Name"]},
+         "countryiso3code": ligne["Country Code"], "date": annee,
+         "value": None if pd.isna(ligne[annee]) else float(ligne[annee]),
+         "unit": "", "obs_status": "", "decimal": 1}
+        for _, ligne in df.iterrows() for annee in reversed(annees)
+    ]
+    meta = {"page": 1, "pages": 1, "per_page": len(observations), "total": len(observations)}
+    url = f"{base_pib}country/all/indicator/NY.GDP.PCAP.CD"
+    fichiers.append(ecrire_fixture(dossier, f"{url}?format=json&date={annees[0]}:{annees[-1]}",
+                                   [meta, observations]))
+    fichiers.append(ecrire_fixture(dossier, url, [meta, observations]))
+    return fichiers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m Scripts.rejeu",
+                                     description="Enregistrement et rejeu hors ligne des API")
+    parser.add_argument("commande", choices=["fixtures", "enregistrer", "servir"],
+                        help="fixtures : fixtures depuis les sauvegardes CSV, enregistrer : "
+                             "enregistre les réponses des vraies API, servir : serveur de rejeu")
+    parser.add_argument("--dossier", help="dossier des fixtures (par défaut Main/Fixtures_API)")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--facteur", type=int, default=1)
+    parser.add_argument("--latence", type=float, default=0.0)
+    parser.add_argument("--gigue", type=float, default=0.0)
+    parser.add_argument("--debit", type=float, help="octets par seconde")
+    parser.add_argument("--taux-echec", type=float, default=0.0)
+    parser.add_argument("--echec", choices=["503", "coupure"], default="503")
+    parser.add_argument("--taille-page", type=int)
+    parser.add_argument("--graine", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.commande == "fixtures":
+        for fichier in fixtures_depuis_sauvegardes(args.dossier):
+            print(fichier)
+        return 0
+
+    serveur = ServeurRejeu(args.dossier, facteur=args.facteur, latence=args.latence, gigue=args.gigue,
+                           debit=args.debit, taux_echec=args.taux_echec, echec=args.echec,
+                           taille_page=args.taille_page, enregistrer=args.commande == "enregistrer",
+                           graine=args.graine, port=args.port)
+
+    if args.commande == "enregistrer":
+        # Les requêtes de toutes les sources passent par le serveur, qui enregistre les réponses
+        from .get_data_OMS_code_pays import get_data_health_with_iso
+        from .get_data_PIB_hab import telecharger_gdp_per_capita
+
+        with serveur:
+            get_data_health_with_iso()
+            telecharger_gdp_per_capita()
+        print(json.dumps(serveur.statistiques, ensure_ascii=False))
+        return 0
+
+    serveur.demarrer()
+    for nom, valeur in serveur.variables_environnement().items():
+        print(f"export {nom}={valeur}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        serveur.arreter()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+"""
+Autocorrélation spatiale des indicateurs : matrice de poids entre pays, I de Moran global et
+local avec inférence par permutations, et variables de décalage spatial pour les régressions.
+
+La matrice de poids est une matrice creuse scipy (CSR), standardisée en ligne. Par défaut, elle
+relie chaque pays à ses k plus proches voisins, d'après les centres des pays de la couche
+Natural Earth livrée avec le projet (cartes.charger_couche), en distance sur la sphère (de part
+et d'autre de l'antiméridien, ex. Fidji et Tonga). Ce voisinage tient lieu de table d'adjacence
+ISO3 : aucune n'est livrée, et il donne aussi des voisins aux îles. Une table de voisinage
+(frontières communes, distances) peut être passée à la place.
+
+Tous les calculs restent creux (produits W @ Z), y compris pour des matrices de la taille de
+régions infranationales, et traitent tous les indicateurs à la fois (une colonne de Z par
+indicateur).
+
+Les valeurs manquantes sont remplacées par la moyenne de l'indicateur (valeur centrée nulle) :
+elles ne contribuent ni au numérateur ni au dénominateur des statistiques de Moran.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import mesurer
+
+
+def _standardiser_lignes(W):
+    from scipy import sparse
+
+    somme = np.asarray(W.sum(axis=1)).ravel()
+    inverse = np.divide(1.0, somme, out=np.zeros_like(somme), where=somme > 0)
+    return (sparse.diags(inverse) @ W).tocsr()
+
+
+def matrice_poids(codes, table=None, k=6, col_a="iso3_a", col_b="iso3_b", col_poids=None, couche=None,
+                  standardiser=True):
+    """
+    Construit la matrice de poids spatiaux entre les lignes d'une table.
+
+    Paramètres
+    ----------
+    codes : array-like
+        Codes ISO3 des lignes (ex. df["Pays_code_iso3"]) ; la matrice suit cet ordre.
+    table : pandas.DataFrame, optional
+        Table de voisinage, une ligne par couple de voisins (col_a, col_b), avec éventuellement
+        un poids (col_poids, ex. inverse de la distance) ; les couples sont symétrisés.
+        Par défaut, les k plus proches voisins des centres des pays de la couche (distance
+        orthodromique, calculée comme distance entre vecteurs unitaires 3-D).
+    k : int, optional
+        Nombre de voisins sans table (par défaut 6).
+    col_a, col_b, col_poids : str, optional
+        Colonnes de la table de voisinage.
+    couche : dict, optional
+        Couche renvoyée par cartes.charger_couche (par défaut, la couche du projet).
+    standardiser : bool, optional
+        Standardisation en ligne (poids des voisins de somme 1). Par défaut True.
+
+    Sortie
+    ------
+    scipy.sparse.csr_matrix
+        Matrice n × n ; les lignes sans voisin (code inconnu, île isolée) sont nulles.
+    """
+
+    from scipy import sparse
+
+    codes = pd.Index(pd.Series(codes).astype(str))
+    n = len(codes)
+
+    if table is not None:
+        a = codes.get_indexer(table[col_a].astype(str))
+        b = codes.get_indexer(table[col_b].astype(str))
+        poids = np.ones(len(table)) if col_poids is None else table[col_poids].to_numpy(dtype="float64")
+        garde = (a >= 0) & (b >= 0) & (a != b)
+        W = sparse.csr_matrix((poids[garde], (a[garde], b[garde])), shape=(n, n))
+        # Symétrisation : un couple présent dans un seul sens ou dans les deux donne le même poids
+        W = W.maximum(W.T).tocsr()
+    else:
+        from scipy.spatial import cKDTree
+
+        from .cartes import charger_couche
+
+        couche = charger_couche() if couche is None else couche
+        # Distance entre vecteurs unitaires : croissante avec la distance sur la sphère
+        points = pd.DataFrame(couche["centres"], index=couche["codes"]).reindex(codes).to_numpy()
+        connus = np.flatnonzero(~np.isnan(points).any(axis=1))
+        kk = min(k, len(connus) - 1)
+        _, voisins = cKDTree(points[connus]).query(points[connus], k=kk + 1)
+        lignes = np.repeat(connus, kk)
+        colonnes = connus[voisins[:, 1:]].ravel()
+        W = sparse.csr_matrix((np.ones(len(lignes)), (lignes, colonnes)), shape=(n, n))
+
+    return _standardiser_lignes(W) if standardiser else W
+
+
+def _centrer(df, colonnes):
+    # Valeurs centrées-réduites (n × m), 0 pour les valeurs manquantes, et masque des valeurs observées
+    X = df[list(colonnes)].to_numpy(dtype="float64", na_value=np.nan)
+    observe = ~np.isnan(X)
+    Z = (X - np.nanmean(X, axis=0)) / np.nanstd(X, axis=0)
+    return np.where(observe, Z, 0.0), observe
+
+
+def _p_permutations(plus_grand, permutations):
+    # p-valeur pseudo-bilatérale (repliée) des tests par permutations, comme PySAL
+    plus_grand = np.minimum(plus_grand, permutations - plus_grand)
+    return (plus_grand + 1) / (permutations + 1)
+
+
+def _permuter(Z, observe, rng):
+    # Permute les valeurs observées de chaque colonne entre les lignes observées de cette colonne
+    if observe.all():
+        return rng.permuted(Z, axis=0)
+    Zp = np.zeros_like(Z)
+    for j in range(Z.shape[1]):
+        lignes = np.flatnonzero(observe[:, j])
+        Zp[lignes, j] = Z[rng.permutation(lignes), j]
+    return Zp
+
+
+@mesurer()
+def moran_global(df, colonnes, W, permutations=999, graine=0, taille_lot=None):
+    """
+    I de Moran global de plusieurs indicateurs, avec inférence par permutations.
+
+    Paramètres
+    ----------
+    df : pandas.DataFrame
+        Table dont les lignes correspondent à celles de W.
+    colonnes : list
+        Indicateurs testés (ou résidus d'une régression, pour diagnostiquer leur dépendance spatiale).
+    W : scipy.sparse matrix
+        Matrice de poids (voir matrice_poids).
+    permutations : int, optional
+        Nombre de permutations (par défaut 999).
+    graine : int, optional
+        Graine aléatoire (par défaut 0).
+    taille_lot : int, optional
+        Nombre de permutations traitées par un même produit creux (par défaut, selon la taille de la table).
+
+    Sortie
+    ------
+    pandas.DataFrame
+        Une ligne par indicateur : indicateur | I | esperance | z_sim | p_sim | n_obs.
+    """
+
+    Z, observe = _centrer(df, colonnes)
+    M = observe.astype("float64")
+    n_obs = observe.sum(axis=0)
+    # Somme des poids entre lignes observées, pour chaque indicateur
+    S0 = (M * (W @ M)).sum(axis=0)
+
+    # Le dénominateur Σz² ne dépend pas de la permutation
+    denominateur = (Z ** 2).sum(axis=0)
+    I = n_obs / S0 * (Z * (W @ Z)).sum(axis=0) / denominateur
+
+    # Permutations par lots : un seul produit creux W @ [Z₁ | Z₂ | ...] par lot
+    n, m = Z.shape
+    taille_lot = taille_lot or max(1, min(permutations, 2_000_000 // max(n * m, 1)))
+    rng = np.random.default_rng(graine)
+    simulations = []
+    for debut in range(0, permutations, taille_lot):
+        lot = min(taille_lot, permutations - debut)
+        Zp = np.hstack([_permuter(Z, observe, rng) for _ in range(lot)])
+        numerateurs = (Zp * (W @ Zp)).sum(axis=0).reshape(lot, m)
+        simulations.append(n_obs / S0 * numerateurs / denominateur)
+    simulations = np.vstack(simulations)
+
+    return pd.DataFrame({
+        "indicateur": list(colonnes),
+        "I": I,
+        "esperance": -1 / (n_obs - 1),
+        "z_sim": (I - simulations.mean(axis=0)) / simulations.std(axis=0),
+        "p_sim": _p_permutations((simulations >= I).sum(axis=0), permutations),
+        "n_obs": n_obs,
+    })
+
+
+@mesurer()
+def moran_local(df, colonnes, W, permutations=999, graine=0, seuil=0.05, taille_lot=None):
+    """
+    I de Moran local (LISA) de plusieurs indicateurs, avec permutations conditionnelles :
+    pour chaque ligne, les valeurs de ses voisins sont tirées au hasard, sans remise, parmi les
+    autres lignes où l'indicateur est renseigné.
+
+    Paramètres
+    ----------
+    df : pandas.DataFrame
+        Table dont les lignes correspondent à celles de W.
+    colonnes : list
+        Indicateurs testés.
+    W : scipy.sparse matrix
+        Matrice de poids (voir matrice_poids).
+    permutations : int, optional
+        Nombre de permutations (par défaut 999).
+    graine : int, optional
+        Graine aléatoire (par défaut 0).
+    seuil : float, optional
+        Seuil de p-valeur des regroupements significatifs (par défaut 0.05).
+    taille_lot : int, optional
+        Nombre de permutations calculées ensemble (par défaut, selon la taille de la table,
+        pour borner la mémoire).
+
+    Sortie
+    ------
+    pandas.DataFrame
+        Une ligne par (ligne de df, indicateur), index de df conservé : indicateur | I_local |
+        p_sim | regroupement ("HH", "LL", "HL", "LH" si significatif, sinon None).
+        Les valeurs manquantes donnent I_local = NaN, et p_sim = NaN aussi pour les lignes
+        sans voisin renseigné.
+    """
+
+    W = W.tocsr()
+    Z, observe = _centrer(df, colonnes)
+    n, m = Z.shape
+    m2 = (Z ** 2).sum(axis=0) / observe.sum(axis=0)
+    decalage = W @ Z
+    I = Z * decalage / m2
+
+    # Voisins et poids de chaque ligne, complétés par des zéros jusqu'au nombre maximal de voisins
+    nb_voisins = np.diff(W.indptr)
+    k_max = int(nb_voisins.max()) if n else 0
+    rangs = np.arange(k_max)[None, :]
+    poids = np.zeros((n, k_max))
+    voisins = np.zeros((n, k_max), dtype=np.int64)
+    remplis = rangs < nb_voisins[:, None]
+    poids[remplis] = W.data
+    voisins[remplis] = W.indices
+
+    rng = np.random.default_rng(graine)
+    plus_grand = np.zeros((n, m))
+    for j in range(m):
+        lignes = np.flatnonzero(observe[:, j])
+        n_j = len(lignes)
+        k = min(k_max, n_j - 1)
+        if k <= 0:
+            continue
+        # Seuls les voisins renseignés comptent, comme dans le décalage observé (valeur centrée nulle)
+        poids_j = (poids * observe[voisins, j])[lignes, :k]
+        z = Z[lignes, j]
+
+        # Tirages sans remise parmi les n_j - 1 autres lignes renseignées, communs à toutes les
+        # lignes (comme PySAL) : l'indice est décalé au-delà de la position de la ligne elle-même
+        tirages = np.array([rng.choice(n_j - 1, size=k, replace=False) for _ in range(permutations)])
+        lot_j = taille_lot or max(1, min(permutations, 5_000_000 // max(n_j * k, 1)))
+        for debut in range(0, permutations, lot_j):
+            lot = tirages[debut:debut + lot_j]
+            positions = lot[:, None, :] + (lot[:, None, :] >= np.arange(n_j)[None, :, None])
+            decalage_sim = np.einsum("nk,pnk->pn", poids_j, z[positions])
+            plus_grand[lignes, j] += (z[None] * decalage_sim / m2[j] >= I[lignes, j][None]).sum(axis=0)
+
+    # Sans voisin renseigné, le décalage est nul dans toutes les permutations : pas de test possible
+    testable = observe & ((W != 0).astype("float64") @ observe.astype("float64") > 0)
+    p_sim = np.where(testable, _p_permutations(plus_grand, permutations), np.nan)
+    quadrant = np.where(Z > 0, np.where(decalage > 0, "HH", "HL"), np.where(decalage > 0, "LH", "LL"))
+    significatif = (p_sim <= seuil) & testable
+
+    return pd.DataFrame({
+        "indicateur": np.tile(list(colonnes), n),
+        "I_local": np.where(observe, I, np.nan).ravel(),
+        "p_sim": p_sim.ravel(),
+        "regroupement": np.where(significatif, quadrant, None).ravel(),
+    }, index=np.repeat(df.index, m))
+
+
+def decalage_spatial(df, colonnes, W, suffixe=" (voisins)"):
+    """
+    Ajoute, pour chaque indicateur, sa moyenne pondérée sur les voisins (décalage spatial),
+    à utiliser comme régresseur (ex. analyse_sante_vers_pib(df, indicateurs=[..., "X (voisins)"])).
+
+    Paramètres
+    ----------
+    df : pandas.DataFrame
+        Table dont les lignes correspondent à celles de W.
+    colonnes : list
+        Indicateurs (ou colonnes années de PIB) à décaler.
+    W : scipy.sparse matrix
+        Matrice de poids (voir matrice_poids).
+    suffixe : str, optional
+        Suffixe des colonnes ajoutées (par défaut " (voisins)").
+
+    Sortie
+    ------
+    pandas.DataFrame
+        Copie de df avec les colonnes décalées ; moyenne sur les seuls voisins renseignés,
+        NaN sans voisin renseigné.
+    """
+
+    X = df[list(colonnes)].to_numpy(dtype="float64", na_value=np.nan)
+    observe = ~np.isnan(X)
+    somme = W @ np.where(observe, X, 0.0)
+    poids = W @ observe.astype("float64")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        decale = np.where(poids > 0, somme / poids, np.nan)
+
+    df = df.copy()
+    for j, colonne in enumerate(colonnes):
+        df[f"{colonne}{suffixe}"] = decale[:, j].astype("float32")
+    return df
@@ -2,6 +2,10 @@ import pandas as pd
 import sys
 import subprocess
 
+from .normalisation import normaliser_types
+from .instrumentation import mesurer
+
+@mesurer()
 def restructure_data(input_path):
     """
     Transforme un fichier CSV de données de DALYs en format large pour analyse par pays et maladie.
@@ -53,4 +57,30 @@ def restructure_data(input_path):
 
     df_wide = df_wide.rename(columns={'location_name': 'Country'})
 
-    return df_wide
+    # LOCATION catégorielle et valeurs en float32 lorsque la précision le permet
+    return normaliser_types(df_wide)
+
+
+def harmoniser_noms(df_ihme):
+    """
+    Aligne les noms de pays de l'IHME sur les noms courts de l'OMS, pour la jointure sur LOCATION.
+
+    L'IHME utilise les noms officiels longs (« Bolivia (Plurinational State of) »,
+    « Iran (Islamic Republic of) », ...) là où l'OMS n'utilise que le nom court (« Bolivia »,
+    « Iran »). Sans harmonisation, ces pays disparaissent de la fusion.
+
+    Paramètres
+    ----------
+    df_ihme : pandas.DataFrame
+        Table de l'IHME avec une colonne LOCATION.
+
+    Sortie
+    ------
+    pandas.DataFrame
+        Copie de la table, le complément entre parenthèses retiré des noms de pays.
+    """
+
+    df_ihme = df_ihme.copy()
+    noms = df_ihme['LOCATION'].astype(str).str.replace(r'\s*\(.*\)$', '', regex=True)
+    df_ihme['LOCATION'] = noms.astype('category')
+    return df_ihme
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Le package Scripts est importé depuis le dossier Main
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
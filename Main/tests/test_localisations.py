@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Scripts.localisations import IndexLocalisations, agreger, index_depuis_faits
+
+
+@pytest.fixture
+def faits():
+    # Table mêlant les niveaux : l'Inde et la France avec leurs lignes infranationales
+    return pd.DataFrame({
+        "LOCATION_CODE": ["SEAR", "IND", "IND_MH", "IND_KL", "FRA", "FRA_IDF", "EUR"],
+        "LOCATION": ["Asie du Sud-Est", "Inde", "Maharashtra", "Kerala", "France", "Île-de-France", "Europe"],
+        "LOCATION_TYPE_CODE": ["REGION", "COUNTRY", "SUBNATIONAL", "SUBNATIONAL", "COUNTRY", "SUBNATIONAL", "REGION"],
+        "PARENT_LOCATION_CODE": [None, "SEAR", "IND", "IND", "EUR", "FRA", None],
+        "valeur": [5.0, 2.0, 10.0, 20.0, 1.0, 3.0, 4.0],
+    })
+
+
+def test_agreger_sans_double_compte(faits):
+    index, ids = index_depuis_faits(faits)
+    df = faits[["valeur"]].assign(LOCATION_ID=ids)
+
+    pays = agreger(df, index, "COUNTRY").set_index("LOCATION_CODE")
+    assert pays.loc["FRA", "valeur"] == 1.0
+    assert pays.loc["IND", "n_localisations"] == 1
+
+    monde = agreger(df, index, "GLOBAL")
+    assert monde["n_localisations"].item() == 2
+    assert monde["valeur"].item() == pytest.approx(4.5)
+
+
+def test_agreger_depuis(faits):
+    index, ids = index_depuis_faits(faits)
+    df = faits[["valeur"]].assign(LOCATION_ID=ids)
+
+    regions = agreger(df, index, "REGION", depuis="SUBNATIONAL").set_index("LOCATION_CODE")
+    assert regions.loc["SEAR", "valeur"] == pytest.approx(15.0)
+    assert regions.loc["EUR", "n_localisations"] == 1
+    with pytest.raises(ValueError):
+        agreger(df, index, "COUNTRY", depuis="REGION")
+
+
+def test_identifiants_niveau_le_plus_fin():
+    index = IndexLocalisations()
+    index.ajouter(["ABC"], "COUNTRY")
+    index.ajouter(["XYZ"], "REGION")
+    index.ajouter(["ABC"], "REGION")
+    ids = index.identifiants(["ABC", "XYZ", "???"])
+    np.testing.assert_array_equal(index.niveaux[ids[:2]], [2, 1])
+    assert ids[2] == -1
+
+
+def test_agreger_ancetre_sans_valeur(faits):
+    # Indicateur publié par État seulement : la ligne de l'Inde ne masque pas ses États
+    faits.loc[faits["LOCATION_CODE"] == "IND", "valeur"] = np.nan
+    index, ids = index_depuis_faits(faits)
+    df = faits[["valeur"]].assign(LOCATION_ID=ids)
+
+    pays = agreger(df, index, "COUNTRY").set_index("LOCATION_CODE")
+    assert pays.loc["IND", "valeur"] == pytest.approx(15.0)
+    assert pays.loc["IND", "n_localisations"] == 2
+    assert pays.loc["FRA", "valeur"] == 1.0
+
+    faits.loc[faits["LOCATION_CODE"] == "SEAR", "valeur"] = np.nan
+    df = faits[["valeur"]].assign(LOCATION_ID=ids)
+    monde = agreger(df, index, "GLOBAL")
+    # Les États (10 et 20) remplacent l'Asie du Sud-Est et l'Inde, à côté de l'Europe (4)
+    assert monde["n_localisations"].item() == 3
+    assert monde["valeur"].item() == pytest.approx((10.0 + 20.0 + 4.0) / 3)
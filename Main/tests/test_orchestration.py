@@ -0,0 +1,80 @@
+import contextlib
+import io
+
+import pytest
+import requests
+
+from Scripts import get_data_OMS_code_pays as oms
+from Scripts import instrumentation
+from Scripts import get_data_PIB_hab as pib
+from Scripts.chemins import FICHIER_FUSION, FICHIER_FUSION_GROUPE
+from Scripts.normalisation import lire_csv
+from Scripts.orchestration import executer_pipeline
+from Scripts.rejeu import ServeurRejeu, ecrire_fixture, fixtures_depuis_sauvegardes
+
+
+@pytest.fixture(scope="module")
+def resultats():
+    # API injoignables : le pipeline se replie sur les sauvegardes locales
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(oms, "BASE_URL", "http://127.0.0.1:9/DEX_CMS/")
+        mp.setattr(pib, "BASE_URL", "http://127.0.0.1:9/v2/")
+        with contextlib.redirect_stdout(io.StringIO()):
+            return executer_pipeline(processus=False)
+
+
+@pytest.mark.parametrize("cle, fichier", [("fusion", FICHIER_FUSION),
+                                          ("fusion_niveau_richesse", FICHIER_FUSION_GROUPE)])
+def test_parite_tables_fusionnees(resultats, cle, fichier):
+    reference = lire_csv(fichier)
+    df = resultats[cle]
+
+    assert len(df) == len(reference)
+    assert list(df.columns) == list(reference.columns)
+    assert set(df["Pays_code_iso3"]) == set(reference["Pays_code_iso3"])
+
+
+def test_noms_longs_ihme_conserves(resultats):
+    pays = set(resultats["fusion"]["LOCATION"].astype(str))
+    assert {"Bolivia", "Iran", "Micronesia", "Venezuela"} <= pays
+
+
+def test_parite_pipeline_api(resultats, tmp_path):
+    # Réponses rejouées à partir des sauvegardes : mêmes lignes et mêmes codes que le repli
+    with contextlib.redirect_stdout(io.StringIO()):
+        fixtures_depuis_sauvegardes(tmp_path)
+        with ServeurRejeu(tmp_path):
+            api = executer_pipeline(processus=False)
+    df, reference = api["fusion_niveau_richesse"], resultats["fusion_niveau_richesse"]
+
+    assert "lecture_PIB" not in set(api["chronologie"]["etape"])
+    assert len(df) == len(reference)
+    assert set(df["Pays_code_iso3"]) == set(reference["Pays_code_iso3"])
+
+
+def test_erreur_api_banque_mondiale(tmp_path):
+    # L'API renvoie ses erreurs avec le statut 200, dans une liste à un seul élément
+    url = f"{pib.HOTE_BANQUE_MONDIALE}/v2/country/all/indicator/INCONNU?format=json&per_page=20000&date=2015:2024"
+    ecrire_fixture(tmp_path, url, [{"message": [{"id": "175", "key": "Invalid format",
+                                                 "value": "The indicator was not found."}]}])
+    with ServeurRejeu(tmp_path), pytest.raises(requests.exceptions.HTTPError, match="indicator was not found"):
+        pib.telecharger_gdp_per_capita(indicator="INCONNU")
+
+
+def test_mesures_pool_de_processus(tmp_path):
+    # Les mesures des transformations exécutées dans les workers reviennent au processus parent
+    with contextlib.redirect_stdout(io.StringIO()):
+        fixtures_depuis_sauvegardes(tmp_path)
+        etait_actif = instrumentation.est_actif()
+        instrumentation.reinitialiser()
+        instrumentation.activer()
+        try:
+            with ServeurRejeu(tmp_path):
+                executer_pipeline(processus=True)
+            etapes = {m["etape"] for m in instrumentation.mesures()}
+        finally:
+            instrumentation.reinitialiser()
+            if not etait_actif:
+                instrumentation.desactiver()
+
+    assert {"preparer_groupe", "gdp_format_long", "gdp_format_large", "restructure_data"} <= etapes
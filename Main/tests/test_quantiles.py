@@ -0,0 +1,40 @@
+import pytest
+
+from Scripts.chemins import FICHIER_FUSION_GROUPE, FICHIER_NIVEAU_RICHESSE, FICHIER_PIB
+from Scripts.normalisation import lire_csv
+from Scripts.quantiles import ajouter_quantiles, table_quantiles
+
+
+@pytest.fixture(scope="module")
+def pib():
+    return lire_csv(FICHIER_PIB)
+
+
+def test_agregats_sans_code_ecartes(pib):
+    # La sauvegarde contient des agrégats par niveau de revenu sans Country Code
+    assert pib["Country Code"].isna().any()
+    table = table_quantiles(pib)
+    assert table["Country Code"].notna().all()
+    assert not table.duplicated(["Country Code", "Year", "k"]).any()
+
+
+def test_ajouter_quantiles_sur_sauvegarde(pib):
+    table = table_quantiles(pib)
+    df = ajouter_quantiles(pib, table, k=4, annee=2020, col_pays="Country Code")
+
+    quantiles = df["Quantile PIB 2020 (k=4)"]
+    assert quantiles[df["Country Code"].isna()].isna().all()
+    assert set(quantiles.dropna()) == {1, 2, 3, 4}
+
+
+def test_ajouter_quantiles_table_fusionnee(pib):
+    table = table_quantiles(pib, ks=[10])
+    df = ajouter_quantiles(lire_csv(FICHIER_FUSION_GROUPE), table, k=10, annee=2020)
+    assert df["Quantile PIB 2020 (k=10)"].notna().sum() > 150
+
+
+def test_filtre_pays(pib):
+    niveaux = lire_csv(FICHIER_NIVEAU_RICHESSE).dropna(subset=["IncomeGroup"])
+    table = table_quantiles(pib, pays=niveaux["Country Code"])
+    assert "WLD" not in set(table["Country Code"].astype(str))
+    assert "FRA" in set(table["Country Code"].astype(str))